@@ -0,0 +1,90 @@
+"""
+Strong/Sizhi Chen
+CS 5001, Fall 2024
+Final Project -- address.py
+
+Address Canonicalization
+
+This script turns the addresses of both datasets into one canonical form, so the same storefront has the same
+address in the business licences ('605 Unit 1166.0 Alberni Street') and in the storefront inventory
+('605 1166 ALBERNI ST'): '605-1166 ALBERNI ST'.
+
+Key Features:
+1. **Case and Numbers**:
+   - Upper case, single spaces, and house numbers without the '.0' left by reading them as floats.
+
+2. **Unit Formats**:
+   - The unit is everything before the house number, without words such as 'Unit', 'Suite' or '#',
+     and is written before the house number with a hyphen.
+
+3. **Street Types and Directions**:
+   - 'STREET' -> 'ST', 'AVENUE' -> 'AV', 'DRIVE' -> 'DR', 'WEST' -> 'W', ... as used by the City of Vancouver.
+
+4. **Interned Results**:
+   - Every distinct address is parsed once, and equal canonical addresses share one string object.
+"""
+
+
+# Import modules
+import re
+import sys
+from functools import lru_cache
+import pandas as pd
+
+
+# Set constants
+STREET_ABBREVIATIONS = {'STREET': 'ST', 'STR': 'ST', 'AVENUE': 'AV', 'AVE': 'AV', 'DRIVE': 'DR', 'ROAD': 'RD',
+                        'BOULEVARD': 'BLVD', 'PLACE': 'PL', 'CRESCENT': 'CRES', 'COURT': 'CRT', 'HIGHWAY': 'HWY',
+                        'SQUARE': 'SQ', 'TERRACE': 'TERR', 'PARKWAY': 'PKY', 'LANE': 'LN',
+                        'WEST': 'W', 'EAST': 'E', 'NORTH': 'N', 'SOUTH': 'S', 'FLR': 'FLOOR', 'FL': 'FLOOR'}
+UNIT_WORDS = ['UNIT', 'UNTI', 'SUITE', 'STE', 'APT', 'NO']
+ADDRESS_CACHE_SIZE = 1 << 16
+
+_FLOAT_NUMBER = re.compile(r'\b(\d+)\.0\b')
+_PUNCTUATION = re.compile(r'[,.]')
+_ABBREVIATION = re.compile(r'\b(' + '|'.join(STREET_ABBREVIATIONS) + r')\b')
+_UNIT_WORD = re.compile(r'#|\b(?:' + '|'.join(UNIT_WORDS) + r')\b')
+# The last number followed by a word which does not start with a digit is the house number
+_CIVIC = re.compile(r'^(?:(?P<unit>.*)\s)?(?P<house>\d+)\s(?P<street>\D.*)$')
+
+
+@lru_cache(maxsize=ADDRESS_CACHE_SIZE)
+def canonical_address(address):
+    """
+    Returns the canonical form of one address.
+
+    Parameters:
+        address (str): An address of either dataset, e.g. '605 Unit 1166.0 Alberni Street'.
+    Returns:
+        str: The canonical address, e.g. '605-1166 ALBERNI ST', or '' for an empty address.
+    Raises:
+        ValueError: If the address is not a string.
+    """
+    if not isinstance(address, str):
+        raise ValueError("Error: address must be a string.")
+    text = _FLOAT_NUMBER.sub(r'\1', address.upper())
+    text = ' '.join(_PUNCTUATION.sub(' ', text).split())
+    match = _CIVIC.match(text)
+    if match is None:
+        return sys.intern(_ABBREVIATION.sub(lambda word: STREET_ABBREVIATIONS[word.group(1)], text))
+    street = _ABBREVIATION.sub(lambda word: STREET_ABBREVIATIONS[word.group(1)], match['street'])
+    unit = ' '.join(_UNIT_WORD.sub(' ', match['unit'] or '').split()).strip(' -')
+    unit = _ABBREVIATION.sub(lambda word: STREET_ABBREVIATIONS[word.group(1)], unit)
+    if unit:
+        return sys.intern(f"{unit}-{match['house']} {street}")
+    return sys.intern(f"{match['house']} {street}")
+
+
+def canonical_addresses(addresses):
+    """
+    Returns the canonical form of every address of a column, parsing every distinct address once.
+
+    Parameters:
+        addresses (Series): The addresses, missing values are kept as missing.
+    Returns:
+        Series: The canonical addresses, with the index of the input.
+    """
+    codes, uniques = pd.factorize(addresses)
+    canonical = pd.Series([canonical_address(str(address)) for address in uniques] + [None], dtype=object)
+    # Missing addresses have the code -1, which picks the None at the end
+    return pd.Series(canonical.to_numpy()[codes], index=addresses.index, dtype=object)
@@ -0,0 +1,94 @@
+"""
+Strong/Sizhi Chen
+CS 5001, Fall 2024
+Final Project -- aggregate_cube.py
+
+Precomputed Aggregates for the Bar Plots
+
+This script defines the `AggregateCube` class, which groups a summary DataFrame once when the data is loaded,
+so the bar plots of the GUI only slice a short preranked Series when the user changes an axis or the top N.
+
+Key Features:
+1. **One Grouping per Dimension**:
+   - The sum of every numeric measure is computed for each of `Business Name`, `Business Category` and `City`.
+
+2. **Preranked Results**:
+   - The `CUBE_TOP_N` largest sums of every (dimension, measure) pair are selected once with `ranking.top_n`,
+     so the top N of the GUI is a slice of a short Series. Larger N are ranked from the full sums.
+"""
+
+
+# Import modules
+import pandas as pd
+from ranking import top_n as top_n_values
+
+
+# Set constants
+CUBE_DIMENSIONS = ['Business Name', 'Business Category', 'City']
+CUBE_TOP_N = 100
+
+
+class AggregateCube:
+    """
+    Holds the sums of every numeric measure per dimension value, with the largest ones ranked in advance.
+
+    Attributes:
+        dimensions (list): The columns which were grouped by.
+        measures (list): The numeric columns which were summed.
+    Methods:
+        top(dimension, measure, top_n): Returns the `top_n` largest sums of a measure per dimension value.
+    """
+    def __init__(self, data, dimensions=None, measures=None):
+        """
+        Groups the data by every dimension and ranks the largest sums of every measure.
+
+        Parameters:
+            data (DataFrame): The summary data, e.g. `business_df` or `inventory_df`.
+            dimensions (list): The columns to group by (default is the `CUBE_DIMENSIONS` found in the data).
+            measures (list): The columns to sum (default is every numeric column which is not a dimension).
+        Raises:
+            ValueError: If data is not a DataFrame or a dimension or measure is not one of its columns.
+        """
+        if not isinstance(data, pd.DataFrame):
+            raise ValueError("[AggregateCube] Error: data must be a pandas DataFrame.")
+        if dimensions is None:
+            dimensions = [column for column in CUBE_DIMENSIONS if column in data.columns]
+        if measures is None:
+            measures = [column for column in data.select_dtypes('number').columns if column not in dimensions]
+        for column in list(dimensions) + list(measures):
+            if column not in data.columns:
+                raise ValueError(f"[AggregateCube] Error: Column '{column}' not found in the dataset.")
+        self.dimensions = list(dimensions)
+        self.measures = list(measures)
+
+        self._sums = {}
+        self._ranked = {}
+        for dimension in self.dimensions:
+            grouped = data.groupby(dimension)[self.measures].sum()
+            for measure in self.measures:
+                self._sums[(dimension, measure)] = grouped[measure]
+                self._ranked[(dimension, measure)] = top_n_values(grouped[measure], CUBE_TOP_N)
+
+    def __contains__(self, key):
+        """Returns True if the cube has the sums of a (dimension, measure) pair."""
+        return key in self._sums
+
+    def top(self, dimension, measure, top_n):
+        """
+        Returns the largest sums of a measure per dimension value.
+
+        Parameters:
+            dimension (str): The column which was grouped by, e.g. 'Business Category'.
+            measure (str): The column which was summed, e.g. 'Number of Employees'.
+            top_n (int): The number of values to return.
+        Returns:
+            Series: The `top_n` largest sums in descending order, indexed by the dimension values.
+        Raises:
+            ValueError: If the cube has no sums for the (dimension, measure) pair.
+        """
+        if (dimension, measure) not in self._sums:
+            raise ValueError(f"[AggregateCube] Error: No sums of '{measure}' by '{dimension}' in the cube.")
+        ranked = self._ranked[(dimension, measure)]
+        if top_n <= len(ranked):
+            return ranked.iloc[:top_n]
+        return top_n_values(self._sums[(dimension, measure)], top_n)
@@ -22,14 +22,18 @@ Key Features:
 
 3. **Dynamic Plotting**:
    - Interactive controls to modify plot parameters, such as selecting axes, top N entries, and specific columns.
+   - The business bar plot can be filtered by category, city and local area, answered by the indexes of
+     `BusinessQuery` instead of masking the whole DataFrame.
    - Ability to save plots to a file.
 
 4. **Modular Design**:
    - Separate frames for different analysis sections: Information, Business, Inventory, and Relationships.
    - Seamless navigation between different sections.
+   - In fast start mode, the Business, Inventory and Relationship frames are built on their first visit,
+     and Matplotlib is only imported once the first figure is drawn.
 
 5. **Interactive Widgets**:
-   - Combo boxes for selecting plot parameters.
+   - Combo boxes for selecting plot parameters and the filters of the business bar plot.
    - Spin boxes for adjusting the number of displayed entries.
    - Buttons for saving plots and switching between sections.
 
@@ -48,8 +52,19 @@ Usage:
 # Import the modules and classes
 from tkinter import *
 from tkinter import ttk, filedialog
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from plot import *
+from aggregate_cube import AggregateCube
+from query import BusinessQuery
+from correlation import CorrelationMatrix
+from ranking import highest_rows
+from figure_cache import FigureCache, data_version
+from canvas_manager import CanvasManager
+from plot_worker import PlotWorker, DEBOUNCE_MS
+
+
+# Set constants
+ALL_VALUES = 'All'
+CURRENT_SLOT = 'current_fig'
 
 
 class BusinessApp:
@@ -62,43 +77,80 @@ class BusinessApp:
         master (Tk): The root window for the application.
         business_df (DataFrame): DataFrame containing business data.
         inventory_df (DataFrame): DataFrame containing inventory data.
+        business_cube (AggregateCube): Precomputed sums of the business data for the bar plots.
+        inventory_cube (AggregateCube): Precomputed sums of the inventory data for the bar plots.
+        business_query (BusinessQuery): Indexes of the business data for the filtered business bar plots.
+        figure_cache (FigureCache): The most recently drawn figures, keyed on the view and theme.
+        canvas_manager (CanvasManager): The canvas of every plot frame, created with the first figure.
+        plot_worker (PlotWorker): Draws the figures of the event handlers in the background.
         style (Style): The style configuration for the GUI elements.
         current_fig (Figure): The currently displayed Matplotlib figure.
-        corr_matrix (DataFrame): Correlation matrix for selected columns of business data.
+        corr_matrix (CorrelationMatrix): Correlation matrix for selected columns of business data.
+        fast_start (bool): If True, the plot frames are built on first use and the heatmaps in the background.
+        built_frames (set): The names of the plot frames which were built.
 
     Methods:
+        build_business_frame(): Builds the "Business" screen the first time it is shown.
+        build_inventory_frame(): Builds the "Inventory" screen the first time it is shown.
+        build_relationship_frame(): Builds the "Relationship" screen the first time it is shown.
         single_column_heatmap_change(event): Updates the heatmap when a single column is selected.
         business_x_axis_change(event): Updates the business plot based on the x-axis selection.
         business_y_axis_change(event): Updates the business plot based on the y-axis selection.
         business_n_companies_spinbox_change(event): Updates the business plot based on the top N selection.
+        business_filter_change(event): Updates the business plot based on the category, city and area filters.
+        business_plot_data(): Returns the data and filters of the business plot.
         inventory_x_axis_change(event): Updates the inventory plot based on the x-axis selection.
         inventory_n_companies_spinbox_change(event): Updates the inventory plot based on the top N selection.
         relationship_draw_button(): Draws a scatter plot based on selected x-axis and y-axis variables.
         change_theme(event): Updates the GUI and visualizations based on the selected theme.
+        request_plot(frame, name, function, *args, current): Draws a figure in the background and displays it.
+        request_current(function, *args): Draws the figure of the Save button in the background.
+        initial_plot(frame, name, function, *args): Draws the first figure of a frame.
+        plot_view(function, *args): Returns the figure of a plot function, reusing it if it was drawn before.
         display_plot(frame, fig): Displays a given Matplotlib figure in a specified frame.
         click_infor(event): Displays the "Information" screen.
         click_business(event): Displays the "Business" screen.
         click_inventory(event): Displays the "Inventory" screen.
         click_relationship(event): Displays the "Relationship" screen.
         save_plot(): Saves the currently displayed plot to a file.
+        close(): Stops the plot worker and closes the window.
     """
-    def __init__(self, master, business_df, inventory_df):
+    def __init__(self, master, business_df, inventory_df, debounce_ms=DEBOUNCE_MS, fast_start=True):
         # Initialize the Dataframe
         self.master = master
+        # In fast start mode the window opens with the text of the Information Frame, its heatmaps are drawn
+        # in the background and the other frames are built when they are first shown
+        self.fast_start = fast_start
         self.business_df = business_df
         self.inventory_df = inventory_df
+        # Reuse the figure of a view which was drawn before, e.g. when switching back to a theme
+        self.figure_cache = FigureCache()
+        self.data_version = data_version(business_df, inventory_df)
+        # One canvas per frame, which only swaps the figure it shows, created with the first figure
+        self.canvas_manager = None
+        # Draw the figures of later interactions in a worker thread, keeping only the latest request
+        self.plot_worker = PlotWorker(self.master, self.figure_cache, self.data_version, debounce_ms)
+        # Group and sort once, so changing an axis or the top N only slices the sums
+        self.business_cube = AggregateCube(business_df)
+        self.inventory_cube = AggregateCube(inventory_df)
+        # Index the categories, cities and local areas, so a filtered top N only reads the matching businesses
+        self.business_query = BusinessQuery(business_df)
         self.inven_bigger_0 = business_df[business_df['Number of Inventory'] > 0]
-        self.corr_matrix = business_df[['Number of Store', 'Number of Employees',
-                                        'Number of Inventory', 'Total Register Fee']]
-        self.corr_matrix = self.corr_matrix.rename(columns={'Number of Store': 'Store',
-                                                            'Number of Employees': 'Employees',
-                                                            'Number of Inventory': 'Inventory',
-                                                            'Total Register Fee': 'Register Fee'})
+        corr_data = business_df[['Number of Store', 'Number of Employees',
+                                  'Number of Inventory', 'Total Register Fee']]
+        corr_data = corr_data.rename(columns={'Number of Store': 'Store',
+                                              'Number of Employees': 'Employees',
+                                              'Number of Inventory': 'Inventory',
+                                              'Total Register Fee': 'Register Fee'})
+        # Correlate once, so a theme or column change only redraws the heatmaps
+        self.corr_matrix = CorrelationMatrix(corr_data)
         self.current_fig = None
 
         # Initialize the Window
         self.master.title('Business Analysis App')
         self.master.resizable(False, False)
+        # Stop the plot worker before the window goes away, so no callback runs on a destroyed window
+        self.master.protocol('WM_DELETE_WINDOW', self.close)
 
         # Style
         self.style = ttk.Style()
@@ -156,24 +208,26 @@ class BusinessApp:
         # Information Frame
         self.information_frame = ttk.Frame(self.master, style='Other.TFrame')
         self.information_frame.pack(fill='both', expand=True)
-        self.max_store_row = business_df.loc[business_df['Number of Store'].idxmax()]
-        self.max_employees_row = business_df.loc[business_df['Number of Employees'].idxmax()]
-        self.max_inventory_row = inventory_df.loc[inventory_df['Number of inventory'].idxmax()]
-        self.max_register_fee = business_df.loc[business_df['Total Register Fee'].idxmax()]
+        # Every "highest" fact of the business data from one pass
+        highest = highest_rows(business_df, ['Number of Store', 'Number of Employees', 'Total Register Fee'])
+        self.max_store_row = highest['Number of Store']
+        self.max_employees_row = highest['Number of Employees']
+        self.max_inventory_row = highest_rows(inventory_df, ['Number of inventory'])['Number of inventory']
+        self.max_register_fee = highest['Total Register Fee']
         self.basic_infor = (f'There are total {len(self.business_df):,.0f} business in Vancouver.\n'
                             f'There are total {len(self.inventory_df):,.0f} business which has inventory in Vancouver.\n'
                             f'There are total {len(self.inven_bigger_0)} business which has inventory higher than 2 in Vancouver.\n\n'
-                            f'{self.max_employees_row['Business Name']} has the highest number of employees which is {self.max_employees_row['Number of Employees']:,.0f}.\n'
-                            f'{self.max_inventory_row['Business Name']} has the highest number of inventory which is {self.max_inventory_row['Number of inventory']}.\n'
-                            f'{self.max_store_row['Business Name']} has the highest number of store which is {self.max_store_row['Number of Store']}.\n'
-                            f'{self.max_register_fee['Business Name']} has the highest register fee which is {int(self.max_register_fee['Total Register Fee']):,.0f}.')
+                            f'{self.max_employees_row["Business Name"]} has the highest number of employees which is {self.max_employees_row["Number of Employees"]:,.0f}.\n'
+                            f'{self.max_inventory_row["Business Name"]} has the highest number of inventory which is {self.max_inventory_row["Number of inventory"]}.\n'
+                            f'{self.max_store_row["Business Name"]} has the highest number of store which is {self.max_store_row["Number of Store"]}.\n'
+                            f'{self.max_register_fee["Business Name"]} has the highest register fee which is {int(self.max_register_fee["Total Register Fee"]):,.0f}.')
         ttk.Label(self.information_frame, text=self.basic_infor, anchor='nw', style='Infor.TLabel'
                   ).grid(column=0, row=0, sticky='nsew', padx=20, pady=10)
         # Canvas Frame for entire heatmap
         self.heatmap_canvas_frame = ttk.Frame(self.information_frame)
         self.heatmap_canvas_frame.grid(column=0, row=1, padx=20, pady=10)
-        self.heatmap = heatmap(self.corr_matrix, '#F4FAFD', self.color.get() + 's')
-        self.display_plot(self.heatmap_canvas_frame, self.heatmap)
+        self.initial_plot(self.heatmap_canvas_frame, 'heatmap', heatmap,
+                          self.corr_matrix, '#F4FAFD', self.color.get() + 's')
         # Combobox for single column heatmap
         ttk.Label(self.information_frame, text='Select Column:', style='Other.TLabel'
                   ).grid(column=1, row=0, sticky='se', padx=5, pady=10)
@@ -185,14 +239,28 @@ class BusinessApp:
         # Canvas Frame for single column heatmap
         self.single_heatmap_canvas_frame = ttk.Frame(self.information_frame)
         self.single_heatmap_canvas_frame.grid(column=1, row=1, padx=20, pady=10, columnspan=2)
-        self.single_heatmap = single_column_heatmap(self.corr_matrix, self.single_column_combobox.get(),
-                                                    '#F4FAFD', self.color.get() + 's')
-        self.display_plot(self.single_heatmap_canvas_frame, self.single_heatmap)
+        self.initial_plot(self.single_heatmap_canvas_frame, 'single_heatmap', single_column_heatmap,
+                          self.corr_matrix, self.single_column_combobox.get(), '#F4FAFD', self.color.get() + 's')
 
 
-        # Business Frame
+        # Business, Inventory and Relationship Frames, filled when they are first shown in fast start mode
         self.business_frame = ttk.Frame(self.master, style='Other.TFrame')
         # self.business_frame.pack(fill='both', expand=True)
+        self.inventory_frame = ttk.Frame(self.master, style='Other.TFrame')
+        # self.inventory_frame.pack(fill='both', expand=True)
+        self.relationship_frame = ttk.Frame(self.master, style='Other.TFrame')
+        # self.relationship_frame.pack(fill='both', expand=True)
+        self.built_frames = set()
+        if not fast_start:
+            self.build_business_frame()
+            self.build_inventory_frame()
+            self.build_relationship_frame()
+
+    def build_business_frame(self):
+        # Fill the Business Frame the first time it is shown
+        if 'business' in self.built_frames:
+            return
+        self.built_frames.add('business')
         # Sidebar for Business Frame
         self.business_sidebar = ttk.Frame(self.business_frame, style='Other.TFrame')
         self.business_sidebar.grid(column=0, row=0, sticky='nsew', pady = 20)
@@ -214,6 +282,17 @@ class BusinessApp:
         self.business_y_axis_combobox.current(0)
         self.business_y_axis_combobox.pack(fill='x', padx=20, pady=3)
         self.business_y_axis_combobox.bind('<<ComboboxSelected>>', self.business_y_axis_change)
+        # Filter Comboboxes, one per indexed column
+        self.business_filter_comboboxes = {}
+        for dimension in self.business_query.dimensions:
+            ttk.Label(self.business_sidebar, text=f'Select {dimension}: ', style='Other.TLabel'
+                      ).pack(fill='x', padx=20)
+            combobox = ttk.Combobox(self.business_sidebar, state='readonly')
+            combobox['values'] = [ALL_VALUES] + [value for value in self.business_query.values(dimension) if value]
+            combobox.current(0)
+            combobox.pack(fill='x', padx=20, pady=3)
+            combobox.bind('<<ComboboxSelected>>', self.business_filter_change)
+            self.business_filter_comboboxes[dimension] = combobox
         # Spinbox inside Sidebar for Business Frame
         self.business_spinbox_default = StringVar(value='10')  # Set the default Value
         ttk.Label(self.business_sidebar, text='\nTop N Companies: ', style='Other.TLabel'
@@ -225,20 +304,20 @@ class BusinessApp:
         # Default Canvas for Business Frame
         self.business_canvas_frame = ttk.Frame(self.business_frame)
         self.business_canvas_frame.grid(column=1, row=0, sticky='nsew', pady = 20)
-        self.business_fig = bar_plot(self.business_x_axis_combobox.get(),
-                                     self.business_y_axis_combobox.get(),
-                                     int(self.business_n_companies_spinbox.get()), self.business_df,
-                                     self.style.lookup('Other.TFrame', 'background'),
-                                     self.color.get() + 's')
-        self.display_plot(self.business_canvas_frame, self.business_fig)
+        self.initial_plot(self.business_canvas_frame, 'business_fig', bar_plot,
+                          self.business_x_axis_combobox.get(), self.business_y_axis_combobox.get(),
+                          int(self.business_n_companies_spinbox.get()), self.business_cube,
+                          self.style.lookup('Other.TFrame', 'background'), self.color.get() + 's')
         # Save Button
         self.business_save= ttk.Button(self.business_sidebar, text="Save Plot",
                                        style='Other.TButton', command=self.save_plot)
         self.business_save.pack(fill='x', padx=20, pady=20)
 
-        # Inventory Frame
-        self.inventory_frame = ttk.Frame(self.master, style='Other.TFrame')
-        # self.inventory_frame.pack(fill='both', expand=True)
+    def build_inventory_frame(self):
+        # Fill the Inventory Frame the first time it is shown
+        if 'inventory' in self.built_frames:
+            return
+        self.built_frames.add('inventory')
         # Sidebar for Inventory Frame
         self.inventory_sidebar = ttk.Frame(self.inventory_frame, style='Other.TFrame')
         self.inventory_sidebar.grid(column=0, row=0, sticky='nsew', pady = 20)
@@ -262,20 +341,20 @@ class BusinessApp:
         # Default Canvas for Inventory Frame
         self.inventory_canvas_frame = ttk.Frame(self.inventory_frame)
         self.inventory_canvas_frame.grid(column=1, row=0, sticky='nsew', pady = 20)
-        self.inventory_fig = bar_plot(self.inventory_x_axis_combobox.get(),
-                                      'Number of inventory',
-                                      int(self.inventory_n_companies_spinbox.get()), self.inventory_df,
-                                      self.style.lookup('Other.TFrame', 'background'),
-                                      self.color.get() + 's')
-        self.display_plot(self.inventory_canvas_frame, self.inventory_fig)
+        self.initial_plot(self.inventory_canvas_frame, 'inventory_fig', bar_plot,
+                          self.inventory_x_axis_combobox.get(), 'Number of inventory',
+                          int(self.inventory_n_companies_spinbox.get()), self.inventory_cube,
+                          self.style.lookup('Other.TFrame', 'background'), self.color.get() + 's')
         # Save Button
         self.inventory_save = ttk.Button(self.inventory_sidebar, text="Save Plot",
                                          style='Other.TButton', command=self.save_plot)
         self.inventory_save.pack(fill='x', padx=20, pady=20)
 
-        # Relationship Frame
-        self.relationship_frame = ttk.Frame(self.master, style='Other.TFrame')
-        # self.relationship_frame.pack(fill='both', expand=True)
+    def build_relationship_frame(self):
+        # Fill the Relationship Frame the first time it is shown
+        if 'relationship' in self.built_frames:
+            return
+        self.built_frames.add('relationship')
         # Sidebar for Relationship Frame
         self.relationship_sidebar = ttk.Frame(self.relationship_frame, style='Other.TFrame')
         self.relationship_sidebar.grid(column=0, row=0, sticky='nsew', pady = 20)
@@ -304,11 +383,10 @@ class BusinessApp:
         # Default Canvas for Relationship Frame
         self.relationship_canvas_frame = ttk.Frame(self.relationship_frame)
         self.relationship_canvas_frame.grid(column=1, row=0, sticky='nsew', pady = 20)
-        self.relationship_fig = scatter_plot(self.relationship_x_axis_combobox.get(),
-                                             self.relationship_y_axis_combobox.get(), self.business_df,
-                                             self.style.lookup('Other.TFrame', 'background'),
-                                             self.style.lookup('Header.TFrame', 'background'))
-        self.display_plot(self.relationship_canvas_frame, self.relationship_fig)
+        self.initial_plot(self.relationship_canvas_frame, 'relationship_fig', scatter_plot,
+                          self.relationship_x_axis_combobox.get(), self.relationship_y_axis_combobox.get(),
+                          self.business_df, self.style.lookup('Other.TFrame', 'background'),
+                          self.style.lookup('Header.TFrame', 'background'))
         # Save Button
         self.relationship_save = ttk.Button(self.relationship_sidebar, text="Save Plot",
                                             style='Other.TButton', command=self.save_plot)
@@ -321,9 +399,8 @@ class BusinessApp:
         # Update the plot with the selected columns
         background_color = self.style.lookup('Other.TFrame', 'background')
         theme = self.color.get()
-        self.single_heatmap = single_column_heatmap(self.corr_matrix, single_column,
-                                                    background_color, theme + 's')
-        self.display_plot(self.single_heatmap_canvas_frame, self.single_heatmap)
+        self.request_plot(self.single_heatmap_canvas_frame, 'single_heatmap', single_column_heatmap,
+                          self.corr_matrix, single_column, background_color, theme + 's')
 
 
     def business_x_axis_change(self, event):
@@ -335,10 +412,10 @@ class BusinessApp:
         # Update the plot with the selected column
         background_color = self.style.lookup('Other.TFrame', 'background')
         bar_color = self.color.get() + 's'
-        self.business_fig = bar_plot(x_axis, y_axis, int(top_n), self.business_df,
-                                     background_color, bar_color)
-        self.current_fig = self.business_fig
-        self.display_plot(self.business_canvas_frame, self.business_fig)
+        data, filters = self.business_plot_data()
+        self.request_plot(self.business_canvas_frame, 'business_fig', bar_plot,
+                          x_axis, y_axis, int(top_n), data,
+                          background_color, bar_color, filters, current=True)
 
     def business_y_axis_change(self,event):
         # Get the x-axis and y-axis and top n companies request
@@ -349,10 +426,10 @@ class BusinessApp:
         # Update the plot with the selected column
         background_color = self.style.lookup('Other.TFrame', 'background')
         bar_color = self.color.get() + 's'
-        self.business_fig = bar_plot(x_axis, y_axis, int(top_n), self.business_df,
-                                     background_color, bar_color)
-        self.current_fig = self.business_fig
-        self.display_plot(self.business_canvas_frame, self.business_fig)
+        data, filters = self.business_plot_data()
+        self.request_plot(self.business_canvas_frame, 'business_fig', bar_plot,
+                          x_axis, y_axis, int(top_n), data,
+                          background_color, bar_color, filters, current=True)
 
     def business_n_companies_spinbox_change(self,event):
         # Get the x-axis and y-axis and top n companies request
@@ -363,10 +440,30 @@ class BusinessApp:
         # Update the plot with the changed spinbox
         background_color = self.style.lookup('Other.TFrame', 'background')
         bar_color = self.color.get() + 's'
-        self.business_fig = bar_plot(x_axis, y_axis, int(top_n), self.business_df,
-                                     background_color, bar_color)
-        self.current_fig = self.business_fig
-        self.display_plot(self.business_canvas_frame, self.business_fig)
+        data, filters = self.business_plot_data()
+        self.request_plot(self.business_canvas_frame, 'business_fig', bar_plot,
+                          x_axis, y_axis, int(top_n), data,
+                          background_color, bar_color, filters, current=True)
+
+    def business_filter_change(self, event):
+        # Get the x-axis and y-axis and top n companies request
+        x_axis = self.business_x_axis_combobox.get()
+        y_axis = self.business_y_axis_combobox.get()
+        top_n = self.business_n_companies_spinbox.get()
+
+        # Update the plot with the selected filters
+        background_color = self.style.lookup('Other.TFrame', 'background')
+        bar_color = self.color.get() + 's'
+        data, filters = self.business_plot_data()
+        self.request_plot(self.business_canvas_frame, 'business_fig', bar_plot,
+                          x_axis, y_axis, int(top_n), data,
+                          background_color, bar_color, filters, current=True)
+
+    def business_plot_data(self):
+        # The precomputed sums without filters, the indexed query with the (column, value) filters which are set
+        filters = tuple((dimension, combobox.get()) for dimension, combobox in self.business_filter_comboboxes.items()
+                        if combobox.get() != ALL_VALUES)
+        return (self.business_query if filters else self.business_cube), filters
 
     def inventory_x_axis_change(self, event):
         # Get the x-axis and y-axis and top n companies request
@@ -377,10 +474,9 @@ class BusinessApp:
         # Update the plot with the changed spinbox
         background_color = self.style.lookup('Other.TFrame', 'background')
         bar_color = self.color.get() + 's'
-        self.inventory_fig = bar_plot(x_axis, y_axis, int(top_n), self.inventory_df,
-                                      background_color, bar_color)
-        self.current_fig = self.inventory_fig
-        self.display_plot(self.inventory_canvas_frame, self.inventory_fig)
+        self.request_plot(self.inventory_canvas_frame, 'inventory_fig', bar_plot,
+                          x_axis, y_axis, int(top_n), self.inventory_cube,
+                          background_color, bar_color, current=True)
 
         # Display or Hide the spinbox
         if x_axis == 'Business Category':
@@ -400,10 +496,9 @@ class BusinessApp:
         # Update the plot with the changed spinbox
         background_color = self.style.lookup('Other.TFrame', 'background')
         bar_color = self.color.get() + 's'
-        self.inventory_fig = bar_plot (x_axis, y_axis, int(top_n), self.inventory_df,
-                                       background_color, bar_color)
-        self.current_fig = self.inventory_fig
-        self.display_plot(self.inventory_canvas_frame, self.inventory_fig)
+        self.request_plot(self.inventory_canvas_frame, 'inventory_fig', bar_plot,
+                          x_axis, y_axis, int(top_n), self.inventory_cube,
+                          background_color, bar_color, current=True)
 
     def relationship_draw_button(self):
         # Get the x-axis and y-axis of the relationship
@@ -414,11 +509,9 @@ class BusinessApp:
         background_color = self.style.lookup('Other.TFrame', 'background')
         bar_color = self.style.lookup('Header.TFrame', 'background')
         if x_axis != y_axis:
-            self.relationship_fig = scatter_plot(self.relationship_x_axis_combobox.get(),
-                                                 self.relationship_y_axis_combobox.get(),
-                                                 self.business_df, background_color, bar_color)
-            self.current_fig = self.relationship_fig
-            self.display_plot(self.relationship_canvas_frame, self.relationship_fig)
+            self.request_plot(self.relationship_canvas_frame, 'relationship_fig', scatter_plot,
+                              self.relationship_x_axis_combobox.get(), self.relationship_y_axis_combobox.get(),
+                              self.business_df, background_color, bar_color, current=True)
 
     def change_theme(self, event):
         # Get theme
@@ -486,64 +579,93 @@ class BusinessApp:
                                  font=('Times New Roman', 12))
             self.style.configure('Other.TButton', background='#dee2e6', relief='sunken')
 
-        # Re-display the Business fig
+        # Re-display the Business fig, unless the frame was not built yet
         background_color = self.style.lookup('Other.TFrame', 'background')
         bar_color = self.color.get() + 's'
         dot_color = self.style.lookup('Header.TFrame', 'background')
-        # Get the x-axis and y-axis and top n companies request
-        business_x_axis = self.business_x_axis_combobox.get()
-        business_y_axis = self.business_y_axis_combobox.get()
-        top_n = self.business_n_companies_spinbox.get()
-
-        # Update the plot with the changed spinbox
-        self.business_fig = bar_plot(business_x_axis, business_y_axis, int(top_n),
-                                     self.business_df, background_color, bar_color)
-        self.current_fig = self.business_fig
-        self.display_plot(self.business_canvas_frame, self.business_fig)
+        if 'business' in self.built_frames:
+            # Get the x-axis and y-axis and top n companies request
+            business_x_axis = self.business_x_axis_combobox.get()
+            business_y_axis = self.business_y_axis_combobox.get()
+            top_n = self.business_n_companies_spinbox.get()
+
+            # Update the plot with the changed spinbox
+            data, filters = self.business_plot_data()
+            self.request_plot(self.business_canvas_frame, 'business_fig', bar_plot,
+                              business_x_axis, business_y_axis, int(top_n),
+                              data, background_color, bar_color, filters, current=True)
 
         # Re-display the Inventory fig
-        # Get the x-axis and y-axis and top n companies request
-        inventory_x_axis = self.inventory_x_axis_combobox.get()
-        inventory_y_axis = 'Number of inventory'
-        top_n = self.inventory_n_companies_spinbox.get()
+        if 'inventory' in self.built_frames:
+            # Get the x-axis and y-axis and top n companies request
+            inventory_x_axis = self.inventory_x_axis_combobox.get()
+            inventory_y_axis = 'Number of inventory'
+            top_n = self.inventory_n_companies_spinbox.get()
 
-        # Update the plot with the changed spinbox
-        self.inventory_fig = bar_plot(inventory_x_axis, inventory_y_axis, int(top_n),
-                                      self.inventory_df, background_color, bar_color)
-        self.current_fig = self.inventory_fig
-        self.display_plot(self.inventory_canvas_frame, self.inventory_fig)
+            # Update the plot with the changed spinbox
+            self.request_plot(self.inventory_canvas_frame, 'inventory_fig', bar_plot,
+                              inventory_x_axis, inventory_y_axis, int(top_n),
+                              self.inventory_cube, background_color, bar_color, current=True)
 
         # Re-display the Relationship fig
-        # Get the x-axis and y-axis of the relationship
-        relationship_x_axis = self.relationship_x_axis_combobox.get()
-        relationship_y_axis = self.relationship_y_axis_combobox.get()
+        if 'relationship' in self.built_frames:
+            # Get the x-axis and y-axis of the relationship
+            relationship_x_axis = self.relationship_x_axis_combobox.get()
+            relationship_y_axis = self.relationship_y_axis_combobox.get()
 
-        # Update the plot with the changed spinbox
-        if relationship_x_axis != relationship_y_axis:
-            self.relationship_fig = scatter_plot(relationship_x_axis, relationship_y_axis,
-                                                 self.business_df, background_color, dot_color)
-            self.current_fig = self.relationship_fig
-            self.display_plot(self.relationship_canvas_frame, self.relationship_fig)
+            # Update the plot with the changed spinbox
+            if relationship_x_axis != relationship_y_axis:
+                self.request_plot(self.relationship_canvas_frame, 'relationship_fig', scatter_plot,
+                                  relationship_x_axis, relationship_y_axis,
+                                  self.business_df, background_color, dot_color, current=True)
 
         # Re-display the Heatmap fig
-        self.heatmap = heatmap(self.corr_matrix, background_color, theme + 's')
-        self.display_plot(self.heatmap_canvas_frame, self.heatmap)
+        self.request_plot(self.heatmap_canvas_frame, 'heatmap', heatmap,
+                          self.corr_matrix, background_color, theme + 's')
         # Re-display the single column Heatmap fig
         # Get the single column
         single_column = self.single_column_combobox.get()
-        self.single_heatmap = single_column_heatmap(self.corr_matrix, single_column,
-                                                    background_color, theme + 's')
-        self.display_plot(self.single_heatmap_canvas_frame, self.single_heatmap)
+        self.request_plot(self.single_heatmap_canvas_frame, 'single_heatmap', single_column_heatmap,
+                          self.corr_matrix, single_column, background_color, theme + 's')
+
+    def request_plot(self, frame, name, function, *args, current=False):
+        # Draw the figure in the background and show it when it is ready, unless a newer one was requested
+        def show(fig):
+            setattr(self, name, fig)
+            if current:
+                self.current_fig = fig
+            self.display_plot(frame, fig)
+        if current:
+            # The shown figure replaces the one a header click asked for
+            self.plot_worker.cancel(CURRENT_SLOT)
+        self.plot_worker.submit(str(frame), function, args, show)
+
+    def request_current(self, function, *args):
+        # Draw the figure saved by the Save button in the background, nothing is saved until it is ready
+        self.current_fig = None
+        def keep(fig):
+            self.current_fig = fig
+        self.plot_worker.submit(CURRENT_SLOT, function, args, keep)
+
+    def initial_plot(self, frame, name, function, *args):
+        # Draw the first figure of a frame, in the background in fast start mode
+        if self.fast_start:
+            self.request_plot(frame, name, function, *args)
+        else:
+            setattr(self, name, self.plot_view(function, *args))
+            self.display_plot(frame, getattr(self, name))
 
-    def display_plot(self, frame, fig):
-        # Clear the frame before displaying the new plot
-        for widget in frame.winfo_children():
-            widget.destroy()
+    def plot_view(self, function, *args):
+        # Draw the figure or reuse the one drawn for the same view and data
+        return self.figure_cache.plot(function, *args, version=self.data_version)
 
-        # Display the new plot
-        canvas = FigureCanvasTkAgg(fig, master=frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill='both', expand=True)
+    def display_plot(self, frame, fig):
+        # Display the new plot on the frame's canvas, releasing the figure it replaces
+        if self.canvas_manager is None:
+            # Matplotlib's Tk backend is only imported once there is a figure to show
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            self.canvas_manager = CanvasManager(FigureCanvasTkAgg, keep=self.figure_cache.holds)
+        self.canvas_manager.show(frame, fig)
 
     def click_infor(self, event):
         # Remove all the Frame
@@ -558,38 +680,42 @@ class BusinessApp:
         self.information_frame.pack_forget()
         self.inventory_frame.pack_forget()
         self.relationship_frame.pack_forget()
-        # Display the Frame we want
+        # Display the Frame we want, building it on the first visit
+        self.build_business_frame()
         self.business_frame.pack(fill='both', expand=True)
         # Current Fig
-        self.current_fig = bar_plot(self.business_x_axis_combobox.get(),
-                                    self.business_y_axis_combobox.get(),
-                                    int(self.business_n_companies_spinbox.get()),
-                                    self.business_df, 'white', self.color.get() + 's')
+        data, filters = self.business_plot_data()
+        self.request_current(bar_plot, self.business_x_axis_combobox.get(),
+                             self.business_y_axis_combobox.get(),
+                             int(self.business_n_companies_spinbox.get()),
+                             data, 'white', self.color.get() + 's', filters)
 
     def click_inventory(self, event):
         # Remove all the Frame
         self.information_frame.pack_forget()
         self.business_frame.pack_forget()
         self.relationship_frame.pack_forget()
-        # Display the Frame we want
+        # Display the Frame we want, building it on the first visit
+        self.build_inventory_frame()
         self.inventory_frame.pack(fill='both', expand=True)
         # Current Fig
-        self.current_fig = bar_plot(self.inventory_x_axis_combobox.get(),
-                                    'Number of inventory',
-                                    int(self.inventory_n_companies_spinbox.get()),
-                                    self.inventory_df, 'white', self.color.get() + 's')
+        self.request_current(bar_plot, self.inventory_x_axis_combobox.get(),
+                             'Number of inventory',
+                             int(self.inventory_n_companies_spinbox.get()),
+                             self.inventory_cube, 'white', self.color.get() + 's')
 
     def click_relationship(self, event):
         # Remove all the Frame
         self.information_frame.pack_forget()
         self.business_frame.pack_forget()
         self.inventory_frame.pack_forget()
-        # Display the Frame we want
+        # Display the Frame we want, building it on the first visit
+        self.build_relationship_frame()
         self.relationship_frame.pack(fill='both', expand=True)
         # Current Fig
-        self.current_fig = scatter_plot(self.relationship_x_axis_combobox.get(),
-                                        self.relationship_y_axis_combobox.get(),
-                                        self.business_df, 'white', 'skyblue')
+        self.request_current(scatter_plot, self.relationship_x_axis_combobox.get(),
+                             self.relationship_y_axis_combobox.get(),
+                             self.business_df, 'white', 'skyblue')
 
     def save_plot(self):
         if self.current_fig:
@@ -603,3 +729,8 @@ class BusinessApp:
             )
             if file_path:
                 self.current_fig.savefig(file_path)
+
+    def close(self):
+        # Cancel the pending plot requests and stop the worker thread, then close the window
+        self.plot_worker.shutdown()
+        self.master.destroy()
@@ -0,0 +1,523 @@
+"""
+Strong/Sizhi Chen
+CS 5001, Fall 2024
+Final Project -- benchmark.py
+
+Benchmark Suite for the Cleaning, Object Building and Plotting Hot Paths
+
+This script times the hot paths of the project on synthetic data of any size, saves the results as JSON and
+compares them against a saved baseline, so an optimization can be measured and a regression is caught.
+
+Key Features:
+1. **Synthetic Data**:
+   - Generators for the raw business licence and storefront inventory exports and for the cleaned
+     `business_cleaned.csv` / `inventory_cleaned.csv`, with the same columns and realistic value mixes
+     (repeated business names, chain names of the mappings, filtered statuses and years), from 10k to 10M rows.
+
+2. **Benchmark Groups**:
+   - `clean`: reading the exports and every stage of `business_stages` and `inventory_stages` of `data_clean`.
+   - `build`: every builder of `data_dashboard` (`initial_business_class`, `add_*_business`, `find_inventory`,
+     `add_inventory_business`, ...) and the `summary` DataFrames which replace them.
+   - `objects`: the methods of `Business` and `Inventory`, called once per row or per object.
+   - `plot`: every function of `plot.py` on the Agg backend.
+
+3. **Measurements**:
+   - Median and best wall time over the repeats, and, from one extra run under `tracemalloc`, the peak memory
+     and the memory and number of blocks still allocated by the call.
+
+4. **Baseline Comparison**:
+   - Results are saved as JSON. With `--baseline`, every benchmark which is slower than the baseline by more than
+     the threshold is reported and the script exits with status 1.
+
+Usage:
+- `python benchmark.py --sizes 10000 100000 --output results.json`
+- `python benchmark.py --sizes 10000 --save-baseline benchmark_baseline.json`
+- `python benchmark.py --sizes 10000 --baseline benchmark_baseline.json --threshold 0.2`
+"""
+
+
+# Import modules
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
+from data_clean import (read_csv_to_dataframe, business_stages, inventory_stages, BUSINESS_TEXT_DTYPES,
+                        BUSINESS_YEAR_ANALYSIS, INVENTORY_YEAR_ANALYSIS, TRADE_NAME_MAPPINGS)
+from data_dashboard import (initial_business_class, add_type_business, add_address_business, add_employees_business,
+                            add_register_fee_business, add_inventory_business, initial_inventory_class,
+                            add_type_inventory, add_address_inventory, find_inventory)
+from summary import build_business_summary, build_inventory_summary, INVENTORY_THRESHOLD
+from aggregate_cube import AggregateCube
+from correlation import CorrelationMatrix
+from plot import bar_plot, scatter_plot, heatmap, single_column_heatmap
+
+
+# Set constants
+SIZES = [10000]
+GROUPS = ['clean', 'build', 'objects', 'plot']
+REPEATS = 3
+REGRESSION_THRESHOLD = 0.2
+SEED = 0
+BUSINESS_TYPES = ['Office', 'Retail Dealer', 'Restaurant Class 1', 'Health Services', 'Personal Services',
+                  'Contractor', 'Financial Institution', 'Liquor Retail Store', 'Ltd Service Food Establishment',
+                  'Beauty Services', 'Physical Therapist', 'Computer Services']
+RETAIL_CATEGORIES = ['Convenience Goods', 'Food & Beverage', 'Personal Services', 'Comparison Goods',
+                     'Financial Services', 'Health & Fitness']
+LOCAL_AREAS = ['Downtown', 'Kitsilano', 'West End', 'Mount Pleasant', 'Fairview', 'Riley Park', 'Sunset',
+               'Hastings-Sunrise', 'Kensington-Cedar Cottage', 'Marpole', 'Dunbar-Southlands', 'Killarney']
+STREETS = ['W 4TH AVENUE', 'DAVIE ST', 'CAMBIE ST', 'MAIN ST', 'COMMERCIAL DR', 'GRANVILLE ST', 'W BROADWAY',
+           'ROBSON ST', 'KINGSWAY', 'FRASER ST', 'DUNBAR ST', 'VICTORIA DRIVE']
+MEASURES = ['Number of Store', 'Number of Employees', 'Number of Inventory', 'Total Register Fee']
+
+
+# Synthetic data
+def business_names(rng, rows, distinct):
+    """
+    Draws business names with a skewed frequency, so a few businesses have many stores like the real data.
+    About 5% of the rows are chain names which the name mappings of `data_clean` rewrite.
+
+    Parameters:
+        rng (Generator): The random generator.
+        rows (int): The number of names.
+        distinct (int): The number of distinct generated names.
+    Returns:
+        np.ndarray: The names, as an object array.
+    """
+    ids = (distinct * rng.random(rows) ** 3).astype(np.int64)
+    names = ('Business ' + pd.Series(ids).astype(str)).to_numpy(dtype=object)
+    chains = rng.random(rows) < 0.05
+    chain_names = np.array([search + ' #' for search, _ in TRADE_NAME_MAPPINGS], dtype=object)
+    names[chains] = chain_names[rng.integers(0, len(chain_names), chains.sum())] + \
+        pd.Series(rng.integers(1, 500, chains.sum())).astype(str).to_numpy(dtype=object)
+    return names
+
+
+def house_numbers(rng, rows):
+    """Returns random house numbers as text."""
+    return pd.Series(rng.integers(100, 9999, rows)).astype(str).to_numpy(dtype=object)
+
+
+def generate_raw_business(rows, seed=SEED):
+    """
+    Generates rows with the columns of the raw business licence export (read with sep=';').
+
+    Parameters:
+        rows (int): The number of rows.
+        seed (int): The seed of the random generator.
+    Returns:
+        DataFrame: The rows.
+    """
+    rng = np.random.default_rng(seed)
+    types = np.array(BUSINESS_TYPES + [kind + ' *Historic*' for kind in BUSINESS_TYPES[:3]], dtype=object)
+    names = business_names(rng, rows, max(rows // 4, 10))
+    return pd.DataFrame({
+        'FOLDERYEAR': rng.choice([BUSINESS_YEAR_ANALYSIS, BUSINESS_YEAR_ANALYSIS - 1], rows, p=[0.6, 0.4]),
+        'LicenceRSN': np.arange(rows),
+        'BusinessName': names,
+        'BusinessTradeName': np.where(rng.random(rows) < 0.5, names, ''),
+        'Status': rng.choice(['Issued', 'Gone Out of Business', 'Inactive', 'Pending'], rows,
+                             p=[0.7, 0.1, 0.1, 0.1]),
+        'BusinessType': types[rng.integers(0, len(types), rows)],
+        'BusinessSubType': rng.choice(['', 'Barrister & Solicitor', 'Insurance Company', 'Administration'], rows),
+        'Unit': np.where(rng.random(rows) < 0.2, house_numbers(rng, rows), ''),
+        'UnitType': np.where(rng.random(rows) < 0.2, 'Unit', ''),
+        'House': house_numbers(rng, rows),
+        'Street': np.array(STREETS, dtype=object)[rng.integers(0, len(STREETS), rows)],
+        'City': 'Vancouver',
+        'Province': rng.choice(['BC', 'British Columbia', 'AB'], rows, p=[0.6, 0.35, 0.05]),
+        'LocalArea': np.array(LOCAL_AREAS, dtype=object)[rng.integers(0, len(LOCAL_AREAS), rows)],
+        'NumberofEmployees': np.round(rng.lognormal(1, 1.2, rows)).astype(float),
+        'FeePaid': rng.choice([150.0, 250.0, 500.0, 1500.0], rows),
+        'Geom': ''})
+
+
+def generate_raw_inventory(rows, seed=SEED):
+    """
+    Generates rows with the columns of the raw storefront inventory export (read with sep=';').
+
+    Parameters:
+        rows (int): The number of rows.
+        seed (int): The seed of the random generator.
+    Returns:
+        DataFrame: The rows.
+    """
+    rng = np.random.default_rng(seed + 1)
+    names = business_names(rng, rows, max(rows // 2, 10))
+    names[rng.random(rows) < 0.05] = 'Vacant'
+    return pd.DataFrame({
+        'ID': np.arange(rows),
+        'Business name': names,
+        'Retail category': np.array(RETAIL_CATEGORIES, dtype=object)[rng.integers(0, len(RETAIL_CATEGORIES),
+                                                                                   rows)],
+        'Year recorded': rng.choice([INVENTORY_YEAR_ANALYSIS, INVENTORY_YEAR_ANALYSIS - 1], rows, p=[0.7, 0.3]),
+        'Geo Local Area': np.array(LOCAL_AREAS, dtype=object)[rng.integers(0, len(LOCAL_AREAS), rows)],
+        'Unit': np.where(rng.random(rows) < 0.2, house_numbers(rng, rows), ''),
+        'Civic number - Parcel': house_numbers(rng, rows),
+        'Street name - Parcel': np.array(STREETS, dtype=object)[rng.integers(0, len(STREETS), rows)]})
+
+
+def generate_business(rows, seed=SEED):
+    """
+    Generates rows with the columns of `business_cleaned.csv`.
+
+    Parameters:
+        rows (int): The number of rows.
+        seed (int): The seed of the random generator.
+    Returns:
+        DataFrame: The rows.
+    """
+    raw = generate_raw_business(rows, seed)
+    return pd.DataFrame({
+        'FOLDERYEAR': BUSINESS_YEAR_ANALYSIS,
+        'BusinessName': raw['BusinessName'].str.replace(r' #\d+$', '', regex=True),
+        'BusinessTradeName': raw['BusinessTradeName'],
+        'BusinessType': raw['BusinessType'].str.replace(' *Historic*', '', regex=False),
+        'BusinessSubType': '',
+        'Address': raw['House'] + ' ' + raw['Street'],
+        'City': raw['City'],
+        'LocalArea': raw['LocalArea'],
+        'NumberofEmployees': raw['NumberofEmployees'].clip(lower=1),
+        'FeePaid': raw['FeePaid']})
+
+
+def generate_inventory(rows, seed=SEED):
+    """
+    Generates rows with the columns of `inventory_cleaned.csv`.
+
+    Parameters:
+        rows (int): The number of rows.
+        seed (int): The seed of the random generator.
+    Returns:
+        DataFrame: The rows.
+    """
+    raw = generate_raw_inventory(rows, seed)
+    return pd.DataFrame({
+        'ID': raw['ID'],
+        'Business name': raw['Business name'].str.replace(r' #\d+$', '', regex=True),
+        'Retail category': raw['Retail category'],
+        'Geo Local Area': raw['Geo Local Area'],
+        'Address': raw['Civic number - Parcel'] + ' ' + raw['Street name - Parcel']})
+
+
+# Benchmark cases
+def stage_cases(group, prefix, df, stages):
+    """
+    Returns one case per cleaning stage, each run on the output of the stages before it.
+
+    Parameters:
+        group (str): The group of the cases.
+        prefix (str): The prefix of the case names, e.g. 'business'.
+        df (DataFrame): The input of the first stage.
+        stages (list): (function, kwargs) tuples of `data_clean`.
+    Returns:
+        list: (group, name, setup, function) cases.
+    """
+    cases = []
+    for number, (function, kwargs) in enumerate(stages, 1):
+        cases.append((group, f'{prefix}/{number:02d}_{function.__name__}',
+                      lambda df=df: (df.copy(),), lambda df, function=function, kwargs=kwargs: function(df, **kwargs)))
+        df = function(df, **kwargs)
+    return cases
+
+
+def clean_cases(size, folder):
+    """Returns the cases of the `clean` group, writing the synthetic exports to a folder."""
+    business_file = os.path.join(folder, f'business_{size}.csv')
+    inventory_file = os.path.join(folder, f'inventory_{size}.csv')
+    generate_raw_business(size).to_csv(business_file, sep=';', index=False)
+    generate_raw_inventory(size).to_csv(inventory_file, sep=';', index=False)
+    business_df = read_csv_to_dataframe(business_file, sep=';', dtype=BUSINESS_TEXT_DTYPES)
+    inventory_df = read_csv_to_dataframe(inventory_file, sep=';')
+    return ([('clean', 'business/00_read_csv_to_dataframe', lambda: (business_file,),
+              lambda path: read_csv_to_dataframe(path, sep=';', dtype=BUSINESS_TEXT_DTYPES)),
+             ('clean', 'inventory/00_read_csv_to_dataframe', lambda: (inventory_file,),
+              lambda path: read_csv_to_dataframe(path, sep=';'))] +
+            stage_cases('clean', 'business', business_df, business_stages()) +
+            stage_cases('clean', 'inventory', inventory_df, inventory_stages()))
+
+
+def business_objects(business_rows, inventory_found=None):
+    """Builds the Business objects of `data_dashboard`, with every attribute of the rows."""
+    businesses = initial_business_class(business_rows)
+    for add in (add_type_business, add_address_business, add_employees_business, add_register_fee_business):
+        add(businesses, business_rows)
+    if inventory_found is not None:
+        add_inventory_business(businesses, inventory_found)
+    return businesses
+
+
+def inventory_objects(inventory_rows):
+    """Builds the Inventory objects of `data_dashboard`, with every attribute of the rows."""
+    inventories = initial_inventory_class(inventory_rows)
+    add_type_inventory(inventories, inventory_rows)
+    add_address_inventory(inventories, inventory_rows)
+    return inventories
+
+
+def build_cases(business_df, inventory_df):
+    """Returns the cases of the `build` group."""
+    business_rows = business_df.fillna('').values.tolist()
+    inventory_rows = inventory_df.fillna('').values.tolist()
+    new_businesses = lambda: (initial_business_class(business_rows), business_rows)
+    new_inventories = lambda: (initial_inventory_class(inventory_rows), inventory_rows)
+    found = find_inventory(INVENTORY_THRESHOLD, inventory_objects(inventory_rows))
+    cases = [('build', 'initial_business_class', lambda: (business_rows,), initial_business_class)]
+    for add in (add_type_business, add_address_business, add_employees_business, add_register_fee_business):
+        cases.append(('build', add.__name__, new_businesses, add))
+    cases += [
+        ('build', 'initial_inventory_class', lambda: (inventory_rows,), initial_inventory_class),
+        ('build', 'add_type_inventory', new_inventories, add_type_inventory),
+        ('build', 'add_address_inventory', new_inventories, add_address_inventory),
+        ('build', 'find_inventory', lambda: (INVENTORY_THRESHOLD, inventory_objects(inventory_rows)), find_inventory),
+        ('build', 'add_inventory_business', lambda: (business_objects(business_rows), found), add_inventory_business),
+        ('build', 'build_inventory_summary', lambda: (inventory_df,), build_inventory_summary),
+        ('build', 'build_business_summary', lambda: (business_df, build_inventory_summary(inventory_df)),
+         build_business_summary)]
+    return cases
+
+
+def call_all(calls):
+    """Calls every (method, argument) pair, the loop of an object hot path."""
+    for method, argument in calls:
+        method(argument)
+
+
+def call_each(methods):
+    """Calls every bound method without arguments, the loop of a getter hot path."""
+    for method in methods:
+        method()
+
+
+def object_cases(business_df, inventory_df):
+    """Returns the cases of the `objects` group, one per method of `Business` and `Inventory`."""
+    business_rows = business_df.fillna('').values.tolist()
+    inventory_rows = inventory_df.fillna('').values.tolist()
+    found = find_inventory(INVENTORY_THRESHOLD, inventory_objects(inventory_rows))
+    inventory_addresses = [(name, inventory.address) for name, inventory in found.items()]
+
+    def row_calls(method, column, convert=None, rows=business_rows, new=initial_business_class):
+        """Returns a setup which binds the method of a fresh object to the value of every row."""
+        def setup():
+            objects = new(rows)
+            return ([(getattr(objects[line[1]], method), convert(line[column]) if convert else line[column])
+                     for line in rows],)
+        return setup
+
+    def business_inventory_calls():
+        businesses = initial_business_class(business_rows)
+        return ([(businesses[name].add_inventory, address) for name, address in inventory_addresses
+                 if name in businesses],)
+
+    def getters(objects, method):
+        return lambda: ([getattr(value, method) for value in objects.values()],)
+
+    businesses = business_objects(business_rows, found)
+    inventories = inventory_objects(inventory_rows)
+    cases = [
+        ('objects', 'Business.add_type', row_calls('add_type', 3), call_all),
+        ('objects', 'Business.add_address', row_calls('add_address', 5), call_all),
+        ('objects', 'Business.add_employee', row_calls('add_employee', 8, int), call_all),
+        ('objects', 'Business.add_register_fee', row_calls('add_register_fee', 9), call_all),
+        ('objects', 'Business.add_inventory', business_inventory_calls, call_all),
+        ('objects', 'Inventory.add_type', row_calls('add_type', 2, rows=inventory_rows, new=initial_inventory_class),
+         call_all),
+        ('objects', 'Inventory.add_address', row_calls('add_address', 4, rows=inventory_rows,
+                                                       new=initial_inventory_class), call_all)]
+    for method in ('get_main_business', 'get_number_store', 'get_number_employees', 'get_number_of_inventory',
+                   '__str__'):
+        cases.append(('objects', f'Business.{method}', getters(businesses, method), call_each))
+    for method in ('get_main_business', 'get_number_of_inventory', '__str__'):
+        cases.append(('objects', f'Inventory.{method}', getters(inventories, method), call_each))
+    return cases
+
+
+def plot_cases(business_df, inventory_df):
+    """Returns the cases of the `plot` group, drawing from the summaries of the synthetic rows."""
+    inventory_summary = build_inventory_summary(inventory_df)
+    business_summary = build_business_summary(business_df, inventory_summary)
+    business_cube = AggregateCube(business_summary)
+    corr_data = business_summary[MEASURES]
+    correlation = CorrelationMatrix(corr_data)
+    background = '#F4FAFD'
+    cases = [
+        ('plot', 'bar_plot', lambda: ('Business Name', 'Number of Employees', 10, business_summary, background,
+                                      'Blues'), bar_plot),
+        ('plot', 'bar_plot/cube', lambda: ('Business Name', 'Number of Employees', 10, business_cube, background,
+                                           'Blues'), bar_plot),
+        ('plot', 'bar_plot/inventory', lambda: ('Business Category', 'Number of inventory', 10, inventory_summary,
+                                                background, 'Blues'), bar_plot),
+        ('plot', 'scatter_plot', lambda: ('Number of Inventory', 'Number of Store', business_summary, background,
+                                          '#0279B1'), scatter_plot),
+        ('plot', 'heatmap', lambda: (corr_data, background, 'Blues'), heatmap),
+        ('plot', 'heatmap/correlation', lambda: (correlation, background, 'Blues'), heatmap),
+        ('plot', 'single_column_heatmap', lambda: (corr_data, 'Number of Store', background, 'Blues'),
+         single_column_heatmap)]
+    # Draw one heatmap before timing, so the first case does not include importing Matplotlib and Seaborn
+    heatmap(corr_data, background, 'Blues')
+    return cases
+
+
+# Measuring
+def measure(setup, function, repeats=REPEATS):
+    """
+    Times a function on fresh arguments and measures its memory in one extra run under `tracemalloc`.
+
+    Parameters:
+        setup (callable): Returns the argument tuple of one call. It is not timed.
+        function (callable): The function to benchmark.
+        repeats (int): The number of timed calls.
+    Returns:
+        dict: 'wall_s' (median seconds), 'wall_min_s' (best seconds), 'peak_bytes' (peak memory above the
+            memory before the call), 'retained_bytes' and 'retained_blocks' (memory and number of
+            allocations still held when the call returned, including its result).
+    """
+    times = []
+    for _ in range(repeats):
+        args = setup()
+        gc.collect()
+        start = time.perf_counter()
+        result = function(*args)
+        times.append(time.perf_counter() - start)
+        del result, args
+
+    args = setup()
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    result = function(*args)
+    after, peak = tracemalloc.get_traced_memory()
+    blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+    tracemalloc.stop()
+    del result, args
+    return {'wall_s': statistics.median(times), 'wall_min_s': min(times), 'peak_bytes': peak - before,
+            'retained_bytes': after - before, 'retained_blocks': blocks}
+
+
+def run_benchmarks(sizes=None, groups=None, repeats=REPEATS, log=print):
+    """
+    Runs the benchmark groups for every size.
+
+    Parameters:
+        sizes (list): The numbers of synthetic rows (default is `SIZES`).
+        groups (list): The groups to run (default is every one of `GROUPS`).
+        repeats (int): The number of timed calls per benchmark.
+        log (callable): Receives a line per benchmark, or None for no output.
+    Returns:
+        dict: Maps 'group/name@size' to the measurements of `measure`.
+    Raises:
+        ValueError: If a group is unknown or a size is not a positive integer.
+    """
+    sizes = sizes or SIZES
+    groups = groups or GROUPS
+    for group in groups:
+        if group not in GROUPS:
+            raise ValueError(f"Error: Unknown group '{group}', choose from {GROUPS}.")
+    for size in sizes:
+        if not isinstance(size, int) or size <= 0:
+            raise ValueError("Error: Every size must be a positive integer.")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as folder:
+        for size in sizes:
+            business_df = generate_business(size)
+            inventory_df = generate_inventory(max(size // 4, 10))
+            cases = []
+            if 'clean' in groups:
+                cases += clean_cases(size, folder)
+            if 'build' in groups:
+                cases += build_cases(business_df, inventory_df)
+            if 'objects' in groups:
+                cases += object_cases(business_df, inventory_df)
+            if 'plot' in groups:
+                cases += plot_cases(business_df, inventory_df)
+            for group, name, setup, function in cases:
+                key = f'{group}/{name}@{size}'
+                results[key] = measure(setup, function, repeats)
+                if log:
+                    log(f"{key:<58} {results[key]['wall_s'] * 1000:10.1f} ms "
+                        f"{results[key]['peak_bytes'] / 1024 ** 2:9.1f} MB peak")
+    return results
+
+
+# Baseline
+def save_results(results, path, repeats=REPEATS):
+    """Saves the results and the machine they were measured on as JSON."""
+    document = {'created': datetime.now().isoformat(timespec='seconds'), 'python': platform.python_version(),
+                'platform': platform.platform(), 'pandas': pd.__version__, 'numpy': np.__version__,
+                'repeats': repeats, 'results': results}
+    with open(path, 'w') as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+
+
+def load_results(path):
+    """Loads the results saved by `save_results`."""
+    with open(path) as f:
+        return json.load(f)['results']
+
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """
+    Compares the median wall times of the results with a baseline.
+
+    Parameters:
+        results (dict): The output of `run_benchmarks`.
+        baseline (dict): Earlier results, e.g. from `load_results`.
+        threshold (float): The allowed slowdown, e.g. 0.2 for 20%.
+    Returns:
+        list: (key, baseline seconds, seconds, ratio) tuples of every benchmark found in both, slowest first.
+            A ratio above 1 + threshold is a regression.
+    """
+    rows = []
+    for key, result in results.items():
+        if key in baseline and baseline[key]['wall_s'] > 0:
+            rows.append((key, baseline[key]['wall_s'], result['wall_s'], result['wall_s'] / baseline[key]['wall_s']))
+    return sorted(rows, key=lambda row: row[3], reverse=True)
+
+
+def main():
+    """
+    Runs the benchmarks given on the command line, saves them and compares them with a baseline.
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the cleaning, object building and plotting hot paths.')
+    parser.add_argument('--sizes', nargs='+', type=int, default=SIZES, help='numbers of synthetic rows')
+    parser.add_argument('--groups', nargs='+', default=GROUPS, choices=GROUPS, help='benchmark groups to run')
+    parser.add_argument('--repeats', type=int, default=REPEATS, help='timed calls per benchmark')
+    parser.add_argument('--output', default='benchmark_results.json', help='JSON file of the results')
+    parser.add_argument('--save-baseline', metavar='FILE', help='also save the results as the baseline')
+    parser.add_argument('--baseline', metavar='FILE', help='baseline to compare the results with')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help='allowed slowdown against the baseline, e.g. 0.2 for 20%%')
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.sizes, args.groups, args.repeats)
+    save_results(results, args.output, args.repeats)
+    print(f'Saved {len(results)} results to {args.output}.')
+    if args.save_baseline:
+        save_results(results, args.save_baseline, args.repeats)
+        print(f'Saved the baseline to {args.save_baseline}.')
+
+    if args.baseline:
+        rows = compare(results, load_results(args.baseline), args.threshold)
+        regressions = [row for row in rows if row[3] > 1 + args.threshold]
+        for key, before, after, ratio in rows:
+            flag = 'REGRESSION' if ratio > 1 + args.threshold else ''
+            print(f'{key:<58} {before * 1000:10.1f} ms -> {after * 1000:10.1f} ms  x{ratio:5.2f} {flag}')
+        print(f'{len(regressions)} of {len(rows)} benchmarks are more than {args.threshold:.0%} slower '
+              f'than {args.baseline}.')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -22,10 +22,21 @@ Key Features:
 4. **Comparison**:
    - Implements an equality method (`__eq__`) to compare two business objects based on their attributes.
 
+5. **Constant-Time Updates**:
+   - Keeps a hashed set of addresses, a running tally of types and a running employee total,
+     so adding rows to large chains does not rescan the lists.
+
+6. **Canonical Addresses**:
+   - Addresses are kept in the canonical form of `address.py`, the same form as the `Inventory` addresses.
+
 This class is designed to be used as part of a larger application for business and inventory analysis.
 """
 
 
+from collections import Counter
+from address import canonical_address
+
+
 class Business:
     """
     Represents a business entity in the City of Vancouver
@@ -77,6 +88,11 @@ class Business:
         self.employees = []
         self.inventory_list = []
         self.register_fee = 0
+        self._address_set = set()
+        self._type_count = Counter()
+        self._type_order = {}
+        self._main_type = None
+        self._employee_total = 0
 
     def add_type(self, business_type):
         """
@@ -87,17 +103,30 @@ class Business:
         if not isinstance(business_type, str):
             raise ValueError("Type must be a string.")
         self.type.append(business_type)
+        self._type_count[business_type] += 1
+        self._type_order.setdefault(business_type, len(self._type_order))
+        # Only the new type can overtake the current main type, ties go to the earlier type
+        if self._main_type is None:
+            self._main_type = business_type
+        else:
+            new_count = self._type_count[business_type]
+            main_count = self._type_count[self._main_type]
+            if (new_count > main_count or (new_count == main_count and
+                                           self._type_order[business_type] < self._type_order[self._main_type])):
+                self._main_type = business_type
 
     def add_address(self, address):
         """
-        Adds a store address to the business if it is not already present.
+        Adds a store address to the business if its canonical form is not already present.
 
         Args: address (str): The address of the store to add.
         """
         if not isinstance(address, str):
             raise ValueError("Address must be a string.")
-        if address.lower() not in self.address:
-            self.address.append(address.lower())
+        address = canonical_address(address)
+        if address not in self._address_set:
+            self._address_set.add(address)
+            self.address.append(address)
 
     def add_employee(self, employee):
         """
@@ -108,6 +137,7 @@ class Business:
         if not isinstance(employee, int) or employee <= 0:
             raise ValueError("Employee must be a positive integer.")
         self.employees.append(employee)
+        self._employee_total += employee
 
     def add_inventory(self, inventory):
         """
@@ -138,7 +168,7 @@ class Business:
         """
         if not self.type:
             return "Unknown"
-        return max(self.type, key=self.type.count)
+        return self._main_type
 
     def get_number_store(self):
         """
@@ -154,7 +184,7 @@ class Business:
 
         Returns: int: The total number of employees.
         """
-        return sum(self.employees)
+        return self._employee_total
 
     def get_number_of_inventory(self):
         """
@@ -0,0 +1,121 @@
+"""
+Strong/Sizhi Chen
+CS 5001, Fall 2024
+Final Project -- canvas_manager.py
+
+Persistent Plot Canvases for the GUI
+
+This script defines the `CanvasManager` class, which keeps one Matplotlib canvas per GUI frame and swaps the
+figure it shows, instead of destroying the frame's widgets and creating a new canvas on every update.
+
+Key Features:
+1. **One Canvas per Frame**:
+   - The Tk widget of a frame is created once and reused for every figure of the same size and resolution.
+
+2. **Rendered Figures**:
+   - A figure rendered off-screen by the `PlotWorker` is shown by copying its pixels to the canvas (a blit),
+     so the Tk thread does not rasterize it again. Other figures are drawn as before.
+
+3. **Explicit Release**:
+   - A replaced figure which is not kept elsewhere (e.g. by the `FigureCache`) and not shown in another frame
+     is cleared, so its artists are freed right away.
+"""
+
+
+class CanvasManager:
+    """
+    Keeps one Matplotlib canvas per frame and swaps the figure it shows.
+
+    Attributes:
+        canvas_class (type): The Matplotlib canvas class, e.g. `FigureCanvasTkAgg`.
+        keep (callable): Returns True for figures which must not be cleared when replaced.
+    Methods:
+        show(frame, fig): Shows a figure in a frame, reusing the frame's canvas.
+        figure(frame): Returns the figure shown in a frame.
+    """
+    def __init__(self, canvas_class, keep=None):
+        """
+        Initializes a manager without canvases.
+
+        Parameters:
+            canvas_class (type): The Matplotlib canvas class. Tk canvases are created with the frame as `master`.
+            keep (callable): Takes a figure and returns True if it is still used elsewhere,
+                e.g. `FigureCache.holds`. By default every replaced figure is cleared.
+        """
+        self.canvas_class = canvas_class
+        self.keep = keep
+        self._canvases = {}
+
+    def figure(self, frame):
+        """Returns the figure shown in a frame, or None."""
+        canvas = self._canvases.get(str(frame))
+        return canvas.figure if canvas is not None else None
+
+    def _blit_rendered(self, canvas, rendered):
+        """
+        Shows the pixels of a figure rendered off-screen by `plot_worker.render_figure`, if they fit the canvas.
+
+        Parameters:
+            canvas (FigureCanvas): The canvas of the frame, already showing the figure.
+            rendered (FigureCanvas): The canvas the figure had before it was attached.
+        Returns:
+            bool: True if the pixels were copied, False if the canvas still has to draw the figure.
+        """
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        # Only the Agg canvas of the worker belongs to this figure alone, the renderer of a frame canvas
+        # may already hold the pixels of another figure
+        if type(rendered) is not FigureCanvasAgg or getattr(rendered, 'renderer', None) is None:
+            return False
+        width, height = canvas.get_width_height(physical=True)
+        key = (width, height, canvas.figure.dpi)
+        # `_lastKey` is private to Matplotlib, without it the canvas draws the figure itself
+        if getattr(rendered, '_lastKey', None) != key:
+            return False
+        canvas.renderer, canvas._lastKey = rendered.renderer, key
+        canvas.blit()
+        return True
+
+    def _release(self, fig, frame_key):
+        """Clears a replaced figure unless it is kept elsewhere or shown in another frame."""
+        for key, canvas in self._canvases.items():
+            if key != frame_key and canvas.figure is fig:
+                return
+        if self.keep is not None and self.keep(fig):
+            return
+        fig.clear()
+
+    def show(self, frame, fig):
+        """
+        Shows a figure in a frame, reusing the canvas of the frame.
+
+        The canvas is only recreated when the figure has a different size or resolution than the shown one.
+        A figure rendered by the `PlotWorker` is copied instead of drawn again.
+
+        Parameters:
+            frame (Frame): The frame which holds the canvas.
+            fig (Figure): The figure to show.
+        """
+        key = str(frame)
+        canvas = self._canvases.get(key)
+        if canvas is not None and canvas.figure is fig:
+            return
+        is_tk = hasattr(self.canvas_class, 'get_tk_widget')
+        rendered = fig.canvas
+
+        if canvas is not None and canvas.figure.dpi == fig.dpi and \
+                tuple(canvas.figure.get_size_inches()) == tuple(fig.get_size_inches()):
+            old = canvas.figure
+            fig.set_canvas(canvas)
+            canvas.figure = fig
+            self._release(old, key)
+        else:
+            if canvas is not None:
+                self._release(canvas.figure, key)
+                if is_tk:
+                    canvas.get_tk_widget().destroy()
+            canvas = self.canvas_class(fig, master=frame) if is_tk else self.canvas_class(fig)
+            if is_tk:
+                canvas.get_tk_widget().pack(fill='both', expand=True)
+            self._canvases[key] = canvas
+        if not self._blit_rendered(canvas, rendered):
+            canvas.draw()
@@ -0,0 +1,150 @@
+"""
+Strong/Sizhi Chen
+CS 5001, Fall 2024
+Final Project -- correlation.py
+
+Precomputed Correlations for the Heatmaps
+
+This script defines the `CorrelationMatrix` class, which computes the correlations of the heatmaps once from
+running sums, so a theme or column change of the GUI only redraws the heatmap instead of calling `DataFrame.corr`.
+
+Key Features:
+1. **Running Sums**:
+   - Keeps the count, sums and sums of products of every pair of columns, over the rows where both values
+     are present, so the result matches `DataFrame.corr` with missing values.
+   - `update(rows)` adds appended rows to the sums without reading the earlier rows again.
+
+2. **Cached Result**:
+   - The matrix is computed from the sums on first use and kept until rows are added.
+
+3. **Spearman**:
+   - With `method='spearman'` the rows are kept, and their ranks (per column) are computed once per update
+     and cached.
+"""
+
+
+# Import modules
+import numpy as np
+import pandas as pd
+
+
+# Set constants
+CORRELATION_METHODS = ['pearson', 'spearman']
+
+
+def pairwise_sums(values):
+    """
+    Returns the running sums of the pairwise Pearson correlation of a block of rows.
+
+    Parameters:
+        values (np.ndarray): A 2D float array, one column per variable, NaN for missing values.
+    Returns:
+        tuple: (count, sum_x, sum_xx, sum_xy) matrices, where entry [i, j] only counts the rows in which
+            both column i and column j are present, and sum_x[i, j] / sum_xx[i, j] sum column i.
+    """
+    present = np.isfinite(values).astype(float)
+    filled = np.where(present > 0, values, 0.0)
+    return present.T @ present, filled.T @ present, (filled * filled).T @ present, filled.T @ filled
+
+
+def correlation_from_sums(count, sum_x, sum_xx, sum_xy):
+    """
+    Computes the Pearson correlation matrix from the output of `pairwise_sums`.
+
+    Returns:
+        np.ndarray: The correlations, NaN where a pair has fewer than two rows or no variance.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        covariance = count * sum_xy - sum_x * sum_x.T
+        variance = count * sum_xx - sum_x * sum_x
+        result = covariance / np.sqrt(variance * variance.T)
+    result[(count < 2) | ~np.isfinite(result)] = np.nan
+    return np.clip(result, -1.0, 1.0)
+
+
+class CorrelationMatrix:
+    """
+    Holds the correlations between the columns of a DataFrame, computed from running sums.
+
+    Attributes:
+        columns (Index): The correlated columns.
+        method (str): 'pearson' or 'spearman'.
+    Methods:
+        update(rows): Adds appended rows to the correlations.
+        matrix(): Returns the correlation matrix as a DataFrame.
+        corr(): Same as `matrix`, so it can stand in for the data of `DataFrame.corr`.
+    """
+    def __init__(self, data, method='pearson'):
+        """
+        Computes the running sums of the rows of a DataFrame.
+
+        Parameters:
+            data (DataFrame): The numeric columns to correlate, e.g. the measures of `business_df`.
+            method (str): 'pearson' (default) or 'spearman'.
+        Raises:
+            ValueError: If data is not a DataFrame or the method is unknown.
+        """
+        if not isinstance(data, pd.DataFrame):
+            raise ValueError("[CorrelationMatrix] Error: data must be a pandas DataFrame.")
+        if method not in CORRELATION_METHODS:
+            raise ValueError(f"[CorrelationMatrix] Error: method must be one of {CORRELATION_METHODS}.")
+        self.columns = data.columns
+        self.method = method
+        # Values are shifted by the means of the first rows, which keeps the sums of products small
+        self._shift = data.mean().fillna(0).to_numpy(dtype=float)
+        size = len(self.columns)
+        self._sums = [np.zeros((size, size)) for _ in range(4)]
+        self._count = 0
+        self._rows = [] if method == 'spearman' else None
+        self._ranks = None
+        self._matrix = None
+        self.update(data)
+
+    def __len__(self):
+        """Returns the number of rows added."""
+        return self._count
+
+    def update(self, rows):
+        """
+        Adds appended rows to the running sums.
+
+        Parameters:
+            rows (DataFrame): New rows with the same columns.
+        Raises:
+            ValueError: If rows is not a DataFrame or its columns differ.
+        """
+        if not isinstance(rows, pd.DataFrame):
+            raise ValueError("[CorrelationMatrix] Error: rows must be a pandas DataFrame.")
+        if list(rows.columns) != list(self.columns):
+            raise ValueError("[CorrelationMatrix] Error: rows must have the columns of the matrix.")
+        values = rows.to_numpy(dtype=float)
+        for total, part in zip(self._sums, pairwise_sums(values - self._shift)):
+            total += part
+        self._count += len(values)
+        if self._rows is not None:
+            self._rows.append(values)
+            self._ranks = None
+        self._matrix = None
+
+    def _spearman_sums(self):
+        """Returns the running sums of the ranks of every row, ranking them again only after an update."""
+        if self._ranks is None:
+            ranks = pd.DataFrame(np.vstack(self._rows)).rank().to_numpy()
+            self._ranks = pairwise_sums(ranks)
+        return self._ranks
+
+    def matrix(self):
+        """
+        Returns the correlation matrix, computing it only after an update.
+
+        Returns:
+            DataFrame: The correlations, indexed and labelled by the columns.
+        """
+        if self._matrix is None:
+            sums = self._sums if self.method == 'pearson' else self._spearman_sums()
+            self._matrix = pd.DataFrame(correlation_from_sums(*sums), index=self.columns, columns=self.columns)
+        return self._matrix
+
+    def corr(self):
+        """Returns the correlation matrix, see `matrix`."""
+        return self.matrix()
@@ -0,0 +1,192 @@
+"""
+Strong/Sizhi Chen
+CS 5001, Fall 2024
+Final Project -- data_cache.py
+
+Columnar Cache for the Cleaned Datasets
+
+This script stores the cleaned business and inventory data as Parquet files with an explicit schema next to the
+CSV files, and loads them back instead of re-parsing the CSV text when the Parquet file is up to date.
+
+Key Features:
+1. **Typed Schema**:
+   - Categorical `BusinessType`, `LocalArea` and `City`, integer employee counts and float fees,
+     instead of the float/object mixes inferred from the CSV text.
+
+2. **Automatic Preference**:
+   - `load_table` reads the Parquet file when it is newer than the CSV file and was saved with the same delimiter
+     and column types, and falls back to the CSV otherwise.
+
+3. **Optional Dependency**:
+   - Parquet needs `pyarrow`. Without it, nothing is cached and the CSV files are used as before.
+"""
+
+
+# Import modules
+import json
+import os
+from importlib.util import find_spec
+import pandas as pd
+
+
+# Set constants
+COLUMNAR_EXTENSION = '.parquet'
+COLUMNAR_METADATA_KEY = b'data_cache'
+BUSINESS_SCHEMA = {'FOLDERYEAR': 'int64', 'BusinessName': 'str', 'BusinessTradeName': 'str',
+                   'BusinessType': 'category', 'BusinessSubType': 'category', 'Address': 'str',
+                   'City': 'category', 'LocalArea': 'category', 'NumberofEmployees': 'int32',
+                   'FeePaid': 'float64'}
+INVENTORY_SCHEMA = {'ID': 'int64', 'Business name': 'str', 'Retail category': 'category',
+                    'Geo Local Area': 'category', 'Address': 'str'}
+
+
+def columnar_available():
+    """Returns True if `pyarrow` is installed, so Parquet files can be written and read."""
+    return find_spec('pyarrow') is not None
+
+
+def columnar_path(csv_file):
+    """
+    Returns the name of the columnar file which belongs to a CSV file.
+
+    Parameters:
+        csv_file (str): The name of the CSV file, e.g. 'business_cleaned.csv'.
+    Returns:
+        str: The name of the Parquet file, e.g. 'business_cleaned.parquet'.
+    """
+    if not isinstance(csv_file, str):
+        raise TypeError("Error: csv_file must be a string.")
+    return os.path.splitext(csv_file)[0] + COLUMNAR_EXTENSION
+
+
+def apply_schema(df, schema):
+    """
+    Converts the columns of a DataFrame to the types of a schema.
+
+    Text and categorical columns get '' for missing values, like the `fillna('')` of the loaders,
+    and numeric columns are parsed with missing values left as NaN.
+
+    Parameters:
+        df (DataFrame): The pandas DataFrame to convert.
+        schema (dict): The type of every column, e.g. `BUSINESS_SCHEMA`. Missing columns are ignored.
+    Returns:
+        DataFrame: A new DataFrame with the converted columns.
+    Raises:
+        ValueError: If an integer column has missing or non-numeric values.
+    """
+    if not isinstance(schema, dict):
+        raise TypeError("Error: schema must be a dict of column types.")
+    df = df.copy()
+    for column, column_type in schema.items():
+        if column not in df.columns:
+            continue
+        if column_type in ('str', 'category'):
+            df[column] = df[column].fillna('').astype(str).astype(column_type)
+        else:
+            values = pd.to_numeric(df[column].replace('', None), errors='coerce')
+            if column_type.startswith('int') and values.isna().any():
+                raise ValueError(f"Error: Column '{column}' has missing values and cannot be stored as {column_type}.")
+            df[column] = values.astype(column_type)
+    return df
+
+
+def type_name(column_type):
+    """Returns the name of a column type, e.g. 'str' for both `str` and 'str'."""
+    return column_type.__name__ if isinstance(column_type, type) else str(column_type)
+
+
+def save_table(df, csv_file, schema, sep=','):
+    """
+    Writes the columnar copy of a cleaned CSV file with the given schema.
+
+    The delimiter and the schema are stored in the metadata of the Parquet file, see `columnar_options`.
+
+    Parameters:
+        df (DataFrame): The cleaned data which was written to `csv_file`.
+        csv_file (str): The name of the CSV file the columnar copy belongs to.
+        schema (dict): The type of every column.
+        sep (str): The delimiter of the CSV file (default is ',').
+    Returns:
+        str: The name of the Parquet file, or None if `pyarrow` is not installed.
+    Raises:
+        IOError: If there is an error saving the file.
+    """
+    if not columnar_available():
+        print(f"pyarrow is not installed, skipping the columnar copy of {csv_file}.")
+        return None
+    import pyarrow
+    import pyarrow.parquet
+    output_file = columnar_path(csv_file)
+    options = {'sep': sep, 'schema': {column: type_name(column_type) for column, column_type in schema.items()}}
+    try:
+        table = pyarrow.Table.from_pandas(apply_schema(df, schema), preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[COLUMNAR_METADATA_KEY] = json.dumps(options).encode()
+        pyarrow.parquet.write_table(table.replace_schema_metadata(metadata), output_file)
+    except IOError as e:
+        raise IOError(f"Error: Failed to save the DataFrame to {output_file}. Reason: {e}")
+    return output_file
+
+
+def columnar_options(parquet_file):
+    """
+    Returns the delimiter and schema a columnar copy was saved with.
+
+    Parameters:
+        parquet_file (str): The name of the Parquet file.
+    Returns:
+        dict: The 'sep' and 'schema' entries written by `save_table`, or None if the file has none or cannot be read.
+    """
+    import pyarrow
+    import pyarrow.parquet
+    try:
+        metadata = pyarrow.parquet.read_schema(parquet_file).metadata or {}
+        return json.loads(metadata[COLUMNAR_METADATA_KEY])
+    except (IOError, KeyError, ValueError, pyarrow.ArrowException):
+        return None
+
+
+def is_columnar_fresh(csv_file, sep=',', dtype=None):
+    """
+    Checks whether the columnar copy of a CSV file can be read instead of the CSV file.
+
+    Parameters:
+        csv_file (str): The name of the CSV file.
+        sep (str): The delimiter the CSV file would be read with (default is ',').
+        dtype (dict): The column types the CSV file would be read with, or None for any.
+    Returns:
+        bool: True if both files exist, the columnar copy is not older than the CSV file,
+            and it was saved with the same delimiter and with these types for the columns in `dtype`.
+    """
+    parquet_file = columnar_path(csv_file)
+    if not columnar_available() or not os.path.exists(parquet_file) or not os.path.exists(csv_file):
+        return False
+    if os.path.getmtime(parquet_file) < os.path.getmtime(csv_file):
+        return False
+    options = columnar_options(parquet_file)
+    if options is None or options.get('sep') != sep:
+        return False
+    saved = options.get('schema', {})
+    return all(saved.get(column) == type_name(column_type) for column, column_type in (dtype or {}).items())
+
+
+def load_table(csv_file, schema=None, sep=','):
+    """
+    Loads a cleaned dataset, preferring its columnar copy when it is up to date.
+
+    Parameters:
+        csv_file (str): The name of the CSV file.
+        schema (dict): The type of every column, applied when the CSV file is parsed.
+            The columnar copy is only read if it was saved with the same types.
+        sep (str): The delimiter used in the CSV file (default is ',').
+    Returns:
+        DataFrame: The loaded pandas DataFrame.
+    Raises:
+        FileNotFoundError: If the CSV file is not found.
+    """
+    if is_columnar_fresh(csv_file, sep, schema):
+        return pd.read_parquet(columnar_path(csv_file))
+    df = pd.read_csv(csv_file, sep=sep)
+    if schema is not None:
+        df = apply_schema(df, schema)
+    return df
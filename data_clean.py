@@ -11,19 +11,34 @@ It performs the following tasks:
 1. Downloads business license and storefront inventory data in CSV format from specified URLs.
 2. Cleans and filters the business license dataset to retain relevant information for businesses in British Columbia with valid licenses.
 3. Cleans and filters the storefront inventory dataset to remove vacant or under-construction entries.
-4. Maps inconsistent business names to standardized names for consistency across datasets.
+4. Maps inconsistent business names to standardized names for consistency across datasets,
+   using one compiled `NameStandardizer` per mapping list, then the approved rows of the reviewed
+   `resolved_names.csv` written by `entity_resolution.py`.
 5. Combines relevant address fields into a single "Address" column for easier processing.
-6. Removes duplicates and outliers based on employee counts and other specified conditions.
-7. Saves the cleaned and processed data into new CSV files.
+6. Removes duplicates and outliers based on employee counts and other specified conditions, with the percentile
+   cuts of `outliers.py`, which can cut several columns and cut per group (e.g. per `BusinessType`).
+7. Saves the cleaned and processed data into new CSV files, plus typed Parquet copies for fast loading.
 
 The script includes a range of utility functions for handling data manipulations, such as filtering, column combination, and value standardization.
 """
 
 
 # Import module
+import gzip
+import json
+import os
+import shutil
+import time
+from concurrent.futures import FIRST_EXCEPTION, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from multiprocessing import get_context
 import requests
 import pandas as pd
 import numpy as np
+from name_standardizer import NameStandardizer
+from entity_resolution import load_approved_mapping, MAPPING_FILE
+from outliers import outlier_mask, remove_outliers, QuantileSketch, MIN_GROUP_SIZE
+from pipeline_cache import PipelineCache
+from data_cache import columnar_path, is_columnar_fresh, save_table, BUSINESS_SCHEMA, INVENTORY_SCHEMA
 
 
 # Set constants
@@ -32,6 +47,23 @@ INVENTORY_YEAR_ANALYSIS = 2023
 MIN_EMPLOYEES = 1
 LOWER_THRESHOLD = 0.1
 UPPER_THRESHOLD = 99.9
+OUTLIER_COLUMNS = ['NumberofEmployees']
+OUTLIER_GROUP_BY = None
+OUTLIER_MIN_GROUP_SIZE = MIN_GROUP_SIZE
+CHUNK_SIZE = 100000
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_RETRIES = 3
+DOWNLOAD_TIMEOUT = 60
+DOWNLOAD_STATE_EXTENSION = '.download.json'
+PART_EXTENSION = '.part'
+GZIP_MAGIC = b'\x1f\x8b'
+BUSINESS_RAW_COLUMNS = ['FOLDERYEAR', 'BusinessName', 'BusinessTradeName', 'Status', 'BusinessType',
+                        'BusinessSubType', 'Unit', 'UnitType', 'House', 'Street', 'City', 'Province',
+                        'LocalArea', 'NumberofEmployees', 'FeePaid']
+BUSINESS_TEXT_DTYPES = {column: str for column in ['BusinessName', 'BusinessTradeName', 'Unit', 'UnitType',
+                                                   'House', 'Street', 'City', 'LocalArea']}
+BUSINESS_COLUMNS = ['FOLDERYEAR', 'BusinessName', 'BusinessTradeName', 'BusinessType', 'BusinessSubType',
+                    'Address', 'City', 'LocalArea', 'NumberofEmployees', 'FeePaid']
 TRADE_NAME_MAPPINGS = [
     ('Subway', 'Subway'), ('Starbucks', 'Starbucks'), ('Tim Horton', 'Tim Hortons'),
     ('TD Canada Trust', 'TD Canada Trust'), ('Shoppers', 'Shoppers Drug Mart'),
@@ -93,37 +125,156 @@ INVENTORY_NAME_MAPPING = [('CIBC', 'Canadian Imperial Bank of Commerce'), ('Scot
                           ('Uncle Fatih\'s Pizza', 'Uncle Fatih\'s Pizza'), ('Suki’s', 'Suki\'s')]
 
 
-def download_and_save_csv(csv_url, output_file):
+def read_download_state(output_file):
     """
-    Fetches a CSV file from the given URL and saves it to the specified file.
+    Returns the saved URL, ETag and Last-Modified headers of a download, or an empty dict if there are none.
+
+    Parameters:
+        output_file (str): The name of the downloaded file.
+    Returns:
+        dict: The 'url', 'etag', 'last_modified' and 'complete' entries saved by `download_and_save_csv`.
+    """
+    try:
+        with open(output_file + DOWNLOAD_STATE_EXTENSION) as f:
+            return json.load(f)
+    except (IOError, ValueError):
+        return {}
+
+
+def download_headers(state, offset, have_output):
+    """
+    Builds the request headers which resume a partial download or skip an unchanged one.
+
+    Parameters:
+        state (dict): The saved state of the download, see `read_download_state`.
+        offset (int): The number of bytes already in the partial file.
+        have_output (bool): True if the complete file from an earlier download exists.
+    Returns:
+        dict: The request headers.
+    """
+    # Ask for the file as it is stored, so byte offsets match the partial file
+    headers = {'Accept-Encoding': 'identity'}
+    validator = state.get('etag') or state.get('last_modified')
+    if offset and validator:
+        headers['Range'] = f'bytes={offset}-'
+        # The server sends the whole file instead if it changed since the partial download
+        headers['If-Range'] = validator
+    elif have_output and state.get('complete'):
+        if state.get('etag'):
+            headers['If-None-Match'] = state['etag']
+        if state.get('last_modified'):
+            headers['If-Modified-Since'] = state['last_modified']
+    return headers
+
+
+def download_and_save_csv(csv_url, output_file, chunk_size=DOWNLOAD_CHUNK_SIZE, decompress=False,
+                          retries=DOWNLOAD_RETRIES, timeout=DOWNLOAD_TIMEOUT):
+    """
+    Streams a CSV file from the given URL to the specified file.
+
+    The response is written `chunk_size` bytes at a time to a '.part' file, which replaces `output_file` once it
+    is complete. A dropped connection is resumed with an HTTP Range request, both within the call (up to `retries`
+    times) and on the next call, when the server sent an ETag or Last-Modified header. The headers are saved next
+    to `output_file`, and the next download is skipped if the server answers 304 Not Modified. A '.part' file
+    which already holds the whole file (416 with the same size) is completed, and any other one is restarted.
 
     Parameters:
         csv_url (str): The URL of the CSV file to download.
         output_file (str): The name of the file to save the downloaded content.
+        chunk_size (int): The number of bytes read and written at a time.
+        decompress (bool): If True, a gzip-compressed download is decompressed chunk by chunk into `output_file`.
+        retries (int): The number of times a dropped connection is resumed before giving up.
+        timeout (float): The number of seconds to wait for the server.
+    Returns:
+        bool: True if the file was downloaded, False if it was unchanged.
     Raises:
         requests.exceptions.RequestException: If there is an error fetching the dataset.
         IOError: If there is an error saving the dataset to the file.
     """
-    try:
-        response = requests.get(csv_url)
-        response.raise_for_status()  # Raise HTTPError for bad responses
-    except requests.exceptions.RequestException as e:
-        raise requests.exceptions.RequestException(f"Error: Unable to fetch the dataset. Reason: {e}")
+    if not isinstance(chunk_size, int) or chunk_size <= 0:
+        raise TypeError("Error: chunk_size must be a positive integer.")
+    part_file = output_file + PART_EXTENSION
+    state = read_download_state(output_file)
+    if state.get('url') != csv_url:
+        state = {}
+    started = time.perf_counter()
+    received = 0
+    attempt = 0
+    while True:
+        offset = os.path.getsize(part_file) if os.path.exists(part_file) else 0
+        headers = download_headers(state, offset, os.path.exists(output_file))
+        try:
+            with requests.get(csv_url, headers=headers, stream=True, timeout=timeout) as response:
+                if response.status_code == 304:
+                    print(f"{output_file} is unchanged, skipping the download.")
+                    return False
+                if response.status_code == 416 and offset:
+                    if response.headers.get('Content-Range', '').rpartition('/')[2] == str(offset):
+                        # The partial file already holds the whole file
+                        break
+                    # The partial file does not match the file on the server, start over
+                    os.remove(part_file)
+                    state = {}
+                    continue
+                response.raise_for_status()  # Raise HTTPError for bad responses
+                if response.status_code != 206 or not response.headers.get('Content-Range', '').startswith(
+                        f'bytes {offset}-'):
+                    # The server sent the whole file
+                    offset = 0
+                state = {'url': csv_url, 'etag': response.headers.get('ETag'),
+                         'last_modified': response.headers.get('Last-Modified'), 'complete': False}
+                with open(output_file + DOWNLOAD_STATE_EXTENSION, 'w') as f:
+                    json.dump(state, f)
+                with open(part_file, 'ab' if offset else 'wb') as f:
+                    for chunk in response.iter_content(chunk_size):
+                        f.write(chunk)
+                        received += len(chunk)
+            break
+        except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError,
+                requests.exceptions.Timeout) as e:
+            attempt += 1
+            if attempt > retries:
+                raise requests.exceptions.RequestException(f"Error: Unable to fetch the dataset. Reason: {e}")
+            print(f"Connection to {csv_url} dropped, resuming the download ({attempt}/{retries}).")
+        except requests.exceptions.RequestException as e:
+            raise requests.exceptions.RequestException(f"Error: Unable to fetch the dataset. Reason: {e}")
+        except IOError as e:
+            raise IOError(f"Error: Failed to save the dataset to {output_file}. Reason: {e}")
 
     try:
-        with open(output_file, "wb") as f:
-            f.write(response.content)
+        with open(part_file, 'rb') as f:
+            is_gzip = f.read(len(GZIP_MAGIC)) == GZIP_MAGIC
+        if decompress and is_gzip:
+            # A gzip stream cannot be restarted in the middle, so the compressed bytes are kept
+            # in the partial file until the download is complete
+            with gzip.open(part_file, 'rb') as source, open(output_file, 'wb') as target:
+                shutil.copyfileobj(source, target, chunk_size)
+            os.remove(part_file)
+        else:
+            os.replace(part_file, output_file)
+        state['complete'] = True
+        with open(output_file + DOWNLOAD_STATE_EXTENSION, 'w') as f:
+            json.dump(state, f)
     except IOError as e:
         raise IOError(f"Error: Failed to save the dataset to {output_file}. Reason: {e}")
 
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    print(f"Downloaded {received / 1e6:.1f} MB to {output_file} in {elapsed:.1f} s "
+          f"({received / 1e6 / elapsed:.1f} MB/s).")
+    return True
+
 
-def read_csv_to_dataframe(filename, sep=','):
+def read_csv_to_dataframe(filename, sep=',', dtype=None):
     """
     Reads a CSV file into a pandas DataFrame.
 
+    If a columnar copy of the file (see `data_cache.columnar_path`) is newer than the CSV file and was saved with the
+    same `sep` and `dtype` (see `data_cache.is_columnar_fresh`), it is read instead.
+
     Parameters:
         filename (str): The name of the CSV file to read.
         sep (str): The delimiter used in the CSV file (default is ',').
+        dtype (dict): Optional column types, e.g. `BUSINESS_TEXT_DTYPES` so house numbers stay text.
     Returns:
         DataFrame: The loaded pandas DataFrame.
     Raises:
@@ -131,7 +282,9 @@ def read_csv_to_dataframe(filename, sep=','):
         Exception: If there is any other error while reading the file.
     """
     try:
-        df = pd.read_csv(filename, sep=sep)
+        if is_columnar_fresh(filename, sep, dtype):
+            return pd.read_parquet(columnar_path(filename))
+        df = pd.read_csv(filename, sep=sep, dtype=dtype)
         return df
     except FileNotFoundError as e:
         raise FileNotFoundError(f"FileNotFoundError: File {filename} not found. Reason: {e}")
@@ -324,6 +477,8 @@ def remove_outliers_by_column(df, column, lower_percentile=5, upper_percentile=9
     """
     Removes outliers from a DataFrame based on the values in a specified column.
 
+    Kept for the original public name, it is the one-column case of `outliers.remove_outliers`.
+
     Parameters:
         df (DataFrame): The pandas DataFrame to process.
         column (str): The name of the column to use for outlier detection.
@@ -335,9 +490,7 @@ def remove_outliers_by_column(df, column, lower_percentile=5, upper_percentile=9
         KeyError: If the specified column does not exist in the DataFrame.
     """
     try:
-        lower_bound = np.percentile(df[column], lower_percentile)
-        upper_bound = np.percentile(df[column], upper_percentile)
-        return df[(df[column] >= lower_bound) & (df[column] <= upper_bound)]
+        return remove_outliers(df, [column], lower_percentile, upper_percentile)
     except KeyError as e:
         raise KeyError(f"Error: The specified column does not exist in the DataFrame. Reason: {e}")
 
@@ -346,6 +499,9 @@ def update_values_based_on_mapping(df, search_column, change_column, mapping_lis
     """
     Updates values in one column based on matches in another column using a list of mapping rules.
 
+    All rules are compiled into one `NameStandardizer`, so every distinct value is scanned once
+    instead of once per rule, with the same result as applying the rules in order.
+
     Parameters:
         df (DataFrame): The pandas DataFrame to modify.
         search_column (str): The column to search for matching strings.
@@ -358,15 +514,8 @@ def update_values_based_on_mapping(df, search_column, change_column, mapping_lis
         KeyError: If search_column or change_column does not exist in the DataFrame.
     """
     try:
-        if not isinstance(mapping_list, list) or not all(isinstance(item, tuple) and len(item) == 2 for item in mapping_list):
-            raise TypeError("Error: mapping_list must be a list of tuples with two elements each.")
-
-        for old_name, new_name in mapping_list:
-            if not isinstance(old_name, str) or not isinstance(new_name, str):
-                raise TypeError("Error: Both old_name and new_name must be strings.")
-            df.loc[df[search_column].str.contains(old_name, case=False, na=False), change_column] = new_name
-
-        return df
+        standardizer = NameStandardizer(mapping_list)
+        return standardizer.apply(df, search_column, change_column)
     except KeyError as e:
         raise KeyError(f"Error: One or more specified columns do not exist in the DataFrame. Reason: {e}")
 
@@ -389,23 +538,377 @@ def update_column_with_direct_names(df, column_list, names_list):
         if not isinstance(names_list, list):
             raise TypeError("Error: names_list must be a list.")
 
-        for name in names_list:
-            for column in column_list:
-                df.loc[df[column].str.contains(name, case=False, na=False), column] = name
+        standardizer = NameStandardizer([(name, name) for name in names_list])
+        for column in column_list:
+            df = standardizer.apply(df, column, column)
+        return df
+    except KeyError as e:
+        raise KeyError(f"Error: One or more specified columns do not exist in the DataFrame. Reason: {e}")
 
+
+def update_values_with_exact_names(df, search_columns, change_column, mapping_list):
+    """
+    Updates values in one column when another column equals the old name of a mapping rule exactly.
+
+    Parameters:
+        df (DataFrame): The pandas DataFrame to modify.
+        search_columns (list): The columns to look up, a match in a later column wins.
+        change_column (str): The column where values will be updated.
+        mapping_list (list of tuples): A list of tuples where each tuple contains (old_value, new_value).
+    Returns:
+        DataFrame: The updated DataFrame with mapped values.
+    Raises:
+        KeyError: If a search column or the change column does not exist in the DataFrame.
+    """
+    try:
+        lookup = dict(mapping_list)
+        for column in search_columns:
+            new_values = df[column].map(lookup)
+            changed = new_values.notna().to_numpy(dtype=bool)
+            if changed.any():
+                df.loc[changed, change_column] = new_values.to_numpy()[changed]
         return df
     except KeyError as e:
         raise KeyError(f"Error: One or more specified columns do not exist in the DataFrame. Reason: {e}")
 
 
-def main():
+def drop_duplicate_rows(df):
+    """
+    Drops rows which are exact duplicates of an earlier row.
+
+    Parameters:
+        df (DataFrame): The pandas DataFrame to process.
+    Returns:
+        DataFrame: A new DataFrame without duplicate rows.
+    """
+    return df.drop_duplicates()
+
+
+def fill_missing_values(df, value=''):
+    """
+    Replaces every missing value of a DataFrame.
+
+    Parameters:
+        df (DataFrame): The pandas DataFrame to process.
+        value (str): The value to put in place of missing values (default is '').
+    Returns:
+        DataFrame: A new DataFrame without missing values.
+    """
+    return df.fillna(value)
+
+
+def run_stages(df, stages):
+    """
+    Runs a list of cleaning stages one after the other.
+
+    Parameters:
+        df (DataFrame): The input of the first stage.
+        stages (list): (function, kwargs) tuples, each function taking the DataFrame as its first argument.
+    Returns:
+        DataFrame: The output of the last stage.
+    """
+    for function, kwargs in stages:
+        df = function(df, **kwargs)
+    return df
+
+
+def business_row_stages():
+    """
+    Returns the business licence cleaning stages which only look at one row at a time.
+
+    The same stages run on the whole file in `main` and on every chunk in `clean_business_file_in_chunks`.
+    They keep the rows of BC businesses with an issued licence in `BUSINESS_YEAR_ANALYSIS` and at least
+    `MIN_EMPLOYEES` employees, reduced to `BUSINESS_COLUMNS` with missing values replaced by ''.
+
+    Returns:
+        list: (function, kwargs) tuples.
+    """
+    return [
+        (drop_na_columns, {'required_columns': ['BusinessName']}),
+        (filter_dataframe_by_list, {'column': 'Province', 'value': ['BC', 'British Columbia']}),
+        (filter_dataframe_by_str, {'column': 'Status', 'value': 'Issued', 'contain': True}),
+        (filter_dataframe_by_int, {'column': 'NumberofEmployees', 'value': MIN_EMPLOYEES, 'condition': 'min'}),
+        (filter_dataframe_by_int, {'column': 'FOLDERYEAR', 'value': BUSINESS_YEAR_ANALYSIS, 'condition': 'equal'}),
+        (strip_column_values, {'column': 'BusinessType', 'string_to_strip': ' *Historic*'}),
+        (strip_column_values, {'column': 'BusinessSubType', 'string_to_strip': ' *Historic*'}),
+        (combine_columns_to_new_column, {'list_columns': ['Unit', 'UnitType', 'House', 'Street'],
+                                         'new_column': 'Address'}),
+        (select_columns, {'columns': BUSINESS_COLUMNS}),
+        (fill_missing_values, {'value': ''})]
+
+
+def business_name_stages():
+    """
+    Returns the business name mapping stages, which only look at one row at a time.
+
+    The reviewed and approved rows of `MAPPING_FILE` from `entity_resolution.py` run last, when the file exists.
+    Every row only looks up the column of its `Source`, so a trade name never renames a matching business name.
+
+    Returns:
+        list: (function, kwargs) tuples.
+    """
+    resolved_names = load_approved_mapping(MAPPING_FILE)
+    resolved_stages = []
+    for column in ['BusinessTradeName', 'BusinessName']:
+        if resolved_names.get(column):
+            resolved_stages.append((update_values_with_exact_names,
+                                    {'search_columns': [column], 'change_column': 'BusinessName',
+                                     'mapping_list': resolved_names[column]}))
+    return [
+        (update_values_based_on_mapping, {'search_column': 'BusinessTradeName', 'change_column': 'BusinessName',
+                                          'mapping_list': TRADE_NAME_MAPPINGS}),
+        (update_values_based_on_mapping, {'search_column': 'BusinessName', 'change_column': 'BusinessName',
+                                          'mapping_list': TRADE_NAME_MAPPINGS}),
+        (update_column_with_direct_names, {'column_list': ['BusinessTradeName', 'BusinessName'],
+                                           'names_list': DIRECT_NAMES})] + resolved_stages
+
+
+def business_stages():
+    """
+    Returns every business licence cleaning stage after reading the export.
+
+    Returns:
+        list: (function, kwargs) tuples.
+    """
+    return (business_row_stages() +
+            [(drop_duplicate_rows, {}),
+             (remove_outliers, {'columns': OUTLIER_COLUMNS, 'lower_percentile': LOWER_THRESHOLD,
+                                'upper_percentile': UPPER_THRESHOLD, 'group_by': OUTLIER_GROUP_BY,
+                                'min_group_size': OUTLIER_MIN_GROUP_SIZE})] +
+            business_name_stages())
+
+
+def inventory_stages():
+    """
+    Returns every storefront inventory cleaning stage after reading the export.
+
+    Returns:
+        list: (function, kwargs) tuples.
+    """
+    return [
+        (combine_columns_to_new_column, {'list_columns': ['Unit', 'Civic number - Parcel', 'Street name - Parcel'],
+                                         'new_column': 'Address'}),
+        (filter_dataframe_by_str, {'column': 'Business name', 'value': 'Vacant', 'contain': False}),
+        (filter_dataframe_by_str, {'column': 'Business name', 'value': 'Vacant UC', 'contain': False}),
+        (filter_dataframe_by_int, {'column': 'Year recorded', 'value': INVENTORY_YEAR_ANALYSIS,
+                                   'condition': 'equal'}),
+        (select_columns, {'columns': ['ID', 'Business name', 'Retail category', 'Geo Local Area', 'Address']}),
+        (update_values_based_on_mapping, {'search_column': 'Business name', 'change_column': 'Business name',
+                                          'mapping_list': INVENTORY_NAME_MAPPING})]
+
+
+def run_pipeline(source_file, reader, stages, cache=None):
+    """
+    Reads a source file and runs the cleaning stages on it, through a `PipelineCache` if one is given.
+
+    Parameters:
+        source_file (str): The raw export to clean.
+        reader (tuple): The (function, kwargs) stage which reads the export.
+        stages (list): The (function, kwargs) stages which follow the reader.
+        cache (PipelineCache): The stage cache, or None to run every stage.
+    Returns:
+        DataFrame: The cleaned data.
+    """
+    if cache is not None:
+        return cache.run(source_file, reader, stages)
+    return run_stages(reader[0](source_file, **reader[1]), stages)
+
+
+def clean_business_rows(business_df):
+    """
+    Applies the `business_row_stages` to raw rows of the business licence export.
+
+    Parameters:
+        business_df (DataFrame): Raw rows of the business licence export.
+    Returns:
+        DataFrame: The cleaned rows.
+    """
+    return run_stages(business_df, business_row_stages())
+
+
+def standardize_business_names(business_df):
+    """
+    Applies the `business_name_stages` to cleaned business licence rows.
+
+    Parameters:
+        business_df (DataFrame): Cleaned business licence rows.
+    Returns:
+        DataFrame: The rows with standardized `BusinessName` and `BusinessTradeName`.
+    """
+    return run_stages(business_df, business_name_stages())
+
+
+def clean_business_file_in_chunks(filename, output_file, sep=';', chunksize=CHUNK_SIZE, relative_accuracy=None):
+    """
+    Cleans the business licence export chunk by chunk, so peak memory depends on `chunksize` instead of the file size.
+
+    Workflow:
+    1. First pass over the export:
+       - Applies `clean_business_rows` to every chunk, reading only `BUSINESS_RAW_COLUMNS`.
+       - Removes duplicates with a global set of 64-bit row hashes.
+       - Spools the kept rows to a temporary file and adds the `OUTLIER_COLUMNS` to a `QuantileSketch`.
+    2. Computes the `LOWER_THRESHOLD` and `UPPER_THRESHOLD` percentiles of every `OUTLIER_GROUP_BY` group
+       from the sketch.
+    3. Second pass over the spooled rows:
+       - Removes the outliers, standardizes the names and appends the chunk to `output_file`.
+
+    The output has the same rows as the whole-file cleaning in `main`. The hash set grows with the number of
+    kept rows, which is a small fraction of the export.
+
+    Parameters:
+        filename (str): The business licence export to clean.
+        output_file (str): The name of the cleaned CSV file to write.
+        sep (str): The delimiter used in the export (default is ';').
+        chunksize (int): The number of rows read at a time.
+        relative_accuracy (float): If given, the percentiles come from logarithmic bins within this relative
+            error instead of the exact counts of every distinct value, e.g. 0.01 for 1%.
+    Returns:
+        int: The number of rows written to `output_file`.
+    Raises:
+        FileNotFoundError: If the export is not found.
+    """
+    if not isinstance(chunksize, int) or chunksize <= 0:
+        raise TypeError("Error: chunksize must be a positive integer.")
+    spool_file = output_file + '.spool'
+    seen_rows = set()
+    sketch = QuantileSketch(OUTLIER_COLUMNS, OUTLIER_GROUP_BY, relative_accuracy)
+    try:
+        reader = pd.read_csv(filename, sep=sep, usecols=BUSINESS_RAW_COLUMNS, dtype=BUSINESS_TEXT_DTYPES,
+                             chunksize=chunksize)
+        header = True
+        for chunk in reader:
+            chunk = clean_business_rows(chunk)
+            # Keep the dtypes of every chunk the same as the whole file would have
+            chunk = chunk.astype({'FOLDERYEAR': 'int64', 'NumberofEmployees': 'float64'})
+            hashes = pd.util.hash_pandas_object(chunk.astype(str), index=False).to_numpy()
+            keep = ~pd.Series(hashes).duplicated().to_numpy()
+            keep &= np.fromiter((row_hash not in seen_rows for row_hash in hashes), dtype=bool, count=len(hashes))
+            seen_rows.update(hashes[keep].tolist())
+            chunk = chunk[keep]
+            sketch.update(chunk)
+            chunk.to_csv(spool_file, mode='w' if header else 'a', header=header, index=False)
+            header = False
+    except FileNotFoundError as e:
+        raise FileNotFoundError(f"FileNotFoundError: File {filename} not found. Reason: {e}")
+
+    rows = 0
+    try:
+        if header:
+            pd.DataFrame(columns=BUSINESS_COLUMNS).to_csv(output_file, index=False)
+            return rows
+        bounds = sketch.bounds(LOWER_THRESHOLD, UPPER_THRESHOLD, OUTLIER_MIN_GROUP_SIZE)
+        header = True
+        for chunk in pd.read_csv(spool_file, chunksize=chunksize, keep_default_na=False,
+                                 dtype={'NumberofEmployees': 'float64'}):
+            chunk = chunk[outlier_mask(chunk, OUTLIER_COLUMNS, bounds, OUTLIER_GROUP_BY)]
+            chunk = standardize_business_names(chunk.copy())
+            chunk.to_csv(output_file, mode='w' if header else 'a', header=header, index=False)
+            header = False
+            rows += len(chunk)
+    finally:
+        if os.path.exists(spool_file):
+            os.remove(spool_file)
+    return rows
+
+
+def clean_business_file(source_file, use_cache=False, streaming=False):
+    """
+    Cleans the business licence export with the `business_stages`.
+
+    Parameters:
+        source_file (str): The business licence export.
+        use_cache (bool): If True, the stages run through a `PipelineCache` (default is False).
+        streaming (bool): If True, the export is cleaned with `clean_business_file_in_chunks`,
+            which writes `business_cleaned.csv` itself.
+    Returns:
+        DataFrame: The cleaned business licence rows.
+    """
+    if streaming:
+        clean_business_file_in_chunks(source_file, 'business_cleaned.csv')
+        return pd.read_csv('business_cleaned.csv')
+    cache = PipelineCache() if use_cache else None
+    return run_pipeline(source_file, (read_csv_to_dataframe, {'sep': ';', 'dtype': BUSINESS_TEXT_DTYPES}),
+                        business_stages(), cache)
+
+
+def clean_inventory_file(source_file, use_cache=False):
+    """
+    Cleans the storefront inventory export with the `inventory_stages`.
+
+    Parameters:
+        source_file (str): The storefront inventory export.
+        use_cache (bool): If True, the stages run through a `PipelineCache` (default is False).
+    Returns:
+        DataFrame: The cleaned storefront inventory rows.
+    """
+    cache = PipelineCache() if use_cache else None
+    return run_pipeline(source_file, (read_csv_to_dataframe, {'sep': ';'}), inventory_stages(), cache)
+
+
+def fetch_and_clean(jobs, download=True, max_workers=None):
+    """
+    Downloads and cleans several independent datasets at the same time.
+
+    Every job runs in its own thread, which downloads the file and then waits for the cleaning function to
+    finish in a process pool, so the downloads overlap and the pandas stages use separate CPU cores.
+    The refresh therefore takes about as long as the slowest job instead of the sum of all jobs.
+
+    Parameters:
+        jobs (dict): Maps a name to a (url, source_file, function, kwargs) tuple. The function must be
+            defined at module level, take the source file as its first argument and return a DataFrame.
+        download (bool): If True, every file is downloaded with `download_and_save_csv` before cleaning.
+        max_workers (int): The number of worker processes (default is one per job).
+    Returns:
+        dict: Maps every job name to the cleaned DataFrame.
+    Raises:
+        Exception: The first error raised by a job, after the jobs which did not start yet are cancelled.
+    """
+    if not isinstance(jobs, dict) or not jobs:
+        raise TypeError("Error: jobs must be a non-empty dict of (url, source_file, function, kwargs) tuples.")
+    # Spawned workers do not inherit the locks held by the download threads
+    processes = ProcessPoolExecutor(max_workers=max_workers or len(jobs), mp_context=get_context('spawn'))
+    threads = ThreadPoolExecutor(max_workers=len(jobs))
+
+    def run_job(url, source_file, function, kwargs):
+        """Downloads one file in this thread and cleans it in the process pool."""
+        if download:
+            download_and_save_csv(url, source_file)
+        return processes.submit(function, source_file, **kwargs).result()
+
+    futures = {threads.submit(run_job, *job): name for name, job in jobs.items()}
+    try:
+        done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+        for future in done:
+            if future.exception() is not None:
+                print(f"Error: The {futures[future]} job failed, cancelling the other jobs.")
+                raise future.exception()
+        return {name: future.result() for future, name in futures.items()}
+    finally:
+        threads.shutdown(wait=False, cancel_futures=True)
+        processes.shutdown(wait=False, cancel_futures=True)
+
+
+def main(streaming=False, use_cache=False, download=False, concurrent=False):
     """
     Main function to clean and standardize business license and storefront inventory datasets.
 
+    Parameters:
+        streaming (bool): If True, the business licence export is cleaned chunk by chunk with
+            `clean_business_file_in_chunks` instead of being read into memory at once.
+        use_cache (bool): If True, the output of every stage is kept in a `PipelineCache`, so a run after
+            changing e.g. `TRADE_NAME_MAPPINGS` resumes from the last unchanged stage. It is off by default,
+            since the cache pickles every stage output, the raw export included, up to `CACHE_MAX_BYTES`.
+        download (bool): If True, both exports are downloaded first with `download_and_save_csv`.
+            It is off by default, so the local files are processed without going to the network.
+        concurrent (bool): If True, the two datasets are downloaded and cleaned at the same time
+            with `fetch_and_clean`, otherwise one after the other. It is off by default, since starting the
+            worker processes costs about two seconds, more than the overlap saves unless both exports are large.
+
     Workflow:
     1. Download Data:
        - Business license data for the years 2013 to 2024.
        - Storefront inventory data for retail businesses.
+       - Both are streamed to disk, resumed after a dropped connection and skipped when unchanged.
 
     2. Process Business License Data:
        - Read the CSV file into a DataFrame.
@@ -429,63 +932,39 @@ def main():
     5. Save Cleaned Data:
        - Export the cleaned business license data to `business_cleaned.csv`.
        - Export the cleaned storefront inventory data to `inventory_cleaned.csv`.
+       - Export typed Parquet copies of both files when `pyarrow` is installed.
 
     Note:
-    - The script uses URLs to fetch the data but can process local files for testing purposes by uncommenting the download lines.
+    - The script processes the local files by default and fetches them from the URLs with `download=True`.
+    - The streaming mode writes `business_cleaned.csv` directly and gives the same rows.
     - Additional mappings for business names can be defined in the `TRADE_NAME_MAPPINGS`, `BUSINESS_NAME_MAPPING`, and `INVENTORY_NAME_MAPPING` lists.
     """
-    # business_url = ('https://opendata.vancouver.ca/api/explore/v2.1/catalog/datasets/business-licences-2013-to-2024/'
-    #                 'exports/csv?lang=en&timezone=America%2FLos_Angeles&use_labels=true&delimiter=%3B')
-    # inventory_url = ('https://opendata.vancouver.ca/api/explore/v2.1/catalog/datasets/storefronts-inventory/exports/csv'
-    #                  '?lang=en&timezone=America%2FLos_Angeles&use_labels=true&delimiter=%3B')
-    # Download the csv file for internet
-    # download_and_save_csv(business_url, 'business_licenses_2013_to_2024.csv')
-    # download_and_save_csv(inventory_url, 'storefronts_inventory.csv')
-
-    # Clean the business file
-    business_df = read_csv_to_dataframe('business_licenses_2013_to_2024.csv', sep=';')
-    business_df = drop_na_columns(business_df, ['BusinessName'])
-    business_df = filter_dataframe_by_list(business_df, 'Province', ['BC', 'British Columbia'])
-    business_df = filter_dataframe_by_str(business_df, 'Status', 'Issued', contain=True)
-    business_df = filter_dataframe_by_int(business_df, 'NumberofEmployees', MIN_EMPLOYEES, condition='min')
-    business_df = filter_dataframe_by_int(business_df, 'FOLDERYEAR', BUSINESS_YEAR_ANALYSIS, condition='equal')
-    business_df = strip_column_values(business_df, 'BusinessType', ' *Historic*')
-    business_df = strip_column_values(business_df, 'BusinessSubType', ' *Historic*')
-    business_df = combine_columns_to_new_column(business_df, ['Unit', 'UnitType', 'House', 'Street'], 'Address')
-    business_df = select_columns(business_df, ['FOLDERYEAR', 'BusinessName', 'BusinessTradeName',
-                                               'BusinessType', 'BusinessSubType', 'Address', 'City',
-                                               'LocalArea', 'NumberofEmployees', 'FeePaid'])
-    business_df = business_df.fillna('')
-    business_df = business_df.drop_duplicates()
-    business_df = remove_outliers_by_column(business_df, 'NumberofEmployees',
-                                            lower_percentile=LOWER_THRESHOLD,
-                                            upper_percentile=UPPER_THRESHOLD)
-
-    # Clean the inventory file
-    inventory_df = read_csv_to_dataframe('storefronts_inventory.csv', sep=';')
-    inventory_df = combine_columns_to_new_column(inventory_df,
-                                                 ['Unit', 'Civic number - Parcel', 'Street name - Parcel'],
-                                                 'Address')
-    inventory_df = filter_dataframe_by_str(inventory_df, 'Business name', 'Vacant', contain=False)
-    inventory_df = filter_dataframe_by_str(inventory_df, 'Business name', 'Vacant UC', contain=False)
-    inventory_df = filter_dataframe_by_int(inventory_df, 'Year recorded', INVENTORY_YEAR_ANALYSIS, 'equal')
-    inventory_df = select_columns(inventory_df, ['ID', 'Business name', 'Retail category',
-                                                 'Geo Local Area', 'Address'])
-
-    # Change names on data frame
-    # business data frame
-    business_df = update_values_based_on_mapping(business_df, 'BusinessTradeName',
-                                                 'BusinessName', TRADE_NAME_MAPPINGS)
-    business_df = update_values_based_on_mapping(business_df, 'BusinessName',
-                                                 'BusinessName', TRADE_NAME_MAPPINGS)
-    business_df = update_column_with_direct_names(business_df, ['BusinessTradeName', 'BusinessName'], DIRECT_NAMES)
-    # inventory data frame
-    inventory_df = update_values_based_on_mapping(inventory_df, 'Business name',
-                                                  'Business name', INVENTORY_NAME_MAPPING)
+    business_url = ('https://opendata.vancouver.ca/api/explore/v2.1/catalog/datasets/business-licences-2013-to-2024/'
+                    'exports/csv?lang=en&timezone=America%2FLos_Angeles&use_labels=true&delimiter=%3B')
+    inventory_url = ('https://opendata.vancouver.ca/api/explore/v2.1/catalog/datasets/storefronts-inventory/exports/csv'
+                     '?lang=en&timezone=America%2FLos_Angeles&use_labels=true&delimiter=%3B')
+    jobs = {'business': (business_url, 'business_licenses_2013_to_2024.csv', clean_business_file,
+                         {'use_cache': use_cache, 'streaming': streaming}),
+            'inventory': (inventory_url, 'storefronts_inventory.csv', clean_inventory_file,
+                          {'use_cache': use_cache})}
+    if concurrent:
+        cleaned = fetch_and_clean(jobs, download)
+    else:
+        cleaned = {}
+        for name, (url, source_file, function, kwargs) in jobs.items():
+            # Download the csv file for internet, skipping files which did not change on the server
+            if download:
+                download_and_save_csv(url, source_file)
+            cleaned[name] = function(source_file, **kwargs)
+    business_df, inventory_df = cleaned['business'], cleaned['inventory']
 
     # Save it to csv
-    business_df.to_csv('business_cleaned.csv', index=False)
+    if not streaming:
+        business_df.to_csv('business_cleaned.csv', index=False)
     inventory_df.to_csv('inventory_cleaned.csv', index=False)
+    # Save the typed columnar copy which the dashboard loads first
+    save_table(business_df, 'business_cleaned.csv', BUSINESS_SCHEMA)
+    save_table(inventory_df, 'inventory_cleaned.csv', INVENTORY_SCHEMA)
 
 
 if __name__ == '__main__':
@@ -16,12 +16,16 @@ Key Features:
 
 2. **Data Filtering**:
    - Filters inventory objects based on a configurable threshold (`INVENTORY_THRESHOLD`).
+   - Links inventory to businesses with one hash join on normalized names from `linkage`.
 
 3. **Dataframe Creation**:
    - Converts processed business and inventory data into pandas DataFrames for analysis.
+   - `build_business_summary` and `build_inventory_summary` from `summary` produce the same DataFrames with one
+     `groupby` aggregation each, and `LazyObjectDict` creates `Business`/`Inventory` objects on demand.
 
 4. **GUI Integration**:
    - Launches a graphical user interface (GUI) for data visualization using the `BusinessApp` class from `app`.
+   - Starts in the fast start mode of `BusinessApp`, and only imports `incremental` when the data is loaded.
 
 The script integrates with data cleaning tools to generate clean datasets, and then transforms them into
 structured data for visualization and analysis.
@@ -29,29 +33,25 @@ structured data for visualization and analysis.
 Dependencies:
 - `pandas`: For data manipulation.
 - `tkinter`: For GUI.
-- Custom modules: `app`, `business`, `inventory`.
+- Custom modules: `app`, `business`, `inventory`, `summary`, `linkage`, `data_cache`.
 """
 
 
 # Import the modules and classes
+from collections.abc import Mapping
+import numpy as np
 import pandas as pd
 from app import *
 from business import *
 from inventory import *
+from summary import *
+from linkage import link_groups
+from data_cache import load_table, BUSINESS_SCHEMA, INVENTORY_SCHEMA
 
 
 # Set constants
-INVENTORY_THRESHOLD = 3
-BUSINESS_NAME_INDEX = 1
-BUSINESS_TYPE_INDEX = 3
-BUSINESS_ADDRESS_INDEX = 5
-BUSINESS_CITY_INDEX = 6
-BUSINESS_LOCAL_AREA_INDEX = 7
-BUSINESS_EMPLOYEES = 8
-BUSINESS_REGISTER_FEE = 9
-INVENTORY_NAME_INDEX = 1
-INVENTORY_CATEGORY_INDEX = 2
-INVENTORY_ADDRESS = 4
+BUSINESS_TEXT_COLUMNS = ['BusinessName', 'BusinessType', 'Address', 'City', 'LocalArea']
+INVENTORY_TEXT_COLUMNS = ['Business name', 'Retail category', 'Address']
 
 
 def read_from_csv(filename: str) -> list[str]:
@@ -90,6 +90,99 @@ def read_from_csv(filename: str) -> list[str]:
         return business_list
 
 
+def read_dataframe_from_csv(filename: str, text_columns: list = None, schema: dict = None) -> pd.DataFrame:
+    """
+    Reads csv file to pd.dataframe without converting it into a list
+
+    When the columnar copy written by `data_clean` is newer than the csv file,
+    it is loaded instead of parsing the csv text (see `data_cache.load_table`).
+
+    Parameters:
+    filename : str
+        The name of the file to be read.
+    text_columns : list
+        Columns whose missing values are replaced by an empty string,
+        matching the `fillna('')` done by `read_from_csv`.
+    schema : dict
+        The column types, e.g. `BUSINESS_SCHEMA`, used when the csv file is parsed.
+    Returns:
+    DataFrame
+        The loaded DataFrame. If the file cannot be found, returns None
+        and prints an error message.
+    """
+    try:
+        file = load_table(filename, schema)
+    except IOError:
+        print(f'FileNotFoundError: File {filename} not found.')
+    except TypeError:
+        print('TypeError: Please input the filename as string.')
+    else:
+        if text_columns and schema is None:
+            file[text_columns] = file[text_columns].fillna('')
+        return file
+
+
+class LazyObjectDict(Mapping):
+    """
+    A read-only dictionary which creates `Business` or `Inventory` objects the first time they are asked for.
+
+    The rows are grouped by name once, and each object is built from its own rows only,
+    so code which still needs the object API does not pay for every business up front.
+
+    Attributes:
+        dataframe (DataFrame): The cleaned rows the objects are built from.
+        kind (str): Either 'business' or 'inventory'.
+    """
+    def __init__(self, dataframe, kind='business'):
+        if not isinstance(dataframe, pd.DataFrame):
+            raise ValueError("dataframe must be a pandas DataFrame.")
+        if kind not in ('business', 'inventory'):
+            raise ValueError("kind must be 'business' or 'inventory'.")
+        self.dataframe = dataframe
+        self.kind = kind
+        name_index = BUSINESS_NAME_INDEX if kind == 'business' else INVENTORY_NAME_INDEX
+        self._positions = dataframe.groupby(dataframe.columns[name_index], sort=False).indices
+        self._objects = {}
+
+    def __getitem__(self, key):
+        if key not in self._objects:
+            rows = self.dataframe.iloc[self._positions[key]].values.tolist()
+            if self.kind == 'business':
+                self._objects[key] = self._build_business(rows)
+            else:
+                self._objects[key] = self._build_inventory(rows)
+        return self._objects[key]
+
+    def __iter__(self):
+        return iter(self._positions)
+
+    def __len__(self):
+        return len(self._positions)
+
+    @staticmethod
+    def _build_business(rows):
+        """Creates one Business object from its rows."""
+        first = rows[0]
+        business = Business(first[BUSINESS_NAME_INDEX], first[BUSINESS_CITY_INDEX],
+                            first[BUSINESS_LOCAL_AREA_INDEX])
+        for line in rows:
+            business.add_type(line[BUSINESS_TYPE_INDEX])
+            business.add_address(line[BUSINESS_ADDRESS_INDEX])
+            business.add_employee(int(line[BUSINESS_EMPLOYEES]))
+            if not pd.isna(line[BUSINESS_REGISTER_FEE]):
+                business.add_register_fee(line[BUSINESS_REGISTER_FEE])
+        return business
+
+    @staticmethod
+    def _build_inventory(rows):
+        """Creates one Inventory object from its rows."""
+        inventory = Inventory(rows[0][INVENTORY_NAME_INDEX])
+        for line in rows:
+            inventory.add_type(line[INVENTORY_CATEGORY_INDEX])
+            inventory.add_address(line[INVENTORY_ADDRESS])
+        return inventory
+
+
 # Function about business class
 def initial_business_class(dataframe_list):
     """
@@ -201,6 +294,9 @@ def add_inventory_business(business: dict, inventory: dict):
     """
     Adds inventory details to the corresponding business entries.
 
+    An inventory is linked to every business with the same normalized name (see `linkage.py`),
+    so differences of case, punctuation, quotes or legal suffix do not drop the link.
+
     Args: business (dict):
         A dictionary where keys are business identifiers
         and values are business objects with an 'add_inventory' method.
@@ -215,9 +311,13 @@ def add_inventory_business(business: dict, inventory: dict):
     if not isinstance(inventory, dict):
         raise ValueError("inventory must be a dict of data object.")
 
-    for key, value in inventory.items():
-        if key in business.keys():
-            business[key].add_inventory(value.address)
+    # One hash join on the normalized names, then only the linked pairs are visited
+    names = list(business)
+    inventory_values = list(inventory.values())
+    members, offsets, _ = link_groups(names, list(inventory))
+    for index in np.flatnonzero(np.diff(offsets)):
+        for position in members[offsets[index]:offsets[index + 1]]:
+            business[names[index]].add_inventory(inventory_values[position].address)
     return business
 
 
@@ -349,71 +449,59 @@ def find_inventory(inventory_threshold: int, object_dict: dict):
     return result
 
 
-def main():
+def load_dashboard_data():
     """
-    Main function for processing business and inventory data, and launching the GUI for visualization.
+    Reads the cleaned business and inventory files and builds the DataFrames shown by the GUI.
 
-    Workflow:
     1. **Read Data**:
-       - Loads cleaned business and inventory data from CSV files into lists.
-
-    2. **Object Initialization**:
-       - Initializes `Business` objects and updates them with type, address, employees, and fees.
-       - Initializes `Inventory` objects and updates them with type and address.
-
-    3. **Combine Data**:
-       - Filters inventory objects based on the `INVENTORY_THRESHOLD`.
-       - Adds inventory data to the corresponding businesses.
+       - Loads cleaned business and inventory data from CSV files into DataFrames.
 
-    4. **Create DataFrames**:
-       - Converts the `Business` and `Inventory` objects into pandas DataFrames.
+    2. **Create DataFrames**:
+       - Aggregates the inventory rows per business with `build_inventory_summary`.
+       - Aggregates the business rows per business with `build_business_summary`, linking
+         the inventory of businesses above the `INVENTORY_THRESHOLD`, or reuses the summary
+         kept up to date by `incremental.py`.
 
-    5. **Launch GUI**:
-       - Initializes and runs the `BusinessApp` GUI for visualizing the processed data.
+    Returns:
+    tuple
+        (business_df, inventory_df)
     """
     # Read two files
-    business_list = read_from_csv('business_cleaned.csv')
-    inventory_list = read_from_csv('inventory_cleaned.csv')
+    business_frame = read_dataframe_from_csv('business_cleaned.csv', BUSINESS_TEXT_COLUMNS, BUSINESS_SCHEMA)
+    inventory_frame = read_dataframe_from_csv('inventory_cleaned.csv', INVENTORY_TEXT_COLUMNS, INVENTORY_SCHEMA)
 
-    # Setting for business Class
-    business_dict = initial_business_class(business_list)
-    business_dict = add_type_business(business_dict, business_list)
-    business_dict = add_address_business(business_dict, business_list)
-    business_dict = add_employees_business(business_dict, business_list)
-    business_dict = add_register_fee_business(business_dict, business_list)
+    # Convert into DataFrame
+    inventory_df = build_inventory_summary(inventory_frame)
+    # Reuse the summary of the last incremental run when it belongs to the cleaned file
+    from incremental import load_summary
+    business_df = load_summary('business_cleaned.csv')
+    # A summary saved before 'Local Area' was added is built again
+    if business_df is None or 'Local Area' not in business_df.columns:
+        business_df = build_business_summary(business_frame, inventory_df, INVENTORY_THRESHOLD)
+    else:
+        business_df['Number of Inventory'] = link_inventory_counts(business_df['Business Name'], inventory_df,
+                                                                   INVENTORY_THRESHOLD)
+    return business_df, inventory_df
 
-    # Setting for inventory Class
-    inventory_dict = initial_inventory_class(inventory_list)
-    inventory_dict = add_type_inventory(inventory_dict, inventory_list)
-    inventory_dict = add_address_inventory(inventory_dict, inventory_list)
 
-    # Combine two dictionary together
-    inventory_threshold = find_inventory(INVENTORY_THRESHOLD, inventory_dict)
-    business_dict = add_inventory_business(business_dict, inventory_threshold)
+def main(fast_start=True):
+    """
+    Main function for processing business and inventory data, and launching the GUI for visualization.
 
-    # Convert into DataFrame
-    business_df = [
-        {'Business Name': value.name,
-         'Business Category': value.get_main_business(),
-         'Number of Store': value.get_number_store(),
-         'Number of Employees': value.get_number_employees(),
-         'Number of Inventory': value.get_number_of_inventory(),
-         'Total Register Fee': value.register_fee,
-         'City': value.city}
-        for value in list(business_dict.values())
-    ]
-    business_df = pd.DataFrame(business_df)
-    inventory_df = [
-        {'Business Name': value.name,
-         'Business Category': value.get_main_business(),
-         'Number of inventory': value.get_number_of_inventory()}
-        for value in list(inventory_dict.values())
-    ]
-    inventory_df = pd.DataFrame(inventory_df)
+    Workflow:
+    1. **Load Data**:
+       - Reads the cleaned files and builds the DataFrames with `load_dashboard_data`.
+
+    2. **Launch GUI**:
+       - Initializes and runs the `BusinessApp` GUI for visualizing the processed data.
+       - With `fast_start`, the window opens with the text of the Information screen while its heatmaps are
+         drawn, and the other screens are built on their first visit.
+    """
+    business_df, inventory_df = load_dashboard_data()
 
     # # GUI using Tkinter
     root = Tk()
-    app = BusinessApp(root, business_df, inventory_df)
+    app = BusinessApp(root, business_df, inventory_df, fast_start=fast_start)
     root.mainloop()
     print(app)
 
@@ -0,0 +1,240 @@
+"""
+Strong/Sizhi Chen
+CS 5001, Fall 2024
+Final Project -- download_check.py
+
+Download Checks against a Local Server
+
+This script runs `download_and_save_csv` of `data_clean` against a stand-in HTTP server started in a thread, so
+the resume, skip and decompress paths are checked without the Vancouver open data portal.
+
+Key Features:
+1. **Stand-in Server**:
+   - Serves files from memory with an ETag, and answers Range, If-Range and If-None-Match requests like the
+     portal, with 206, 304 and 416 responses.
+   - Can drop the connection after a number of bytes, to cut a download in the middle.
+
+2. **Checks**:
+   - A full download and a skipped repeat (304), a dropped connection resumed within the call, a partial file
+     resumed on the next call, a partial file of a changed file (If-Range mismatch), a partial file which is
+     already complete or too long (416), and a gzip download decompressed into the output file.
+
+Usage:
+- `python download_check.py`
+"""
+
+
+# Import modules
+import gzip
+import json
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from data_clean import (download_and_save_csv, read_download_state, PART_EXTENSION,
+                        DOWNLOAD_STATE_EXTENSION)
+
+
+# Set constants
+FILE_SIZE = 200000
+CHUNK_SIZE = 4096
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """
+    Answers GET requests for the files of a `StandInServer`.
+    """
+    def do_GET(self):
+        """Sends the whole file, a range of it, 304 or 416 depending on the request headers."""
+        server = self.server
+        server.requests.append((self.path, dict(self.headers)))
+        if self.path not in server.files:
+            self.send_error(404)
+            return
+        body, etag = server.files[self.path]
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        status, start = 200, 0
+        requested = self.headers.get('Range', '')
+        # A Range request of a changed file gets the whole file instead
+        if requested.startswith('bytes=') and self.headers.get('If-Range', etag) == etag:
+            start = int(requested[len('bytes='):].split('-')[0])
+            if start >= len(body):
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{len(body)}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            status = 206
+        payload = body[start:]
+        self.send_response(status)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(payload)))
+        if status == 206:
+            self.send_header('Content-Range', f'bytes {start}-{len(body) - 1}/{len(body)}')
+        self.end_headers()
+        drop = server.drops.pop(self.path, None)
+        if drop is not None:
+            # Close the connection before the promised length is sent
+            self.wfile.write(payload[:drop])
+            self.close_connection = True
+            return
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        """Keeps the request log out of the output."""
+
+
+class StandInServer(ThreadingHTTPServer):
+    """
+    A local HTTP server holding the files to download.
+
+    Attributes:
+        files (dict): Maps a path to its (bytes, ETag).
+        drops (dict): Maps a path to the number of bytes sent before the next response to it is dropped.
+        requests (list): The (path, headers) of every request received.
+    """
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StandInHandler)
+        self.files = {}
+        self.drops = {}
+        self.requests = []
+
+    def url(self, path):
+        """Returns the URL of a path on the server."""
+        return f'http://127.0.0.1:{self.server_address[1]}{path}'
+
+    def last_headers(self):
+        """Returns the headers of the last request received."""
+        return self.requests[-1][1]
+
+
+def sample_csv(size, seed):
+    """Returns `size` bytes of semicolon separated rows which differ for every seed."""
+    rows = b''.join(f'{seed};{number};Business {number * 7919 % 10007}\n'.encode() for number in range(size // 10))
+    return (b'Seed;Number;Business Name\n' + rows)[:size]
+
+
+def read_file(filename):
+    """Returns the bytes of a file."""
+    with open(filename, 'rb') as f:
+        return f.read()
+
+
+def write_partial(output_file, data, url, etag):
+    """Leaves a partial download of `data` with its saved state, as if an earlier call was cut off."""
+    with open(output_file + PART_EXTENSION, 'wb') as f:
+        f.write(data)
+    with open(output_file + DOWNLOAD_STATE_EXTENSION, 'w') as f:
+        json.dump({'url': url, 'etag': etag, 'last_modified': None, 'complete': False}, f)
+
+
+def check_full_and_unchanged(server, folder):
+    """A first call downloads the file and a second one is answered 304 and skips it."""
+    body = sample_csv(FILE_SIZE, 1)
+    server.files['/full.csv'] = (body, '"full-1"')
+    output_file = os.path.join(folder, 'full.csv')
+    assert download_and_save_csv(server.url('/full.csv'), output_file, CHUNK_SIZE)
+    assert read_file(output_file) == body
+    assert read_download_state(output_file)['complete']
+    assert not download_and_save_csv(server.url('/full.csv'), output_file, CHUNK_SIZE)
+    assert server.last_headers().get('If-None-Match') == '"full-1"'
+    assert read_file(output_file) == body
+
+
+def check_dropped_connection(server, folder):
+    """A connection dropped in the middle is resumed with a Range request within the same call."""
+    body = sample_csv(FILE_SIZE, 2)
+    server.files['/dropped.csv'] = (body, '"dropped-1"')
+    server.drops['/dropped.csv'] = FILE_SIZE // 3
+    output_file = os.path.join(folder, 'dropped.csv')
+    assert download_and_save_csv(server.url('/dropped.csv'), output_file, CHUNK_SIZE, retries=2)
+    assert read_file(output_file) == body
+    headers = server.last_headers()
+    # The resumed request starts after the chunks written before the drop
+    offset = int(headers.get('Range', 'bytes=0-')[len('bytes='):].split('-')[0])
+    assert 0 < offset <= FILE_SIZE // 3 and headers.get('If-Range') == '"dropped-1"'
+
+
+def check_resume(server, folder):
+    """A partial file left by an earlier call is completed from its end."""
+    body = sample_csv(FILE_SIZE, 3)
+    server.files['/resume.csv'] = (body, '"resume-1"')
+    output_file = os.path.join(folder, 'resume.csv')
+    write_partial(output_file, body[:FILE_SIZE // 2], server.url('/resume.csv'), '"resume-1"')
+    assert download_and_save_csv(server.url('/resume.csv'), output_file, CHUNK_SIZE)
+    assert read_file(output_file) == body
+    assert server.last_headers().get('Range') == f'bytes={FILE_SIZE // 2}-'
+    assert not os.path.exists(output_file + PART_EXTENSION)
+
+
+def check_if_range_mismatch(server, folder):
+    """A partial file of an older version of the file is replaced by the whole new file."""
+    old_body, new_body = sample_csv(FILE_SIZE, 4), sample_csv(FILE_SIZE + 1000, 5)
+    server.files['/changed.csv'] = (new_body, '"changed-2"')
+    output_file = os.path.join(folder, 'changed.csv')
+    write_partial(output_file, old_body[:FILE_SIZE // 2], server.url('/changed.csv'), '"changed-1"')
+    assert download_and_save_csv(server.url('/changed.csv'), output_file, CHUNK_SIZE)
+    assert server.last_headers().get('If-Range') == '"changed-1"'
+    assert read_file(output_file) == new_body
+    assert read_download_state(output_file)['etag'] == '"changed-2"'
+
+
+def check_range_not_satisfiable(server, folder):
+    """A partial file which holds the whole file is completed, and a longer one is downloaded again."""
+    body = sample_csv(FILE_SIZE, 6)
+    server.files['/complete.csv'] = (body, '"complete-1"')
+    output_file = os.path.join(folder, 'complete.csv')
+    write_partial(output_file, body, server.url('/complete.csv'), '"complete-1"')
+    assert download_and_save_csv(server.url('/complete.csv'), output_file, CHUNK_SIZE)
+    assert read_file(output_file) == body
+    assert read_download_state(output_file)['complete']
+
+    output_file = os.path.join(folder, 'too_long.csv')
+    write_partial(output_file, body + b'extra rows\n', server.url('/complete.csv'), '"complete-1"')
+    assert download_and_save_csv(server.url('/complete.csv'), output_file, CHUNK_SIZE)
+    assert read_file(output_file) == body
+    assert 'Range' not in server.last_headers()
+
+
+def check_gzip(server, folder):
+    """A gzip download cut in the middle is resumed and decompressed into the output file."""
+    body = sample_csv(FILE_SIZE, 7)
+    compressed = gzip.compress(body)
+    server.files['/export.csv.gz'] = (compressed, '"gzip-1"')
+    server.drops['/export.csv.gz'] = len(compressed) // 2
+    output_file = os.path.join(folder, 'export.csv')
+    assert download_and_save_csv(server.url('/export.csv.gz'), output_file, CHUNK_SIZE, decompress=True)
+    assert read_file(output_file) == body
+    assert server.last_headers().get('Accept-Encoding') == 'identity'
+    assert not os.path.exists(output_file + PART_EXTENSION)
+
+
+def main():
+    """
+    Runs every check against a fresh stand-in server and temporary folder.
+    """
+    server = StandInServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    checks = [check_full_and_unchanged, check_dropped_connection, check_resume, check_if_range_mismatch,
+              check_range_not_satisfiable, check_gzip]
+    try:
+        with tempfile.TemporaryDirectory() as folder:
+            for check in checks:
+                check(server, folder)
+                print(f"{check.__name__}: ok")
+    finally:
+        server.shutdown()
+        server.server_close()
+    print(f"All {len(checks)} download checks passed.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,318 @@
+"""
+Strong/Sizhi Chen
+CS 5001, Fall 2024
+Final Project -- entity_resolution.py
+
+Entity Resolution between Licence and Storefront Names
+
+This script matches the `BusinessName` and `BusinessTradeName` of the business licences to the `Business name`
+of the storefront inventory, so chains which are missing from the mapping lists of `data_clean` are still linked.
+
+Key Features:
+1. **Blocking**:
+   - An inverted index from every word and the first characters of every name to the names which contain it.
+     Only names sharing a block are compared, and blocks larger than `max_block_size` (e.g. 'cafe') are skipped,
+     so the work grows with the number of candidate pairs instead of every pair of names.
+
+2. **Vectorized Scoring**:
+   - The Dice similarity of the character trigrams of two names, computed for every candidate pair at once
+     with pandas joins. The share of the shorter name found in the longer one is kept for the review.
+
+3. **Reviewable Mapping Table**:
+   - One row per business name with its best storefront name above `threshold`, saved as a CSV file which
+     is reviewed by hand. Trigrams ignore word order and numbers ('Sushi Moon' and 'Moon Sushi', 'Branch 179'
+     and 'Branch 142' look alike), so every row is written with `Approved` False, and only the rows a reviewer
+     sets to True are used. With `approve_exact`, rows whose keys are identical are approved in advance.
+   - The approved rows of `resolved_names.csv` are applied by `data_clean` after its own mapping lists,
+     each only to the column of its `Source`.
+
+Usage:
+- `python entity_resolution.py [--threshold 0.8] [--approve-exact] [--output resolved_names.csv]`
+  from the folder with `business_cleaned.csv` and `inventory_cleaned.csv`, then set `Approved` to True
+  for the reviewed rows.
+"""
+
+
+# Import modules
+import argparse
+import os
+import numpy as np
+import pandas as pd
+from linkage import normalize_names
+
+
+# Set constants
+RESOLVE_THRESHOLD = 0.8
+MAX_BLOCK_SIZE = 200
+PREFIX_LENGTH = 4
+GRAM_SIZE = 3
+MAPPING_FILE = 'resolved_names.csv'
+MAPPING_COLUMNS = ['Business Name', 'Source', 'Inventory Name', 'Score', 'Containment', 'Approved']
+BUSINESS_NAME_COLUMNS = ['BusinessName', 'BusinessTradeName']
+
+
+def resolution_keys(names):
+    """
+    Returns the keys compared by the resolver: the link keys of `linkage` without store numbers such as '#123'.
+
+    Parameters:
+        names (list, Index, Series or ndarray): The names.
+    Returns:
+        ndarray: The keys as an object array.
+    """
+    return normalize_names(pd.Series(names, dtype=object).str.replace(r'#\s*\d+', ' ', regex=True))
+
+
+def character_grams(keys, size=GRAM_SIZE):
+    """
+    Lists the distinct character n-grams of every key, padded with a space on both ends.
+
+    Parameters:
+        keys (ndarray): The keys.
+        size (int): The number of characters of a gram.
+    Returns:
+        DataFrame: One ('id', 'gram') row per distinct gram of every key, where 'id' is the position of the key.
+    """
+    padded = ' ' + pd.Series(keys, dtype=object) + ' '
+    lengths = padded.str.len().to_numpy()
+    frames = []
+    # One vectorized slice per start position, over the keys which are long enough
+    for start in range(max(lengths.max(initial=0) - size + 1, 0)):
+        rows = np.flatnonzero(lengths >= start + size)
+        frames.append(pd.DataFrame({'id': rows, 'gram': padded.iloc[rows].str.slice(start, start + size).to_numpy()}))
+    if not frames:
+        return pd.DataFrame({'id': np.zeros(0, dtype=np.int64), 'gram': np.zeros(0, dtype=object)})
+    return pd.concat(frames, ignore_index=True).drop_duplicates()
+
+
+def blocking_keys(keys, prefix_length=PREFIX_LENGTH):
+    """
+    Lists the blocks of every key: each word of two or more characters and the first characters without spaces.
+
+    Parameters:
+        keys (ndarray): The keys.
+        prefix_length (int): The number of leading characters of the prefix block.
+    Returns:
+        DataFrame: One ('id', 'block') row per distinct block of every key.
+    """
+    keys = pd.Series(keys, dtype=object)
+    words = keys.str.split().explode().dropna()
+    words = words[words.str.len() >= 2]
+    prefixes = keys.str.replace(' ', '', regex=False).str.slice(0, prefix_length)
+    prefixes = prefixes[prefixes.str.len() == prefix_length]
+    blocks = pd.concat([pd.DataFrame({'id': words.index.to_numpy(), 'block': 'word:' + words.to_numpy()}),
+                        pd.DataFrame({'id': prefixes.index.to_numpy(), 'block': 'prefix:' + prefixes.to_numpy()})],
+                       ignore_index=True)
+    return blocks.drop_duplicates()
+
+
+def candidate_pairs(left_blocks, right_blocks, max_block_size=MAX_BLOCK_SIZE):
+    """
+    Joins the blocks of both sides into the pairs of names which share at least one block.
+
+    Parameters:
+        left_blocks (DataFrame): The `blocking_keys` of the first side.
+        right_blocks (DataFrame): The `blocking_keys` of the second side.
+        max_block_size (int): Blocks with more names than this on either side are too common to be used.
+    Returns:
+        DataFrame: The distinct ('left', 'right') pairs of key positions.
+    """
+    usable = []
+    for blocks in (left_blocks, right_blocks):
+        sizes = blocks['block'].map(blocks['block'].value_counts())
+        usable.append(blocks[sizes.to_numpy() <= max_block_size])
+    pairs = usable[0].merge(usable[1], on='block', suffixes=('_left', '_right'))
+    pairs = pairs[['id_left', 'id_right']].drop_duplicates()
+    return pairs.rename(columns={'id_left': 'left', 'id_right': 'right'}).reset_index(drop=True)
+
+
+def score_pairs(pairs, left_grams, right_grams):
+    """
+    Scores every candidate pair by the Dice similarity of their character grams.
+
+    Every gram of the left name of a pair is looked up in the grams of the right name with one hashed
+    `isin` on integer (name, gram) codes, so no pair is compared in a Python loop.
+
+    Parameters:
+        pairs (DataFrame): The ('left', 'right') pairs of `candidate_pairs`.
+        left_grams (DataFrame): The `character_grams` of the first side.
+        right_grams (DataFrame): The `character_grams` of the second side.
+    Returns:
+        DataFrame: The pairs with 'score' (2 * shared / (left grams + right grams)) and
+            'containment' (shared / grams of the shorter key).
+    """
+    gram_codes, gram_values = pd.factorize(pd.concat([left_grams['gram'], right_grams['gram']], ignore_index=True))
+    number_of_grams = max(len(gram_values), 1)
+    left_codes = gram_codes[:len(left_grams)]
+    right_keys = right_grams['id'].to_numpy(dtype=np.int64) * number_of_grams + gram_codes[len(left_grams):]
+
+    # The grams of left name `i` are `left_sorted[left_offsets[i]:left_offsets[i + 1]]`
+    left_ids = left_grams['id'].to_numpy(dtype=np.int64)
+    order = np.argsort(left_ids, kind='stable')
+    left_sorted = left_codes[order]
+    pair_left = pairs['left'].to_numpy(dtype=np.int64)
+    pair_right = pairs['right'].to_numpy(dtype=np.int64)
+    left_count = np.bincount(left_ids, minlength=pair_left.max(initial=-1) + 1)
+    left_offsets = np.concatenate([[0], np.cumsum(left_count)])
+    right_count = np.bincount(right_grams['id'].to_numpy(dtype=np.int64), minlength=pair_right.max(initial=-1) + 1)
+    sizes = left_count[pair_left]
+    pair_of_row = np.repeat(np.arange(len(pairs)), sizes)
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]]) if len(pairs) else np.zeros(0, dtype=np.int64)
+    rows = np.repeat(left_offsets[pair_left] - starts, sizes) + np.arange(sizes.sum())
+    probes = pair_right[pair_of_row] * number_of_grams + left_sorted[rows]
+    hits = pd.Series(probes).isin(right_keys).to_numpy()
+    common = np.bincount(pair_of_row[hits], minlength=len(pairs))
+
+    scored = pairs.copy()
+    total = sizes + right_count[pair_right]
+    smaller = np.minimum(sizes, right_count[pair_right])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scored['score'] = np.nan_to_num(2 * common / total)
+        scored['containment'] = np.nan_to_num(common / smaller)
+    return scored
+
+
+def match_names(left_names, right_names, threshold=RESOLVE_THRESHOLD, max_block_size=MAX_BLOCK_SIZE):
+    """
+    Finds the best match above the threshold of every left name among the right names.
+
+    Parameters:
+        left_names (list, Index, Series or ndarray): The names to resolve, e.g. the business names.
+        right_names (list, Index, Series or ndarray): The reference names, e.g. the storefront names.
+        threshold (float): The minimum score of a match, between 0 and 1.
+        max_block_size (int): See `candidate_pairs`.
+    Returns:
+        DataFrame: One ('left', 'right', 'score', 'containment') row per matched left name, with the positions
+            of the names; ties of the score go to the higher containment and then to the first right name.
+    Raises:
+        ValueError: If the threshold is not between 0 and 1 or max_block_size is not positive.
+    """
+    if not 0 <= threshold <= 1:
+        raise ValueError("Error: threshold must be between 0 and 1.")
+    if not isinstance(max_block_size, int) or max_block_size <= 0:
+        raise ValueError("Error: max_block_size must be a positive integer.")
+    # Names are compared once per distinct key
+    left_codes, left_keys = pd.factorize(resolution_keys(left_names))
+    right_codes, right_keys = pd.factorize(resolution_keys(right_names))
+    left_keys, right_keys = np.asarray(left_keys, dtype=object), np.asarray(right_keys, dtype=object)
+
+    pairs = candidate_pairs(blocking_keys(left_keys), blocking_keys(right_keys), max_block_size)
+    scored = score_pairs(pairs, character_grams(left_keys), character_grams(right_keys))
+    scored = scored[scored['score'] >= threshold]
+    scored = scored.sort_values(['score', 'containment', 'right'], ascending=[False, False, True], kind='stable')
+    best = scored.drop_duplicates('left').set_index('left')
+
+    # Back from distinct keys to every left name, and to the first right name of every key
+    first_right = pd.Series(np.arange(len(right_codes))).groupby(right_codes).first()
+    matched = np.flatnonzero(np.isin(left_codes, best.index.to_numpy()))
+    rows = best.loc[left_codes[matched]]
+    return pd.DataFrame({'left': matched,
+                         'right': first_right.reindex(rows['right']).to_numpy(),
+                         'score': rows['score'].to_numpy(),
+                         'containment': rows['containment'].to_numpy()})
+
+
+def resolve_names(business_frame, inventory_frame, threshold=RESOLVE_THRESHOLD, approve_exact=False,
+                  max_block_size=MAX_BLOCK_SIZE):
+    """
+    Builds the mapping table from the business and trade names of the licences to the storefront names.
+
+    Business names which already have the link key of a storefront name are left out, because `linkage`
+    links them without a mapping. Trade names are kept, since a match renames the business name of the row.
+
+    Parameters:
+        business_frame (DataFrame): The business licence rows with `BusinessName` and `BusinessTradeName`.
+        inventory_frame (DataFrame): The storefront inventory rows with `Business name`.
+        threshold (float): The minimum score of a row of the table.
+        approve_exact (bool): If True, rows whose resolution keys are identical are approved. Every other row,
+            and every row by default, is written unapproved for review.
+        max_block_size (int): See `candidate_pairs`.
+    Returns:
+        DataFrame: The `MAPPING_COLUMNS`, one row per matched name and source column, best scores first.
+    Raises:
+        ValueError: If a frame is not a DataFrame.
+    """
+    if not isinstance(business_frame, pd.DataFrame) or not isinstance(inventory_frame, pd.DataFrame):
+        raise ValueError("Error: business_frame and inventory_frame must be pandas DataFrames.")
+    inventory_names = inventory_frame['Business name'].dropna().unique()
+    inventory_keys = set(normalize_names(inventory_names))
+    tables = []
+    for column in BUSINESS_NAME_COLUMNS:
+        names = business_frame[column].dropna()
+        names = names[names.astype(str).str.strip() != ''].unique()
+        if column == 'BusinessName':
+            names = names[~pd.Series(normalize_names(names)).isin(inventory_keys).to_numpy()]
+        matches = match_names(names, inventory_names, threshold, max_block_size)
+        left = names[matches['left'].to_numpy()]
+        right = inventory_names[matches['right'].to_numpy()]
+        exact = resolution_keys(left) == resolution_keys(right)
+        tables.append(pd.DataFrame({'Business Name': left,
+                                    'Source': column,
+                                    'Inventory Name': right,
+                                    'Score': matches['score'].round(3).to_numpy(),
+                                    'Containment': matches['containment'].round(3).to_numpy(),
+                                    'Approved': exact & approve_exact}))
+    table = pd.concat(tables, ignore_index=True)
+    return table.sort_values(['Score', 'Business Name'], ascending=[False, True], kind='stable',
+                             ignore_index=True)
+
+
+def save_mapping(table, filename=MAPPING_FILE):
+    """
+    Saves the mapping table as a CSV file for review.
+
+    Parameters:
+        table (DataFrame): The output of `resolve_names`.
+        filename (str): The CSV file to write.
+    """
+    table[MAPPING_COLUMNS].to_csv(filename, index=False)
+
+
+def load_approved_mapping(filename=MAPPING_FILE):
+    """
+    Reads the approved rows of a reviewed mapping table.
+
+    Parameters:
+        filename (str): The CSV file written by `save_mapping`.
+    Returns:
+        dict: Maps every `Source` column with approved rows to its (name, storefront name) tuples, the first
+            approved row of every name, or an empty dict if the file does not exist.
+    Raises:
+        ValueError: If the file lacks a column of `MAPPING_COLUMNS`.
+    """
+    if not os.path.exists(filename):
+        return {}
+    table = pd.read_csv(filename, dtype={'Business Name': str, 'Inventory Name': str}, keep_default_na=False)
+    missing = [column for column in MAPPING_COLUMNS if column not in table.columns]
+    if missing:
+        raise ValueError(f"Error: {filename} lacks the columns {missing}.")
+    approved = table['Approved'].astype(str).str.strip().str.lower().isin(['true', '1', 'yes'])
+    table = table[approved].drop_duplicates(['Source', 'Business Name'])
+    return {source: list(zip(rows['Business Name'], rows['Inventory Name']))
+            for source, rows in table.groupby('Source', sort=False)}
+
+
+def main():
+    """
+    Resolves the names of the cleaned files and saves the mapping table.
+    """
+    from data_cache import load_table, BUSINESS_SCHEMA, INVENTORY_SCHEMA
+    parser = argparse.ArgumentParser(description='Match licence names to storefront names.')
+    parser.add_argument('--threshold', type=float, default=RESOLVE_THRESHOLD, help='minimum score of a match')
+    parser.add_argument('--approve-exact', action='store_true',
+                        help='approve the matches whose keys are identical, leave the others for review')
+    parser.add_argument('--max-block-size', type=int, default=MAX_BLOCK_SIZE, help='largest block to compare')
+    parser.add_argument('--output', default=MAPPING_FILE, help='mapping table to write')
+    args = parser.parse_args()
+
+    business_frame = load_table('business_cleaned.csv', BUSINESS_SCHEMA)
+    inventory_frame = load_table('inventory_cleaned.csv', INVENTORY_SCHEMA)
+    table = resolve_names(business_frame, inventory_frame, args.threshold, args.approve_exact,
+                          args.max_block_size)
+    save_mapping(table, args.output)
+    print(f"Wrote {len(table):,} matches ({int(table['Approved'].sum()):,} approved) to {args.output}. "
+          f"Set 'Approved' to True for the reviewed rows before running data_clean.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+Strong/Sizhi Chen
+CS 5001, Fall 2024
+Final Project -- figure_cache.py
+
+Figure Cache for the GUI
+
+This script defines the `FigureCache` class, which keeps the most recently used Matplotlib figures of the GUI,
+so showing a view again (the same plot, axes, top N and theme colors) reuses the figure instead of running
+Matplotlib and Seaborn again.
+
+Key Features:
+1. **Keyed on the View**:
+   - The key is the plot function, every parameter (axes, top N, colors) and a version of the data,
+     so a figure is never reused after the data changed.
+
+2. **Bounded LRU**:
+   - At most `max_figures` figures are kept, and the least recently used one is dropped first.
+     The figures of the GUI all have about the same size, so this also bounds the memory.
+"""
+
+
+# Import modules
+from collections import OrderedDict
+import pandas as pd
+
+
+# Set constants
+FIGURE_CACHE_SIZE = 32
+
+
+def data_version(*frames):
+    """
+    Returns a version of the content of one or more DataFrames.
+
+    Parameters:
+        frames (DataFrame): The data the figures are drawn from.
+    Returns:
+        int: A hash which changes whenever a value, column or row of a DataFrame changes.
+    """
+    parts = []
+    for frame in frames:
+        if not isinstance(frame, pd.DataFrame):
+            raise ValueError("[data_version] Error: Every frame must be a pandas DataFrame.")
+        parts.append((tuple(frame.columns), int(pd.util.hash_pandas_object(frame).sum())))
+    return hash(tuple(parts))
+
+
+class FigureCache:
+    """
+    Keeps the most recently used figures, keyed on the plot function and its parameters.
+
+    Attributes:
+        max_figures (int): The maximum number of figures to keep.
+        hits (int): The number of figures which were reused.
+        misses (int): The number of figures which had to be drawn.
+    Methods:
+        plot(function, *args, version): Returns the cached figure of a view, drawing it on a miss.
+        get(function, *args, version): Returns the cached figure of a view, or None.
+        add(fig, function, *args, version): Caches the figure of a view.
+        holds(fig): Returns True if the figure is cached.
+        clear(): Drops every cached figure.
+    """
+    def __init__(self, max_figures=FIGURE_CACHE_SIZE):
+        """
+        Initializes an empty cache.
+
+        Parameters:
+            max_figures (int): The maximum number of figures to keep.
+        """
+        if not isinstance(max_figures, int) or max_figures <= 0:
+            raise ValueError("[FigureCache] Error: max_figures must be a positive integer.")
+        self.max_figures = max_figures
+        self.hits = 0
+        self.misses = 0
+        self._figures = OrderedDict()
+
+    def __len__(self):
+        """Returns the number of cached figures."""
+        return len(self._figures)
+
+    @staticmethod
+    def _key(function, args, version):
+        """Builds the key of a view. Data arguments are identified by object and by `version`."""
+        parts = [function.__module__, function.__qualname__, version]
+        for arg in args:
+            parts.append(arg if isinstance(arg, (str, int, float, bool, tuple)) else ('data', id(arg)))
+        return tuple(parts)
+
+    def plot(self, function, *args, version=None):
+        """
+        Returns the figure of `function(*args)`, reusing the cached one if the same view was drawn before.
+
+        Parameters:
+            function (callable): A plot function of `plot.py`, e.g. `bar_plot`.
+            args: The arguments of the plot function.
+            version (int): The version of the data, see `data_version`.
+        Returns:
+            matplotlib.figure.Figure: The figure of the view.
+        """
+        fig = self.get(function, *args, version=version)
+        if fig is None:
+            fig = function(*args)
+            self.add(fig, function, *args, version=version)
+        return fig
+
+    def get(self, function, *args, version=None):
+        """
+        Returns the cached figure of `function(*args)` without drawing it.
+
+        Parameters:
+            function (callable): A plot function of `plot.py`.
+            args: The arguments of the plot function.
+            version (int): The version of the data.
+        Returns:
+            matplotlib.figure.Figure: The cached figure, or None if the view was not drawn before.
+        """
+        key = self._key(function, args, version)
+        if key not in self._figures:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._figures.move_to_end(key)
+        return self._figures[key]
+
+    def add(self, fig, function, *args, version=None):
+        """
+        Caches a figure which was drawn elsewhere, e.g. by the `PlotWorker`.
+
+        Parameters:
+            fig (Figure): The figure of `function(*args)`.
+            function (callable): A plot function of `plot.py`.
+            args: The arguments of the plot function.
+            version (int): The version of the data.
+        """
+        self._figures[self._key(function, args, version)] = fig
+        while len(self._figures) > self.max_figures:
+            self._figures.popitem(last=False)
+
+    def holds(self, fig):
+        """Returns True if the figure is one of the cached figures."""
+        return any(cached is fig for cached in self._figures.values())
+
+    def clear(self):
+        """Drops every cached figure."""
+        self._figures.clear()
@@ -0,0 +1,310 @@
+"""
+Strong/Sizhi Chen
+CS 5001, Fall 2024
+Final Project -- incremental.py
+
+Incremental Ingestion of the Business Licence Export
+
+This script defines the `IncrementalIngestor` class, which keeps the cleaned business licence rows and the
+per-business summary up to date by cleaning only the licence records which are new or changed since the last run.
+
+Key Features:
+1. **Change Detection**:
+   - Every source record is identified by a 64-bit hash of its raw columns.
+   - When the export only grew at the end (the SHA-256 hash of every byte before the last high-water mark is
+     unchanged), only the new bytes are parsed. Otherwise the export is scanned chunk by chunk and compared by hash,
+     which also finds changed and removed records.
+
+2. **Incremental Cleaning**:
+   - Only new records go through the row cleaning and the name mappings of `data_clean`.
+   - Duplicates and the employee percentile cut are re-evaluated with vectorized operations over the small
+     cleaned store, so the result is the same as cleaning the whole export again.
+
+3. **Incremental Summary**:
+   - Only the businesses touched by the delta are aggregated again with `build_business_summary`
+     and spliced into the saved summary.
+"""
+
+
+# Import modules
+import hashlib
+import io
+import json
+import os
+import numpy as np
+import pandas as pd
+from data_clean import (clean_business_rows, standardize_business_names,
+                        BUSINESS_RAW_COLUMNS, BUSINESS_TEXT_DTYPES, BUSINESS_COLUMNS,
+                        LOWER_THRESHOLD, UPPER_THRESHOLD, OUTLIER_COLUMNS, OUTLIER_GROUP_BY,
+                        OUTLIER_MIN_GROUP_SIZE, CHUNK_SIZE)
+from outliers import outlier_mask, quantile_bounds
+from summary import build_business_summary, build_inventory_summary, link_inventory_counts, INVENTORY_THRESHOLD
+from data_cache import load_table, save_table, BUSINESS_SCHEMA, INVENTORY_SCHEMA
+
+
+# Set constants
+STATE_DIR = '.incremental'
+HASH_BLOCK_SIZE = 1024 * 1024
+STATE_FILE = 'state.json'
+SOURCE_HASH_FILE = 'source_hashes.npy'
+STORE_FILE = 'business_store.pkl'
+SUMMARY_FILE = 'business_summary.pkl'
+
+
+def hash_rows(df):
+    """
+    Hashes every row of a DataFrame from the text of its values.
+
+    Args: df (DataFrame): The rows to hash.
+    Returns: ndarray: One uint64 hash per row.
+    """
+    return pd.util.hash_pandas_object(df.astype(str), index=False).to_numpy()
+
+
+def prefix_hash(filename, offset):
+    """Returns the SHA-256 hash of every byte before `offset`, or None if the file is shorter."""
+    if os.path.getsize(filename) < offset:
+        return None
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        remaining = offset
+        while remaining > 0:
+            block = f.read(min(HASH_BLOCK_SIZE, remaining))
+            if not block:
+                return None
+            digest.update(block)
+            remaining -= len(block)
+    return digest.hexdigest()
+
+
+class IncrementalIngestor:
+    """
+    Keeps the cleaned business licence rows and the per-business summary up to date from a growing export.
+
+    Attributes:
+        state_dir (str): The folder which stores the ingestion state.
+        store (DataFrame): Every cleaned row with its source hash, row hash, mapped names and whether it
+            survives the duplicate and outlier steps.
+        summary (DataFrame): The per-business summary of the surviving rows.
+    Methods:
+        ingest(source_file, sep, inventory_summary): Cleans the new or changed records and updates the summary.
+        cleaned_rows(): Returns the cleaned rows, as `data_clean` would write them.
+        save_cleaned(output_file): Writes the cleaned rows and their typed columnar copy.
+    """
+    def __init__(self, state_dir=STATE_DIR):
+        """
+        Initializes the ingestor, loading the state of the previous run if there is one.
+
+        Args: state_dir (str): The folder which stores the ingestion state.
+        """
+        if not isinstance(state_dir, str):
+            raise ValueError("state_dir must be a string.")
+        self.state_dir = state_dir
+        os.makedirs(state_dir, exist_ok=True)
+        self.state = {}
+        self.source_hashes = np.array([], dtype=np.uint64)
+        self.store = None
+        self.summary = None
+        if os.path.exists(self._path(STATE_FILE)):
+            with open(self._path(STATE_FILE)) as f:
+                self.state = json.load(f)
+            self.source_hashes = np.load(self._path(SOURCE_HASH_FILE))
+            self.store = pd.read_pickle(self._path(STORE_FILE))
+            self.summary = pd.read_pickle(self._path(SUMMARY_FILE))
+
+    def _path(self, name):
+        """Returns the path of a state file."""
+        return os.path.join(self.state_dir, name)
+
+    def _appended_only(self, source_file):
+        """Returns True if the export still starts with exactly the bytes ingested last time."""
+        offset = self.state.get('offset')
+        if offset is None or self.state.get('source_file') != os.path.abspath(source_file):
+            return False
+        # Any change before the high-water mark, even one keeping the byte length, falls back to `_scan`
+        return prefix_hash(source_file, offset) == self.state.get('prefix_hash')
+
+    def _read_appended(self, source_file, sep):
+        """Parses only the bytes after the high-water mark, with the header line of the export."""
+        with open(source_file, 'rb') as f:
+            header = f.readline()
+            f.seek(self.state['offset'])
+            new_bytes = f.read()
+        if not new_bytes.strip():
+            return pd.DataFrame(columns=BUSINESS_RAW_COLUMNS)
+        return pd.read_csv(io.BytesIO(header + new_bytes), sep=sep, usecols=BUSINESS_RAW_COLUMNS,
+                           dtype=BUSINESS_TEXT_DTYPES)
+
+    def _scan(self, source_file, sep):
+        """Scans the whole export and returns the unknown rows, the removed hashes and all hashes in file order."""
+        known = np.sort(self.source_hashes)
+        seen = []
+        new_rows = []
+        for chunk in pd.read_csv(source_file, sep=sep, usecols=BUSINESS_RAW_COLUMNS,
+                                 dtype=BUSINESS_TEXT_DTYPES, chunksize=CHUNK_SIZE):
+            hashes = hash_rows(chunk)
+            seen.append(hashes)
+            new_rows.append(chunk[~np.isin(hashes, known)])
+        seen = pd.unique(np.concatenate(seen)) if seen else np.array([], dtype=np.uint64)
+        removed = known[~np.isin(known, seen)]
+        new_rows = pd.concat(new_rows) if new_rows else pd.DataFrame(columns=BUSINESS_RAW_COLUMNS)
+        return new_rows, removed, seen
+
+    def _clean(self, raw):
+        """Cleans new raw rows and adds their source hash, row hash and mapped names."""
+        raw = raw.reset_index(drop=True)
+        source_hashes = hash_rows(raw)
+        # The same raw record twice only needs to be cleaned once
+        first = ~pd.Series(source_hashes).duplicated().to_numpy()
+        raw = raw[first]
+        cleaned = clean_business_rows(raw)
+        cleaned = cleaned.astype({'FOLDERYEAR': 'int64', 'NumberofEmployees': 'float64'})
+        mapped = standardize_business_names(cleaned.copy())
+        cleaned = cleaned.assign(_source_hash=source_hashes[cleaned.index.to_numpy()],
+                                 _row_hash=hash_rows(cleaned),
+                                 _mapped_name=mapped['BusinessName'],
+                                 _mapped_trade_name=mapped['BusinessTradeName'],
+                                 _effective=False)
+        return cleaned.reset_index(drop=True), source_hashes[first]
+
+    def _update_effective(self):
+        """Re-evaluates which rows survive the duplicate and percentile outlier steps."""
+        store = self.store
+        first = ~store['_row_hash'].duplicated().to_numpy()
+        effective = first.copy()
+        if first.any():
+            bounds = quantile_bounds(store[first], OUTLIER_COLUMNS, LOWER_THRESHOLD, UPPER_THRESHOLD,
+                                     OUTLIER_GROUP_BY, OUTLIER_MIN_GROUP_SIZE)
+            effective &= outlier_mask(store, OUTLIER_COLUMNS, bounds, OUTLIER_GROUP_BY)
+        store['_effective'] = effective
+
+    def ingest(self, source_file, sep=';', inventory_summary=None, inventory_threshold=INVENTORY_THRESHOLD):
+        """
+        Cleans the new or changed records of the export and updates the cleaned store and summary.
+
+        Args: source_file (str): The business licence export.
+              sep (str): The delimiter used in the export (default is ';').
+              inventory_summary (DataFrame): The output of `build_inventory_summary`, used to link inventories.
+              inventory_threshold (int): The minimum number of inventory needed to be linked to a business.
+        Returns: dict: The number of 'new' and 'removed' source records and of 'touched' businesses.
+        """
+        if not os.path.exists(source_file):
+            raise FileNotFoundError(f"FileNotFoundError: File {source_file} not found.")
+        if self._appended_only(source_file):
+            raw, removed = self._read_appended(source_file, sep), np.array([], dtype=np.uint64)
+            raw = raw[~np.isin(hash_rows(raw), self.source_hashes)] if len(raw) else raw
+            cleaned, new_hashes = self._clean(raw)
+            self.source_hashes = np.concatenate([self.source_hashes, new_hashes])
+        else:
+            raw, removed, self.source_hashes = self._scan(source_file, sep)
+            cleaned, new_hashes = self._clean(raw)
+
+        # Remove the changed or deleted records and add the new ones
+        if self.store is None:
+            old_effective_names = set()
+            self.store = cleaned
+        else:
+            gone = self.store['_source_hash'].isin(removed).to_numpy()
+            old_effective_names = set(self.store.loc[gone & self.store['_effective'].to_numpy(), '_mapped_name'])
+            self.store = pd.concat([self.store[~gone], cleaned], ignore_index=True)
+            # Changed records go back to their place in the export, so the first of two duplicates is kept
+            position = pd.Index(self.source_hashes).get_indexer(self.store['_source_hash'])
+            self.store = self.store.iloc[np.argsort(position, kind='stable')].reset_index(drop=True)
+        previous = self.store['_effective'].to_numpy().copy()
+        self._update_effective()
+        changed = previous != self.store['_effective'].to_numpy()
+        touched = old_effective_names | set(self.store.loc[changed, '_mapped_name'])
+
+        self._update_summary(touched, inventory_summary, inventory_threshold)
+        self._save_state(source_file)
+        return {'new': len(new_hashes), 'removed': len(removed), 'touched': len(touched)}
+
+    def cleaned_rows(self):
+        """
+        Returns the cleaned rows in the format of `business_cleaned.csv`.
+
+        Returns: DataFrame: The rows which survive the duplicate and outlier steps, with standardized names.
+        """
+        if self.store is None:
+            return pd.DataFrame(columns=BUSINESS_COLUMNS)
+        rows = self.store[self.store['_effective']]
+        rows = rows.assign(BusinessName=rows['_mapped_name'], BusinessTradeName=rows['_mapped_trade_name'])
+        return rows[BUSINESS_COLUMNS].reset_index(drop=True)
+
+    def _update_summary(self, touched, inventory_summary, inventory_threshold):
+        """Aggregates the touched businesses again and splices them into the summary."""
+        rows = self.cleaned_rows()
+        if self.summary is None:
+            self.summary = build_business_summary(rows, inventory_summary, inventory_threshold)
+            return
+        if touched:
+            partial = build_business_summary(rows[rows['BusinessName'].isin(touched)],
+                                             inventory_summary, inventory_threshold)
+            kept = self.summary[~self.summary['Business Name'].isin(touched)]
+            # Keep the order of first appearance, like a summary built from scratch
+            order = pd.Index(rows['BusinessName'].drop_duplicates())
+            summary = pd.concat([kept, partial]).set_index('Business Name').reindex(order)
+            self.summary = summary.reset_index(names='Business Name')
+        self.summary['Number of Inventory'] = link_inventory_counts(self.summary['Business Name'],
+                                                                    inventory_summary, inventory_threshold)
+
+    def _save_state(self, source_file):
+        """Saves the high-water mark, the known source hashes, the store and the summary."""
+        offset = os.path.getsize(source_file)
+        self.state = {'source_file': os.path.abspath(source_file), 'offset': offset,
+                      'prefix_hash': prefix_hash(source_file, offset)}
+        with open(self._path(STATE_FILE), 'w') as f:
+            json.dump(self.state, f)
+        np.save(self._path(SOURCE_HASH_FILE), self.source_hashes)
+        self.store.to_pickle(self._path(STORE_FILE))
+        self.summary.to_pickle(self._path(SUMMARY_FILE))
+
+    def save_cleaned(self, output_file='business_cleaned.csv'):
+        """
+        Writes the cleaned rows to a CSV file and its typed columnar copy.
+
+        Args: output_file (str): The name of the CSV file to write.
+        """
+        rows = self.cleaned_rows()
+        try:
+            rows.to_csv(output_file, index=False)
+        except IOError as e:
+            raise IOError(f"Error: Failed to save the DataFrame to {output_file}. Reason: {e}")
+        save_table(rows, output_file, BUSINESS_SCHEMA)
+
+
+def load_summary(cleaned_file='business_cleaned.csv', state_dir=STATE_DIR):
+    """
+    Loads the summary saved by the last incremental run, if it belongs to the current cleaned file.
+
+    Args: cleaned_file (str): The cleaned CSV file the dashboard reads.
+          state_dir (str): The folder which stores the ingestion state.
+    Returns: DataFrame: The per-business summary, or None if it is missing or older than `cleaned_file`.
+    """
+    summary_file = os.path.join(state_dir, SUMMARY_FILE)
+    if not os.path.exists(summary_file) or not os.path.exists(cleaned_file):
+        return None
+    if os.path.getmtime(summary_file) < os.path.getmtime(cleaned_file):
+        return None
+    return pd.read_pickle(summary_file)
+
+
+def main():
+    """
+    Nightly refresh: ingests the new licence records and writes `business_cleaned.csv`.
+    """
+    ingestor = IncrementalIngestor()
+    inventory_summary = None
+    if os.path.exists('inventory_cleaned.csv'):
+        inventory_frame = load_table('inventory_cleaned.csv', INVENTORY_SCHEMA).fillna('')
+        inventory_summary = build_inventory_summary(inventory_frame)
+    counts = ingestor.ingest('business_licenses_2013_to_2024.csv', inventory_summary=inventory_summary)
+    print(f"{counts['new']} new and {counts['removed']} removed records, "
+          f"{counts['touched']} businesses updated.")
+    ingestor.save_cleaned('business_cleaned.csv')
+    # Mark the summary as belonging to the cleaned file just written
+    os.utime(os.path.join(ingestor.state_dir, SUMMARY_FILE))
+
+
+if __name__ == '__main__':
+    main()
@@ -21,10 +21,20 @@ Key Features:
 4. **Comparison**:
    - Implements an equality method (`__eq__`) to compare two inventory objects based on their attributes.
 
+5. **Constant-Time Updates**:
+   - Keeps a hashed set of addresses and a running tally of types, like the `Business` class.
+
+6. **Canonical Addresses**:
+   - Addresses are kept in the canonical form of `address.py`, the same form as the `Business` addresses.
+
 This class is designed to complement the `Business` class as part of a larger application for business and inventory analysis.
 """
 
 
+from collections import Counter
+from address import canonical_address
+
+
 class Inventory:
     """
     Represents inventory data for a business, including its type and locations.
@@ -55,6 +65,10 @@ class Inventory:
         self.name = name
         self.type = []
         self.address = []
+        self._address_set = set()
+        self._type_count = Counter()
+        self._type_order = {}
+        self._main_type = None
 
     def add_type(self, category):
         """
@@ -65,16 +79,29 @@ class Inventory:
         if not isinstance(category, str):
             raise ValueError("Business type must be a string.")
         self.type.append(category)
+        self._type_count[category] += 1
+        self._type_order.setdefault(category, len(self._type_order))
+        # Only the new type can overtake the current main type, ties go to the earlier type
+        if self._main_type is None:
+            self._main_type = category
+        else:
+            new_count = self._type_count[category]
+            main_count = self._type_count[self._main_type]
+            if (new_count > main_count or (new_count == main_count and
+                                           self._type_order[category] < self._type_order[self._main_type])):
+                self._main_type = category
 
     def add_address(self, address):
         """
-        Adds an inventory location (address) if it is not already present.
+        Adds an inventory location (address) if its canonical form is not already present.
 
         Args: address (str): The inventory address to add.
         """
         if not isinstance(address, str):
             raise ValueError("Address must be a string.")
-        if address not in self.address:
+        address = canonical_address(address)
+        if address not in self._address_set:
+            self._address_set.add(address)
             self.address.append(address)
 
     def get_number_of_inventory(self):
@@ -93,7 +120,7 @@ class Inventory:
         """
         if not self.type:
             return "Unknown"
-        return max(self.type, key=self.type.count)
+        return self._main_type
 
     def __str__(self):
         """
@@ -0,0 +1,192 @@
+"""
+Strong/Sizhi Chen
+CS 5001, Fall 2024
+Final Project -- linkage.py
+
+Business and Inventory Linkage
+
+This script links the storefront inventory to the business licences by a normalized name key instead of the
+exact name, so `Suki’s`, `SUKI'S` and `Suki's Ltd.` all reach the same business.
+
+Key Features:
+1. **Normalized Keys**:
+   - Unicode (NFKD) and quote folding, accents removed, `&` read as `and`, case folded, punctuation removed
+     and trailing legal suffixes (`Ltd`, `Inc.`, `Corp`, ...) stripped.
+   - Every distinct name is normalized once with vectorized pandas string methods.
+
+2. **Hash Join**:
+   - Both sides are factorized into shared key codes, so the join is linear in the number of names and no name is
+     probed one by one in Python. Several inventory names with the same key are all linked to the business.
+
+3. **Link Report**:
+   - Counts the matched and unmatched names on both sides, and the links only found through the normalized key.
+
+Usage:
+- `python linkage.py` from the folder with `business_cleaned.csv` and `inventory_cleaned.csv` prints the report.
+"""
+
+
+# Import modules
+import numpy as np
+import pandas as pd
+
+
+# Set constants
+QUOTE_CHARACTERS = '’‘‛`´ʼ′'
+LEGAL_SUFFIXES = ['ltd', 'limited', 'inc', 'incorporated', 'corp', 'corporation', 'co', 'company',
+                  'llc', 'llp', 'lp', 'plc', 'ulc']
+SUFFIX_PATTERN = r'(?:\s+(?:' + '|'.join(LEGAL_SUFFIXES) + r'))+$'
+UNMATCHED_SAMPLE = 10
+
+
+def normalize_names(names):
+    """
+    Returns the normalized link key of every name.
+
+    Parameters:
+        names (list, Index, Series or ndarray): The business names.
+    Returns:
+        ndarray: The keys as an object array, '' for a missing name or a name without letters or digits.
+    Examples:
+        `Suki’s Ltd.` -> 'sukis', `H & R Block Inc` -> 'h and r block', `Breka Bakery & Café` -> 'breka bakery and cafe'
+    """
+    codes, uniques = pd.factorize(pd.Series(names, dtype=object), use_na_sentinel=True)
+    # Object dtype keeps Python's Unicode aware `re` for the patterns below
+    keys = pd.Series([str(name) for name in uniques], dtype=object)
+    keys = keys.str.normalize('NFKD').str.replace('[\u0300-\u036f]', '', regex=True)
+    keys = keys.str.translate({ord(char): "'" for char in QUOTE_CHARACTERS})
+    keys = keys.str.replace('&', ' and ', regex=False).str.casefold()
+    # Apostrophes join the word (McDonald's -> mcdonalds), any other punctuation separates words
+    keys = keys.str.replace("'", '', regex=False).str.replace(r'[\W_]+', ' ', regex=True)
+    keys = keys.str.strip().str.replace(SUFFIX_PATTERN, '', regex=True).str.strip()
+    # A missing name has the code -1, which picks the '' appended at the end
+    return np.append(keys.to_numpy(dtype=object), '')[codes]
+
+
+def join_codes(left_names, right_names):
+    """
+    Gives the names of both sides a shared code per normalized key.
+
+    Parameters:
+        left_names (list, Index, Series or ndarray): The names of the first side, e.g. the businesses.
+        right_names (list, Index, Series or ndarray): The names of the second side, e.g. the inventories.
+    Returns:
+        tuple: (left_codes, right_codes, number_of_keys), where names with the same key share a code
+            and names with an empty key get -1, so they match nothing.
+    """
+    left_keys = normalize_names(left_names)
+    right_keys = normalize_names(right_names)
+    codes, uniques = pd.factorize(np.concatenate([left_keys, right_keys]))
+    empty = np.flatnonzero(uniques == '')
+    if len(empty):
+        codes[codes == empty[0]] = -1
+    return codes[:len(left_keys)], codes[len(left_keys):], len(uniques)
+
+
+def link_report(left_names, right_names, left_codes, right_codes):
+    """
+    Counts the matched and unmatched names of a join.
+
+    Parameters:
+        left_names, right_names: The names given to `join_codes`.
+        left_codes, right_codes (ndarray): The codes returned by `join_codes`.
+    Returns:
+        dict: 'matched_businesses', 'unmatched_businesses', 'matched_inventory', 'unmatched_inventory',
+            'normalized_only' (business names matched although no inventory has the exact same name) and
+            'unmatched_sample' (the first unmatched inventory names).
+    """
+    left_names = np.asarray(left_names, dtype=object)
+    right_names = np.asarray(right_names, dtype=object)
+    left_matched = (left_codes >= 0) & np.isin(left_codes, right_codes)
+    right_matched = (right_codes >= 0) & np.isin(right_codes, left_codes)
+    exact = pd.Index(right_names).get_indexer(left_names) >= 0 if len(right_names) else np.zeros(len(left_names),
+                                                                                                 dtype=bool)
+    return {'matched_businesses': int(left_matched.sum()),
+            'unmatched_businesses': int((~left_matched).sum()),
+            'matched_inventory': int(right_matched.sum()),
+            'unmatched_inventory': int((~right_matched).sum()),
+            'normalized_only': int((left_matched & ~exact).sum()),
+            'unmatched_sample': right_names[~right_matched][:UNMATCHED_SAMPLE].tolist()}
+
+
+def link_counts(business_names, inventory_names, inventory_counts):
+    """
+    Adds up the inventory counts of every business over the inventory names with the same key.
+
+    Parameters:
+        business_names (list, Index, Series or ndarray): The business names.
+        inventory_names (list, Index, Series or ndarray): The inventory names.
+        inventory_counts (array-like): The inventory count of every inventory name.
+    Returns:
+        tuple: (counts, report), the int64 count of every business (0 when nothing is linked)
+            and the output of `link_report`.
+    Raises:
+        ValueError: If the inventory names and counts have different lengths.
+    """
+    inventory_counts = np.asarray(inventory_counts, dtype=np.int64)
+    if len(inventory_counts) != len(inventory_names):
+        raise ValueError("Error: inventory_names and inventory_counts must have the same length.")
+    business_codes, inventory_codes, number = join_codes(business_names, inventory_names)
+    valid = inventory_codes >= 0
+    totals = np.bincount(inventory_codes[valid], weights=inventory_counts[valid], minlength=number)
+    counts = np.where(business_codes >= 0, totals[np.maximum(business_codes, 0)] if number else 0, 0)
+    report = link_report(business_names, inventory_names, business_codes, inventory_codes)
+    return counts.astype(np.int64), report
+
+
+def link_groups(business_names, inventory_names):
+    """
+    Finds the inventory names linked to every business name.
+
+    Parameters:
+        business_names (list, Index, Series or ndarray): The business names.
+        inventory_names (list, Index, Series or ndarray): The inventory names.
+    Returns:
+        tuple: (members, offsets, report), where the positions of the inventory names linked to business `i`
+            are `members[offsets[i]:offsets[i + 1]]`, and the output of `link_report`.
+    """
+    business_codes, inventory_codes, number = join_codes(business_names, inventory_names)
+    valid = np.flatnonzero(inventory_codes >= 0)
+    # Inventory positions sorted by key code, with the offsets of every key
+    members_by_key = valid[np.argsort(inventory_codes[valid], kind='stable')]
+    key_offsets = np.zeros(number + 1, dtype=np.int64)
+    np.cumsum(np.bincount(inventory_codes[valid], minlength=number), out=key_offsets[1:])
+
+    linked = business_codes >= 0
+    starts = np.where(linked, key_offsets[np.maximum(business_codes, 0)], 0)
+    sizes = np.where(linked, key_offsets[np.maximum(business_codes, 0) + 1], 0) - starts
+    offsets = np.zeros(len(business_codes) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+    # Every business copies the run of its key, e.g. starts [4, 9], sizes [2, 1] -> [4, 5, 9]
+    members = (np.repeat(starts - offsets[:-1], sizes) + np.arange(offsets[-1])).astype(np.int64)
+    report = link_report(business_names, inventory_names, business_codes, inventory_codes)
+    return members_by_key[members], offsets, report
+
+
+def print_report(report):
+    """Prints the output of `link_report`."""
+    print(f"Businesses linked: {report['matched_businesses']:,} "
+          f"(not linked: {report['unmatched_businesses']:,}, "
+          f"only through the normalized name: {report['normalized_only']:,})")
+    print(f"Inventory names linked: {report['matched_inventory']:,} "
+          f"(not linked: {report['unmatched_inventory']:,})")
+    if report['unmatched_sample']:
+        print('Some inventory names without a business: ' + ', '.join(report['unmatched_sample']))
+
+
+def main():
+    """
+    Links the cleaned inventory to the cleaned business licences and prints the report.
+    """
+    from data_cache import load_table, BUSINESS_SCHEMA, INVENTORY_SCHEMA
+    from summary import build_inventory_summary, INVENTORY_THRESHOLD
+    business_frame = load_table('business_cleaned.csv', BUSINESS_SCHEMA)
+    inventory_df = build_inventory_summary(load_table('inventory_cleaned.csv', INVENTORY_SCHEMA))
+    linked = inventory_df[inventory_df['Number of inventory'] >= INVENTORY_THRESHOLD]
+    _, report = link_counts(business_frame['BusinessName'].dropna().unique(), linked['Business Name'],
+                            linked['Number of inventory'])
+    print_report(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+"""
+Strong/Sizhi Chen
+CS 5001, Fall 2024
+Final Project -- name_standardizer.py
+
+Compiled Name Standardization
+
+This script defines the `NameStandardizer` class, which compiles a list of (old_name, new_name) mapping rules
+into one Aho-Corasick automaton, so every business name is scanned once no matter how many rules there are.
+
+Key Features:
+1. **Single Pass Matching**:
+   - All rules are matched case-insensitively as plain substrings, so names such as `A&W` or `T & T` need no escaping.
+
+2. **Same Results as the Rule Loop**:
+   - When the searched column is also the changed column, a row takes the first matching rule and then goes
+     through the later rules again, exactly like applying `str.contains` rule by rule.
+   - When another column is changed, the last matching rule wins.
+
+3. **Reusable**:
+   - The same class standardizes `TRADE_NAME_MAPPINGS`, `DIRECT_NAMES` and `INVENTORY_NAME_MAPPING` in `data_clean`.
+"""
+
+
+# Import modules
+from collections import deque
+
+
+class NameStandardizer:
+    """
+    Matches a list of name mapping rules against text with one Aho-Corasick automaton.
+
+    Attributes:
+        mapping_list (list): The (old_name, new_name) rules, in the order they are applied.
+    Methods:
+        matches(text): Returns the indexes of every rule whose old name appears in the text.
+        standardize(text): Applies the rules to the text one after the other.
+        last_replacement(text): Returns the new name of the last matching rule.
+        apply(df, search_column, change_column): Updates a DataFrame column with the rules.
+    """
+    def __init__(self, mapping_list):
+        """
+        Compiles the mapping rules into an automaton.
+
+        Args: mapping_list (list of tuples): A list of tuples where each tuple contains (old_value, new_value).
+        Raises: TypeError: If mapping_list is not a list of tuples of two strings.
+        """
+        if not isinstance(mapping_list, list) or not all(isinstance(item, tuple) and len(item) == 2 for item in mapping_list):
+            raise TypeError("Error: mapping_list must be a list of tuples with two elements each.")
+        for old_name, new_name in mapping_list:
+            if not isinstance(old_name, str) or not isinstance(new_name, str):
+                raise TypeError("Error: Both old_name and new_name must be strings.")
+        self.mapping_list = mapping_list
+        self._build_automaton()
+        self._chain = [self._apply_rules_from(index + 1, new_name)
+                       for index, (_, new_name) in enumerate(mapping_list)]
+
+    def _build_automaton(self):
+        """Builds the trie, failure links and output sets of the automaton."""
+        self._goto = [{}]
+        self._output = [set()]
+        for index, (old_name, _) in enumerate(self.mapping_list):
+            state = 0
+            for char in old_name.lower():
+                if char not in self._goto[state]:
+                    self._goto.append({})
+                    self._output.append(set())
+                    self._goto[state][char] = len(self._goto) - 1
+                state = self._goto[state][char]
+            self._output[state].add(index)
+
+        # Breadth first search for the failure links
+        self._fail = [0] * len(self._goto)
+        # States one character deep always fail back to the root
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                if state:
+                    self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] |= self._output[self._fail[next_state]]
+        self._output = [frozenset(output) for output in self._output]
+
+    def _apply_rules_from(self, start, text):
+        """Applies the rules from position `start` onwards to the text one after the other."""
+        for old_name, new_name in self.mapping_list[start:]:
+            if old_name.lower() in text.lower():
+                text = new_name
+        return text
+
+    def matches(self, text):
+        """
+        Returns the indexes of every rule whose old name appears in the text, ignoring case.
+
+        Args: text (str): The text to scan.
+        Returns: set: The matching rule indexes.
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        found = set(output[0])
+        for char in text.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found |= output[state]
+        return found
+
+    def standardize(self, text):
+        """
+        Applies the rules to the text one after the other, each rule seeing the result of the previous ones.
+
+        Args: text (str): The text to standardize.
+        Returns: str: The standardized text, or the original text if no rule matches.
+        """
+        found = self.matches(text)
+        if not found:
+            return text
+        return self._chain[min(found)]
+
+    def last_replacement(self, text):
+        """
+        Returns the new name of the last rule which matches the text.
+
+        Args: text (str): The text to scan.
+        Returns: str: The new name, or None if no rule matches.
+        """
+        found = self.matches(text)
+        if not found:
+            return None
+        return self.mapping_list[max(found)][1]
+
+    def apply(self, df, search_column, change_column):
+        """
+        Updates a column of a DataFrame with the rules, scanning every distinct value once.
+
+        Parameters:
+            df (DataFrame): The pandas DataFrame to modify.
+            search_column (str): The column to search for matching strings.
+            change_column (str): The column where values will be updated.
+        Returns:
+            DataFrame: The updated DataFrame.
+        """
+        search = df[search_column]
+        is_text = search.map(lambda value: isinstance(value, str)).to_numpy(dtype=bool)
+        if search_column == change_column:
+            lookup = {value: self.standardize(value) for value in search[is_text].unique()}
+            new_values = search.map(lookup)
+            changed = is_text & (new_values != search).to_numpy(dtype=bool)
+        else:
+            lookup = {value: self.last_replacement(value) for value in search[is_text].unique()}
+            new_values = search.map(lookup)
+            changed = is_text & new_values.notna().to_numpy(dtype=bool)
+        if changed.any():
+            df.loc[changed, change_column] = new_values.to_numpy()[changed]
+        return df
@@ -0,0 +1,328 @@
+"""
+Strong/Sizhi Chen
+CS 5001, Fall 2024
+Final Project -- outliers.py
+
+Percentile Outlier Cuts
+
+This script computes the percentile cuts of the cleaning pipeline for several numeric columns at once, either over
+all rows or per group (e.g. per `BusinessType` or `LocalArea`), and removes the rows outside of them.
+
+Key Features:
+1. **One Pass per Frame**:
+   - The lower and upper percentiles of every column and every group come from one grouped `quantile` call,
+     which sorts each group once instead of looping over the groups in Python.
+   - Groups with fewer than `min_group_size` values of a column use the cut of all rows, so a tiny category
+     does not get a cut from three values.
+
+2. **Several Columns**:
+   - A row is kept when every cut column is inside its bounds. Missing values do not remove a row.
+
+3. **Streaming Quantiles**:
+   - `QuantileSketch` counts the values of every group and column chunk by chunk and can be merged.
+     Without `relative_accuracy` it counts every distinct value and gives the exact percentiles of
+     `np.percentile`. With it, values are counted in logarithmic bins, so the memory only depends on the range
+     of the values, and every percentile is within that relative error.
+"""
+
+
+# Import modules
+import numpy as np
+import pandas as pd
+
+
+# Set constants
+MIN_GROUP_SIZE = 20
+ALL_ROWS = 'All'
+
+
+def group_labels(df, group_by):
+    """
+    Returns the group of every row.
+
+    Parameters:
+        df (DataFrame): The rows.
+        group_by (str or list): The column or columns of the groups, or None for one group of all rows.
+    Returns:
+        Index: The group label of every row, a MultiIndex for several columns and `ALL_ROWS` without groups.
+            Missing group values are read as ''.
+    """
+    if group_by is None:
+        return pd.Index([ALL_ROWS] * len(df), dtype=object)
+    if isinstance(group_by, str):
+        return pd.Index(df[group_by].fillna(''), dtype=object)
+    return pd.MultiIndex.from_frame(df[list(group_by)].fillna(''))
+
+
+def quantile_bounds(df, columns, lower_percentile, upper_percentile, group_by=None, min_group_size=MIN_GROUP_SIZE):
+    """
+    Computes the lower and upper percentiles of several columns, per group.
+
+    Parameters:
+        df (DataFrame): The rows.
+        columns (list): The numeric columns to cut.
+        lower_percentile (float): The lower percentile, between 0 and 100.
+        upper_percentile (float): The upper percentile, between 0 and 100.
+        group_by (str or list): The column or columns of the groups, or None for one cut over all rows.
+        min_group_size (int): Groups with fewer values of a column use the bounds of all rows for it.
+    Returns:
+        DataFrame: One row per group label, with the columns (column, 'lower') and (column, 'upper').
+            The percentiles are the ones of `np.percentile` with linear interpolation.
+    Raises:
+        ValueError: If a percentile is not between 0 and 100 or the lower one is above the upper one.
+        KeyError: If a column does not exist in the DataFrame.
+    """
+    validate_percentiles(lower_percentile, upper_percentile)
+    values = df[list(columns)].apply(pd.to_numeric, errors='coerce').astype(float)
+    labels = group_labels(df, group_by)
+    codes, groups = pd.factorize(labels)
+    grouped = values.groupby(codes, sort=True)
+    cuts = grouped.quantile([lower_percentile / 100, upper_percentile / 100])
+    lower = cuts.xs(lower_percentile / 100, level=1).reindex(range(len(groups))).to_numpy()
+    upper = cuts.xs(upper_percentile / 100, level=1).reindex(range(len(groups))).to_numpy()
+
+    if group_by is not None:
+        # Small groups fall back to the bounds of all rows
+        counts = grouped.count().reindex(range(len(groups))).fillna(0).to_numpy()
+        overall = values.quantile([lower_percentile / 100, upper_percentile / 100]).to_numpy()
+        small = counts < min_group_size
+        lower = np.where(small, overall[0], lower)
+        upper = np.where(small, overall[1], upper)
+    return bounds_frame(groups, columns, lower, upper)
+
+
+def bounds_frame(groups, columns, lower, upper):
+    """
+    Puts the bounds of every group and column in one DataFrame.
+
+    Parameters:
+        groups (Index): The group labels.
+        columns (list): The cut columns.
+        lower, upper (ndarray): The bounds with one row per group and one column per cut column.
+    Returns:
+        DataFrame: One row per group, with the columns (column, 'lower') and (column, 'upper').
+    """
+    data = {}
+    for position, column in enumerate(columns):
+        data[(column, 'lower')] = lower[:, position]
+        data[(column, 'upper')] = upper[:, position]
+    return pd.DataFrame(data, index=groups)
+
+
+def outlier_mask(df, columns, bounds, group_by=None):
+    """
+    Finds the rows inside the bounds of their group for every column.
+
+    Parameters:
+        df (DataFrame): The rows.
+        columns (list): The cut columns.
+        bounds (DataFrame): The output of `quantile_bounds` or `QuantileSketch.bounds`.
+        group_by (str or list): The group columns the bounds were computed with.
+    Returns:
+        ndarray: True for the rows to keep. Missing values and groups without bounds are kept.
+    """
+    positions = bounds.index.get_indexer(group_labels(df, group_by))
+    keep = np.ones(len(df), dtype=bool)
+    known = positions >= 0
+    for column in columns:
+        values = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float)
+        lower = np.full(len(df), -np.inf)
+        upper = np.full(len(df), np.inf)
+        lower[known] = bounds[(column, 'lower')].to_numpy()[positions[known]]
+        upper[known] = bounds[(column, 'upper')].to_numpy()[positions[known]]
+        with np.errstate(invalid='ignore'):
+            inside = (values >= lower) & (values <= upper)
+        # A missing value or a missing bound does not remove the row
+        keep &= inside | np.isnan(values) | np.isnan(lower) | np.isnan(upper)
+    return keep
+
+
+def remove_outliers(df, columns, lower_percentile, upper_percentile, group_by=None, min_group_size=MIN_GROUP_SIZE):
+    """
+    Removes the rows outside the percentile bounds of any of the columns, per group.
+
+    Parameters:
+        df (DataFrame): The pandas DataFrame to process.
+        columns (list): The numeric columns to cut, e.g. ['NumberofEmployees', 'FeePaid'].
+        lower_percentile (float): The lower percentile cutoff, between 0 and 100.
+        upper_percentile (float): The upper percentile cutoff, between 0 and 100.
+        group_by (str or list): The column or columns of the groups, e.g. 'BusinessType', or None.
+        min_group_size (int): Groups with fewer values of a column use the bounds of all rows for it.
+    Returns:
+        DataFrame: The rows without outliers.
+    Raises:
+        KeyError: If a column does not exist in the DataFrame.
+    """
+    if df.empty:
+        return df
+    bounds = quantile_bounds(df, columns, lower_percentile, upper_percentile, group_by, min_group_size)
+    return df[outlier_mask(df, columns, bounds, group_by)]
+
+
+def validate_percentiles(lower_percentile, upper_percentile):
+    """Raises a ValueError unless 0 <= lower_percentile <= upper_percentile <= 100."""
+    if not 0 <= lower_percentile <= upper_percentile <= 100:
+        raise ValueError("Error: Percentiles must satisfy 0 <= lower_percentile <= upper_percentile <= 100.")
+
+
+class QuantileSketch:
+    """
+    Counts the values of several columns per group, chunk by chunk, to compute their percentiles afterwards.
+
+    Attributes:
+        columns (list): The counted columns.
+        group_by (str or list): The group columns, or None for one group of all rows.
+        relative_accuracy (float): The relative error of the logarithmic bins, or None for exact counts.
+    Methods:
+        update(df): Counts the values of a chunk.
+        merge(other): Adds the counts of another sketch with the same settings.
+        percentiles(percentiles): Returns the percentiles of every group and column.
+        bounds(lower_percentile, upper_percentile, min_group_size): Returns the bounds of `quantile_bounds`.
+    """
+    def __init__(self, columns, group_by=None, relative_accuracy=None):
+        """
+        Starts a sketch without values.
+
+        Parameters:
+            columns (list): The numeric columns to count.
+            group_by (str or list): The column or columns of the groups, or None.
+            relative_accuracy (float): Between 0 and 1 for logarithmic bins, or None to count every value.
+        Raises:
+            ValueError: If relative_accuracy is not between 0 and 1.
+        """
+        if relative_accuracy is not None and not 0 < relative_accuracy < 1:
+            raise ValueError("[QuantileSketch] Error: relative_accuracy must be between 0 and 1.")
+        self.columns = list(columns)
+        self.group_by = group_by
+        self.relative_accuracy = relative_accuracy
+        self._log_gamma = None
+        if relative_accuracy is not None:
+            self._log_gamma = np.log((1 + relative_accuracy) / (1 - relative_accuracy))
+        self._counts = pd.Series(dtype=float)
+
+    def _bin_values(self, values):
+        """Returns the value which stands for the bin of every value: itself when exact, else its log bin."""
+        if self._log_gamma is None:
+            return values
+        magnitude = np.abs(values)
+        with np.errstate(divide='ignore'):
+            index = np.ceil(np.log(magnitude) / self._log_gamma)
+        # The middle of bin (gamma^(i-1), gamma^i] in relative terms, 0 stays 0
+        middle = 2 * np.exp(index * self._log_gamma) / (1 + np.exp(self._log_gamma))
+        return np.where(magnitude > 0, np.sign(values) * middle, 0.0)
+
+    def update(self, df):
+        """
+        Counts the values of a chunk.
+
+        Parameters:
+            df (DataFrame): Rows with the counted columns and the group columns.
+        """
+        labels = group_labels(df, self.group_by)
+        codes, groups = pd.factorize(labels)
+        parts = []
+        for column in self.columns:
+            values = pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float)
+            present = ~np.isnan(values)
+            parts.append(pd.DataFrame({'group': codes[present], 'column': column,
+                                       'value': self._bin_values(values[present])}))
+        long = pd.concat(parts, ignore_index=True)
+        counts = long.groupby(['group', 'column', 'value'], sort=False).size()
+        # Back from the codes of this chunk to the group labels
+        group_level = groups.to_flat_index().take(counts.index.get_level_values('group'))
+        counts.index = pd.MultiIndex.from_arrays([group_level, counts.index.get_level_values('column'),
+                                                  counts.index.get_level_values('value')],
+                                                 names=['group', 'column', 'value'])
+        self._counts = counts.astype(float) if self._counts.empty else self._counts.add(counts, fill_value=0)
+
+    def merge(self, other):
+        """
+        Adds the counts of another sketch, e.g. of another file or process.
+
+        Parameters:
+            other (QuantileSketch): A sketch with the same columns, groups and accuracy.
+        Raises:
+            ValueError: If the settings of the sketches differ.
+        """
+        if (other.columns != self.columns or other.group_by != self.group_by or
+                other.relative_accuracy != self.relative_accuracy):
+            raise ValueError("[QuantileSketch] Error: Only sketches with the same settings can be merged.")
+        self._counts = other._counts.copy() if self._counts.empty else self._counts.add(other._counts, fill_value=0)
+
+    def __len__(self):
+        """Returns the number of counted (group, column, value) bins."""
+        return len(self._counts)
+
+    @staticmethod
+    def _percentiles_from_counts(counts, percentiles):
+        """
+        Computes percentiles from sorted counts, one segment per leading index levels.
+
+        Parameters:
+            counts (Series): Counts indexed by (segment levels..., value), sorted.
+            percentiles (list): The percentiles, between 0 and 100.
+        Returns:
+            DataFrame: One row per segment, one column per percentile, and the 'count' of every segment.
+        """
+        segment_levels = list(range(counts.index.nlevels - 1))
+        segments = counts.groupby(level=segment_levels, sort=False).ngroup().to_numpy()
+        values = counts.index.get_level_values(-1).to_numpy(dtype=float)
+        cumulative = counts.groupby(level=segment_levels, sort=False).cumsum().to_numpy()
+        totals = counts.groupby(level=segment_levels, sort=False).sum()
+        total_per_row = totals.to_numpy()[segments]
+        result = pd.DataFrame({'count': totals.to_numpy()}, index=totals.index)
+        for percentile in percentiles:
+            position = percentile / 100 * (total_per_row - 1)
+            picked = []
+            for target in (np.floor(position), np.ceil(position)):
+                # The first value of every segment whose running count passes the target rank
+                rows = np.flatnonzero(cumulative > target)
+                first = pd.Series(values[rows]).groupby(segments[rows]).first()
+                picked.append(first.reindex(range(len(totals))).to_numpy())
+            fraction = pd.Series(position - np.floor(position)).groupby(segments).first().to_numpy()
+            result[percentile] = picked[0] + (picked[1] - picked[0]) * fraction
+        return result
+
+    def percentiles(self, percentiles):
+        """
+        Returns the percentiles of every group and column.
+
+        Parameters:
+            percentiles (list): The percentiles, between 0 and 100.
+        Returns:
+            DataFrame: Indexed by (group, column), one column per percentile and the 'count' of values.
+        """
+        if self._counts.empty:
+            return pd.DataFrame(columns=['count'] + list(percentiles))
+        return self._percentiles_from_counts(self._counts.sort_index(), percentiles)
+
+    def bounds(self, lower_percentile, upper_percentile, min_group_size=MIN_GROUP_SIZE):
+        """
+        Returns the percentile bounds of every group, in the format of `quantile_bounds`.
+
+        Parameters:
+            lower_percentile (float): The lower percentile, between 0 and 100.
+            upper_percentile (float): The upper percentile, between 0 and 100.
+            min_group_size (int): Groups with fewer values of a column use the bounds of all rows for it.
+        Returns:
+            DataFrame: One row per group label, with the columns (column, 'lower') and (column, 'upper').
+        """
+        validate_percentiles(lower_percentile, upper_percentile)
+        cut = [lower_percentile, upper_percentile]
+        per_group = self.percentiles(cut)
+        if per_group.empty:
+            return bounds_frame(pd.Index([], dtype=object), self.columns, np.zeros((0, len(self.columns))),
+                                np.zeros((0, len(self.columns))))
+        groups = per_group.index.get_level_values(0).unique()
+        lower = per_group[lower_percentile].unstack('column').reindex(index=groups, columns=self.columns)
+        upper = per_group[upper_percentile].unstack('column').reindex(index=groups, columns=self.columns)
+        if self.group_by is not None:
+            overall = self._percentiles_from_counts(
+                self._counts.groupby(level=['column', 'value']).sum().sort_index(), cut).reindex(self.columns)
+            counts = per_group['count'].unstack('column').reindex(index=groups, columns=self.columns).fillna(0)
+            small = counts.to_numpy() < min_group_size
+            lower = lower.mask(small, np.broadcast_to(overall[lower_percentile].to_numpy(), small.shape))
+            upper = upper.mask(small, np.broadcast_to(overall[upper_percentile].to_numpy(), small.shape))
+        if self.group_by is not None and not isinstance(self.group_by, str):
+            groups = pd.MultiIndex.from_tuples(groups, names=list(self.group_by))
+        return bounds_frame(groups, self.columns, lower.to_numpy(), upper.to_numpy())
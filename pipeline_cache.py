@@ -0,0 +1,318 @@
+"""
+Strong/Sizhi Chen
+CS 5001, Fall 2024
+Final Project -- pipeline_cache.py
+
+Stage-Level Cache for the Cleaning Pipeline
+
+This script defines the `PipelineCache` class, which remembers the output of every stage of a cleaning pipeline
+on disk, so re-running the pipeline after changing one stage only re-runs that stage and the ones after it.
+
+Key Features:
+1. **Content-Hash Keys**:
+   - The first key is a hash of the source file bytes. Every later key hashes the previous key, the stage
+     function's name, its code fingerprint and its arguments, which include constants such as
+     `TRADE_NAME_MAPPINGS` or `LOWER_THRESHOLD`. A key therefore changes whenever the stage's input data,
+     code or parameters change.
+   - The code fingerprint covers the source of the stage function and of every function and class of the
+     project it uses, directly or through other helpers and modules (e.g. `NameStandardizer` behind
+     `update_values_based_on_mapping`, or `outliers.quantile_bounds` behind `remove_outliers`), with the
+     module constants and default arguments they read.
+
+2. **Resume**:
+   - The pipeline starts from the output of the last stage which is still cached.
+
+3. **Size-Capped LRU Eviction**:
+   - Results are pickled files whose modification time is refreshed on every hit, and the least recently
+     used files are removed once the cache is bigger than `max_bytes`.
+"""
+
+
+# Import modules
+import hashlib
+import inspect
+import json
+import os
+import re
+import sys
+import types
+import pandas as pd
+
+
+# Set constants
+CACHE_DIR = '.pipeline_cache'
+CACHE_MAX_BYTES = 2 * 1024 ** 3
+FILE_HASH_INDEX = 'file_hashes.json'
+READ_BLOCK_SIZE = 1024 * 1024
+
+
+CONSTANT_TYPES = (str, bytes, int, float, bool, type(None), tuple, list, dict, set, frozenset, re.Pattern)
+
+_fingerprints = {}
+
+
+def stage_name(stage):
+    """Returns the name of a (function, kwargs) stage."""
+    return stage[0].__name__
+
+
+def project_root(obj):
+    """Returns the folder of the module which defines an object, or None for built-in objects."""
+    module = obj if inspect.ismodule(obj) else sys.modules.get(getattr(obj, '__module__', None) or '')
+    filename = getattr(module, '__file__', None)
+    return os.path.dirname(os.path.abspath(filename)) if filename else None
+
+
+def code_objects(obj):
+    """Returns the code objects of a function or of the methods of a class, with their nested code."""
+    if inspect.isclass(obj):
+        functions = []
+        for value in vars(obj).values():
+            value = getattr(value, '__func__', value)
+            functions += [part for part in (value, getattr(value, 'fget', None), getattr(value, 'fset', None))
+                          if inspect.isfunction(part)]
+    else:
+        functions = [obj]
+    pending = [function.__code__ for function in functions]
+    codes = []
+    while pending:
+        code = pending.pop()
+        codes.append(code)
+        pending += [const for const in code.co_consts if isinstance(const, types.CodeType)]
+    return codes
+
+
+def code_fingerprint(function):
+    """
+    Hashes the code a stage function runs, within the folder of its module.
+
+    Follows every global name the function uses to the functions, classes and modules of the project, and
+    their names in turn, and hashes their source code, the module constants they read and their default
+    arguments. Functions of other packages (e.g. pandas) are identified by their name only.
+
+    Args: function (callable): The stage function.
+    Returns: str: A SHA-256 hex digest, computed once per function and process.
+    """
+    if function in _fingerprints:
+        return _fingerprints[function]
+    root = project_root(function)
+    digest = hashlib.sha256()
+    seen = set()
+    pending = [function]
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        if inspect.ismodule(obj):
+            # A module used as a value, e.g. `outliers.quantile_bounds`, is hashed as a whole
+            with open(obj.__file__, 'rb') as f:
+                digest.update(f.read())
+            continue
+        try:
+            digest.update(inspect.getsource(obj).encode('utf-8'))
+        except (OSError, TypeError):
+            digest.update(getattr(obj, '__qualname__', '').encode('utf-8'))
+        if inspect.isfunction(obj):
+            digest.update(repr((obj.__defaults__, obj.__kwdefaults__)).encode('utf-8'))
+        namespace = vars(sys.modules[obj.__module__])
+        for code in code_objects(obj):
+            for name in code.co_names:
+                if name not in namespace:
+                    continue
+                value = namespace[name]
+                if inspect.isfunction(value) or inspect.isclass(value) or inspect.ismodule(value):
+                    if project_root(value) == root:
+                        pending.append(value)
+                elif isinstance(value, CONSTANT_TYPES):
+                    digest.update(f'{obj.__module__}.{name}={value!r}'.encode('utf-8'))
+    _fingerprints[function] = digest.hexdigest()
+    return _fingerprints[function]
+
+
+class PipelineCache:
+    """
+    Caches the output of every stage of a cleaning pipeline on disk.
+
+    A stage is a tuple (function, kwargs) where the function takes a DataFrame as its first argument and
+    returns a DataFrame. The reader stage takes the source file name instead of a DataFrame.
+
+    Attributes:
+        cache_dir (str): The folder which stores the cached results.
+        max_bytes (int): The maximum total size of the cached results.
+    Methods:
+        file_hash(filename): Returns the content hash of a file, reusing it while the file is unchanged.
+        stage_keys(source_file, reader, stages): Returns the cache key of every stage.
+        run(source_file, reader, stages): Runs the pipeline, resuming from the last cached stage.
+        evict(): Removes the least recently used results until the cache fits in `max_bytes`.
+        clear(): Removes every cached result.
+    """
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        """
+        Initializes a new PipelineCache.
+
+        Args: cache_dir (str): The folder which stores the cached results.
+              max_bytes (int): The maximum total size of the cached results.
+        """
+        if not isinstance(cache_dir, str):
+            raise ValueError("cache_dir must be a string.")
+        if not isinstance(max_bytes, int) or max_bytes <= 0:
+            raise ValueError("max_bytes must be a positive integer.")
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        """Returns the file which stores the result of a key."""
+        return os.path.join(self.cache_dir, key + '.pkl')
+
+    def file_hash(self, filename):
+        """
+        Returns the SHA-256 hash of a file's content.
+
+        The hash is remembered together with the file's size and modification time,
+        so an unchanged multi-hundred-MB export is only read once.
+
+        Args: filename (str): The file to hash.
+        Returns: str: The hexadecimal hash.
+        """
+        index_file = os.path.join(self.cache_dir, FILE_HASH_INDEX)
+        try:
+            with open(index_file) as f:
+                index = json.load(f)
+        except (IOError, ValueError):
+            index = {}
+        status = os.stat(filename)
+        signature = [status.st_size, status.st_mtime_ns]
+        entry = index.get(os.path.abspath(filename))
+        if entry and entry['signature'] == signature:
+            return entry['hash']
+
+        digest = hashlib.sha256()
+        with open(filename, 'rb') as f:
+            for block in iter(lambda: f.read(READ_BLOCK_SIZE), b''):
+                digest.update(block)
+        index[os.path.abspath(filename)] = {'signature': signature, 'hash': digest.hexdigest()}
+        # Write a temporary file first, so pipelines running in parallel never read half an index
+        temporary_file = f'{index_file}.{os.getpid()}'
+        with open(temporary_file, 'w') as f:
+            json.dump(index, f)
+        os.replace(temporary_file, index_file)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _stage_key(previous_key, stage):
+        """Hashes the previous key with the stage's function, code fingerprint and arguments."""
+        function, kwargs = stage
+        digest = hashlib.sha256()
+        for part in (previous_key, function.__module__, function.__qualname__, code_fingerprint(function),
+                     repr(sorted(kwargs.items()))):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def stage_keys(self, source_file, reader, stages):
+        """
+        Returns the cache key of the reader and of every stage, without running anything.
+
+        Args: source_file (str): The file the reader loads.
+              reader (tuple): The (function, kwargs) stage which loads the file.
+              stages (list): The (function, kwargs) stages which follow the reader.
+        Returns: list: One key for the reader followed by one key per stage.
+        """
+        keys = [self._stage_key(self.file_hash(source_file), reader)]
+        for stage in stages:
+            keys.append(self._stage_key(keys[-1], stage))
+        return keys
+
+    def _load(self, key):
+        """Loads a cached result and marks it as recently used."""
+        path = self._path(key)
+        df = pd.read_pickle(path)
+        os.utime(path)
+        return df
+
+    def _store(self, key, df):
+        """Saves a result and evicts old results if the cache is too big."""
+        path = self._path(key)
+        df.to_pickle(path)
+        if os.path.getsize(path) > self.max_bytes:
+            os.remove(path)
+            return
+        self.evict(keep=path)
+
+    def run(self, source_file, reader, stages):
+        """
+        Runs the pipeline, starting from the output of the last stage which is still cached.
+
+        Args: source_file (str): The file the reader loads.
+              reader (tuple): The (function, kwargs) stage which loads the file.
+              stages (list): The (function, kwargs) stages which follow the reader.
+        Returns: DataFrame: The output of the last stage.
+        """
+        if not isinstance(stages, list):
+            raise ValueError("stages must be a list of (function, kwargs) tuples.")
+        keys = self.stage_keys(source_file, reader, stages)
+        start = len(keys) - 1
+        while start >= 0 and not os.path.exists(self._path(keys[start])):
+            start -= 1
+
+        if start >= 0:
+            df = self._load(keys[start])
+            names = [stage_name(reader)] + [stage_name(stage) for stage in stages]
+            print(f"Resuming {source_file} after cached stage {start}: {names[start]}.")
+        else:
+            df = reader[0](source_file, **reader[1])
+            self._store(keys[0], df)
+            start = 0
+
+        for index in range(start, len(stages)):
+            function, kwargs = stages[index]
+            df = function(df, **kwargs)
+            self._store(keys[index + 1], df)
+        return df
+
+    def _entries(self):
+        """Returns (modification time, size, path) of every cached result."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.pkl'):
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    status = os.stat(path)
+                except FileNotFoundError:
+                    # Evicted by another pipeline in the meantime
+                    continue
+                entries.append((status.st_mtime_ns, status.st_size, path))
+        return entries
+
+    def evict(self, keep=None):
+        """
+        Removes the least recently used results until the cache fits in `max_bytes`.
+
+        Args: keep (str): A result file which must not be removed, e.g. the one just written.
+        Returns: int: The number of removed results.
+        """
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        """Removes every cached result."""
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -11,21 +11,32 @@ Key Features:
 1. **Bar Plot**:
    - Creates a horizontal bar plot for the top `n` entries based on aggregated values of a specified column.
    - Includes customizable themes and bar colors.
+   - Ranks the sums with the partial selection of `ranking.top_n` instead of sorting them all.
+   - Accepts an `AggregateCube` instead of the DataFrame to skip the grouping and ranking.
+   - Accepts a `BusinessQuery` and filters, e.g. (('Local Area', 'Kitsilano'),), to rank only the matching
+     businesses through its indexes.
 
 2. **Scatter Plot**:
    - Visualizes the relationship between two variables using a scatter plot.
    - Optionally includes a linear regression line for trend analysis.
+   - Above `SCATTER_POINT_LIMIT` points, switches to a hexbin density plot (or a stratified sample),
+     so large datasets render in bounded time. The regression is fitted from running sums in chunks
+     and drawn as a two-point line.
 
 3. **Heatmaps**:
    - Generates a correlation heatmap to show relationships between dataset features.
    - Includes options for a full-feature heatmap or a single-column correlation heatmap.
+   - Accepts a `CorrelationMatrix` instead of the DataFrame to reuse the precomputed correlations.
+
+Figures are created with `matplotlib.figure.Figure` rather than `pyplot`, so they are not tracked by pyplot's
+figure manager and are freed as soon as the GUI drops them.
 
 Customization Options:
 - Users can specify background colors and colormaps for plots to match themes or improve visualization aesthetics.
 
 Functions:
-- `bar_plot(x_axis, y_axis, top_n, data, theme_color, bar_color)`: Creates a horizontal bar plot.
-- `scatter_plot(x_axis, y_axis, data, theme_color, bar_color)`: Creates a scatter plot with an optional regression line.
+- `bar_plot(x_axis, y_axis, top_n, data, theme_color, bar_color, filters)`: Creates a horizontal bar plot.
+- `scatter_plot(x_axis, y_axis, data, theme_color, bar_color, mode)`: Creates a scatter plot with an optional regression line.
 - `heatmap(data, background_color, cell_color)`: Generates a correlation heatmap for all features.
 - `single_column_heatmap(data, column, background_color, cell_color)`: Creates a heatmap showing correlations with a single column.
 
@@ -34,12 +45,21 @@ This script is useful for quick exploratory data analysis (EDA) and creating pol
 
 
 # Import modules
-import matplotlib.pyplot as plt
-from matplotlib import colormaps
-from matplotlib.colors import is_color_like
+# Matplotlib and Seaborn are imported inside the functions, so importing this module (e.g. by the GUI at
+# startup) does not load them before the first plot is drawn
 import numpy as np
-import seaborn as sns
 import pandas as pd
+from aggregate_cube import AggregateCube
+from query import BusinessQuery
+from correlation import CorrelationMatrix
+from ranking import top_n as rank_top_n
+
+
+# Set constants
+SCATTER_MODES = ['auto', 'points', 'density', 'sample']
+SCATTER_POINT_LIMIT = 50000
+SCATTER_GRID_SIZE = 60
+REGRESSION_CHUNK_SIZE = 65536
 
 
 # Validate input function
@@ -57,6 +77,7 @@ def validate_positive_integer(value, name, func_name):
 
 def validate_color_cmap(color, func_name):
     """Validates the color input by trying to convert it using Matplotlib."""
+    from matplotlib import colormaps
     try:
         colormaps.get_cmap(color)
     except ValueError:
@@ -65,12 +86,13 @@ def validate_color_cmap(color, func_name):
 
 def validate_color_normal(color, param_name, func_name):
     """Validates that the given color is a valid Matplotlib color."""
+    from matplotlib.colors import is_color_like
     if not is_color_like(color):
         raise ValueError(f"[{func_name}] Error: '{color}' is not a valid color for '{param_name}'.")
 
 
 # Plotting
-def bar_plot(x_axis, y_axis, top_n, data, theme_color, bar_color):
+def bar_plot(x_axis, y_axis, top_n, data, theme_color, bar_color, filters=None):
     """
     Creates a horizontal bar plot showing the top `n` entries of a dataset based on the sum of values for a specified column, with a customizable theme and bar colors.
 
@@ -78,23 +100,41 @@ def bar_plot(x_axis, y_axis, top_n, data, theme_color, bar_color):
         x_axis (str): The column name for the x-axis (categories).
         y_axis (str): The column name for the y-axis (values to aggregate and display).
         top_n (int): The number of top entries to include in the plot.
-        data (DataFrame): The dataset containing the data for the plot.
+        data (DataFrame, AggregateCube or BusinessQuery): The dataset containing the data for the plot, its
+            precomputed `AggregateCube`, which only needs to slice the top `n` entries, or its `BusinessQuery`.
         theme_color (str): Background color for the plot (e.g., "white", "#f0f0f0").
         bar_color (str): Matplotlib colormap name for bar colors (e.g., "viridis", "plasma").
+        filters (tuple): (column, value) pairs of a `BusinessQuery`, e.g. (('Local Area', 'Kitsilano'),).
+            Only used with a `BusinessQuery`.
     Returns:
         matplotlib.figure.Figure: The generated bar plot as a Matplotlib figure object.
     """
+    from matplotlib import colormaps
+    from matplotlib.figure import Figure
     # Validating inputs
-    if not isinstance(data, pd.DataFrame):
-        raise ValueError("[bar_plot] Error: bar_plot.data must be a pandas DataFrame.")
-    validate_dataframe_column(data, x_axis, "bar_plot")
-    validate_dataframe_column(data, y_axis, "bar_plot")
+    if isinstance(data, AggregateCube):
+        if (x_axis, y_axis) not in data:
+            raise ValueError(f"[bar_plot] Error: No sums of '{y_axis}' by '{x_axis}' in the aggregate cube.")
+    elif isinstance(data, BusinessQuery):
+        if y_axis not in data.measures or x_axis not in [data.key] + data.dimensions:
+            raise ValueError(f"[bar_plot] Error: The business query cannot rank '{y_axis}' by '{x_axis}'.")
+    elif isinstance(data, pd.DataFrame):
+        validate_dataframe_column(data, x_axis, "bar_plot")
+        validate_dataframe_column(data, y_axis, "bar_plot")
+    else:
+        raise ValueError("[bar_plot] Error: bar_plot.data must be a pandas DataFrame, an AggregateCube "
+                         "or a BusinessQuery.")
     validate_positive_integer(top_n, "top_n", "bar_plot")
     validate_color_cmap(bar_color, "bar_plot")
     validate_color_normal(theme_color, "theme_color", "bar_plot")
 
     # Selecting top_n entries and reversing the order
-    top_data = data.groupby(x_axis)[y_axis].sum().sort_values(ascending=False).head(top_n)[::-1]
+    if isinstance(data, AggregateCube):
+        top_data = data.top(x_axis, y_axis, top_n)[::-1]
+    elif isinstance(data, BusinessQuery):
+        top_data = data.top(y_axis, top_n, filters, by=x_axis)[::-1]
+    else:
+        top_data = rank_top_n(data.groupby(x_axis)[y_axis].sum(), top_n)[::-1]
 
     # Create a colormap
     cmap = colormaps.get_cmap(bar_color).resampled(top_n)  # Create a colormap with `top_n` discrete colors
@@ -104,13 +144,17 @@ def bar_plot(x_axis, y_axis, top_n, data, theme_color, bar_color):
     font_size = 10
 
     # Create the bar plot
-    fig, ax = plt.subplots(figsize=(6.5, 4), facecolor=theme_color)
+    fig = Figure(figsize=(6.5, 4), facecolor=theme_color)
+    ax = fig.subplots()
     bars = ax.barh(top_data.index, top_data.values, color=colors)
-    ax.set_title(f"Top {top_n} {x_axis} by {y_axis}", fontsize=12)
+    title = f"Top {top_n} {x_axis} by {y_axis}"
+    if isinstance(data, BusinessQuery) and filters:
+        title += ' in ' + ', '.join(str(value) for _, value in filters)
+    ax.set_title(title, fontsize=12)
     ax.set_xlabel(y_axis)
     ax.set_ylabel(x_axis)
     ax.tick_params(axis='both', labelsize=font_size)
-    plt.tight_layout()
+    fig.tight_layout()
 
     # Add text labels on the bars with opposite color
     for bar, color, value in zip(bars, colors, top_data.values):
@@ -146,7 +190,68 @@ def bar_plot(x_axis, y_axis, top_n, data, theme_color, bar_color):
     return fig
 
 
-def scatter_plot(x_axis, y_axis, data, theme_color, bar_color):
+def linear_fit(x, y, chunk_size=REGRESSION_CHUNK_SIZE):
+    """
+    Fits a least squares line from running sums, reading the points in chunks.
+
+    The count, means and centered sums of squares of every chunk are merged into the running ones,
+    so the fit needs one pass and constant memory, and stays accurate for large values (e.g. register fees).
+    Pairs with a missing or infinite value are skipped.
+
+    Parameters:
+        x (array-like): The x values.
+        y (array-like): The y values.
+        chunk_size (int): The number of points read at a time.
+    Returns:
+        tuple: (slope, intercept), or None if fewer than two distinct x values are given.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    count, mean_x, mean_y, sxx, sxy = 0, 0.0, 0.0, 0.0, 0.0
+    for start in range(0, len(x), chunk_size):
+        cx, cy = x[start:start + chunk_size], y[start:start + chunk_size]
+        finite = np.isfinite(cx) & np.isfinite(cy)
+        cx, cy = cx[finite], cy[finite]
+        n = len(cx)
+        if n == 0:
+            continue
+        cmean_x, cmean_y = cx.mean(), cy.mean()
+        dx = cx - cmean_x
+        csxx, csxy = dx @ dx, dx @ (cy - cmean_y)
+        # Merge the chunk into the running sums
+        total = count + n
+        delta_x, delta_y = cmean_x - mean_x, cmean_y - mean_y
+        sxx += csxx + delta_x * delta_x * count * n / total
+        sxy += csxy + delta_x * delta_y * count * n / total
+        mean_x += delta_x * n / total
+        mean_y += delta_y * n / total
+        count = total
+    if count < 2 or sxx <= 0:
+        return None
+    slope = sxy / sxx
+    return slope, mean_y - slope * mean_x
+
+
+def stratified_sample(x, size, seed=0):
+    """
+    Picks `size` positions spread evenly over the ranks of x, one at random from every stratum.
+
+    Parameters:
+        x (array-like): The values to stratify on.
+        size (int): The number of positions to pick.
+        seed (int): The seed of the random pick, so the same data always gives the same sample.
+    Returns:
+        np.ndarray: The picked positions.
+    """
+    x = np.asarray(x)
+    if len(x) <= size:
+        return np.arange(len(x))
+    order = np.argsort(x, kind='stable')
+    offsets = np.random.default_rng(seed).random(size)
+    return order[((np.arange(size) + offsets) * len(x) / size).astype(int)]
+
+
+def scatter_plot(x_axis, y_axis, data, theme_color, bar_color, mode='auto'):
     """
     Creates a scatter plot visualizing the relationship between two variables with an optional linear regression line.
 
@@ -156,9 +261,14 @@ def scatter_plot(x_axis, y_axis, data, theme_color, bar_color):
         data (DataFrame): The dataset containing the data for the plot.
         theme_color (str): Background color for the plot (e.g., "white", "#f0f0f0").
         bar_color (str): Color for the scatter plot points.
+        mode (str): 'points' draws every point, 'density' a hexbin of the point counts, 'sample'
+            a stratified sample of `SCATTER_POINT_LIMIT` points. 'auto' (default) draws every point up to
+            `SCATTER_POINT_LIMIT` points and a hexbin above.
     Returns:
         matplotlib.figure.Figure: The generated scatter plot as a Matplotlib figure object.
     """
+    from matplotlib.figure import Figure
+    from matplotlib.colors import LinearSegmentedColormap
     # Validating inputs
     if not isinstance(data, pd.DataFrame):
         raise ValueError("[scatter_plot] Error: scatter_plot.data must be a pandas DataFrame.")
@@ -166,31 +276,49 @@ def scatter_plot(x_axis, y_axis, data, theme_color, bar_color):
     validate_dataframe_column(data, y_axis, "scatter_plot")
     validate_color_normal(theme_color, "theme_color", "scatter_plot")
     validate_color_normal(bar_color, "bar_color", "scatter_plot")
+    if mode not in SCATTER_MODES:
+        raise ValueError(f"[scatter_plot] Error: mode must be one of {SCATTER_MODES}.")
 
     # Create a new figure
-    fig, ax = plt.subplots(figsize=(6.5, 4), facecolor=theme_color)
+    fig = Figure(figsize=(6.5, 4), facecolor=theme_color)
+    ax = fig.subplots()
 
     # Get x-axis and y-axis data for the graph
-    x = data[x_axis]
-    y = data[y_axis]
-
-    # Create the scatter plot
-    ax.scatter(x, y, label='Data points', color=bar_color)
+    x = data[x_axis].to_numpy(dtype=float)
+    y = data[y_axis].to_numpy(dtype=float)
+    if mode == 'auto':
+        mode = 'points' if len(x) <= SCATTER_POINT_LIMIT else 'density'
+
+    # Create the scatter plot, or its density for large data
+    if mode == 'density':
+        density_map = LinearSegmentedColormap.from_list('density', [theme_color, bar_color])
+        collection = ax.hexbin(x, y, gridsize=SCATTER_GRID_SIZE, cmap=density_map, bins='log', mincnt=1)
+        fig.colorbar(collection, ax=ax, label='Number of points')
+    else:
+        if mode == 'sample':
+            sample = stratified_sample(x, SCATTER_POINT_LIMIT)
+            x_points, y_points = x[sample], y[sample]
+        else:
+            x_points, y_points = x, y
+        ax.scatter(x_points, y_points, label='Data points', color=bar_color)
 
-    # Get the Linear Regression
-    slope, intercept = np.polyfit(x, y, 1)
-    regression_line = slope * x + intercept
-    ax.plot(x, regression_line, color='#6C2666',
-            label=f'Regression line: {slope:.2f}x + {intercept:.2f}')
+    # Get the Linear Regression, drawn between the smallest and the largest x
+    fit = linear_fit(x, y)
+    if fit is not None:
+        slope, intercept = fit
+        x_ends = np.array([np.nanmin(x), np.nanmax(x)])
+        ax.plot(x_ends, slope * x_ends + intercept, color='#6C2666',
+                label=f'Regression line: {slope:.2f}x + {intercept:.2f}')
 
     # Add labels, title, and legend
     ax.set_xlabel(x_axis)
     ax.set_ylabel(y_axis)
     ax.set_title(f'Relationship between {x_axis} and {y_axis}')
-    ax.legend()
+    if ax.get_legend_handles_labels()[0]:
+        ax.legend()
 
     # Adjust the spacing to minimize white space
-    plt.tight_layout(pad=1)
+    fig.tight_layout(pad=1)
     return fig
 
 
@@ -199,20 +327,25 @@ def heatmap(data, background_color, cell_color):
     Generates a heatmap displaying the absolute correlation between features in a dataset.
 
     Parameters:
-        data (DataFrame): The dataset whose correlations are to be visualized.
+        data (DataFrame or CorrelationMatrix): The dataset whose correlations are to be visualized,
+            or its precomputed correlations.
         background_color (str): Background color of the figure (e.g., "white", "#f0f0f0").
         cell_color (str): Colormap for the heatmap cells (e.g. "viridis").
     Returns:
         matplotlib.figure.Figure: The generated heatmap as a Matplotlib figure object.
     """
-    if not isinstance(data, pd.DataFrame):
-        raise ValueError("[heatmap] Error: heatmap.data must be a pandas DataFrame.")
+    from matplotlib.figure import Figure
+    import seaborn as sns
+    if not isinstance(data, (pd.DataFrame, CorrelationMatrix)):
+        raise ValueError("[heatmap] Error: heatmap.data must be a pandas DataFrame or a CorrelationMatrix.")
     validate_color_cmap(cell_color, "heatmap")
     validate_color_normal(background_color, "background_color", "heatmap")
 
     # Create the heatmap
-    fig, ax = plt.subplots(figsize=(4, 2.5), facecolor=background_color)
-    sns.heatmap(data.corr().abs(), vmin=0, vmax=1, annot=True, cmap=cell_color, ax=ax,
+    fig = Figure(figsize=(4, 2.5), facecolor=background_color)
+    ax = fig.subplots()
+    corr = data.matrix() if isinstance(data, CorrelationMatrix) else data.corr()
+    sns.heatmap(corr.abs(), vmin=0, vmax=1, annot=True, cmap=cell_color, ax=ax,
                 fmt=".2f")
 
     # Set x and y labels
@@ -223,7 +356,7 @@ def heatmap(data, background_color, cell_color):
     ax.set_title('Correlation Heatmap', fontdict={'fontsize': 10}, pad=5)
 
     # Adjust heatmap
-    plt.tight_layout()
+    fig.tight_layout()
     return fig
 
 
@@ -232,24 +365,30 @@ def single_column_heatmap(data, column, background_color, cell_color):
     Generates a heatmap showing the absolute correlation between a specific column and all other columns in a dataset.
 
     Parameters:
-        data (DataFrame): The dataset whose correlations are to be visualized.
+        data (DataFrame or CorrelationMatrix): The dataset whose correlations are to be visualized,
+            or its precomputed correlations.
         column (str): The column name for which correlations with other columns are computed.
         background_color (str): Background color of the figure (e.g., "white", "#f0f0f0").
         cell_color (str): Colormap for the heatmap cells (e.g. "viridis").
     Returns:
         matplotlib.figure.Figure: The generated heatmap as a Matplotlib figure object.
     """
-    if not isinstance(data, pd.DataFrame):
-        raise ValueError("[single_column_heatmap] Error: single_column_heatmap.data must be a pandas DataFrame.")
+    from matplotlib.figure import Figure
+    import seaborn as sns
+    if not isinstance(data, (pd.DataFrame, CorrelationMatrix)):
+        raise ValueError("[single_column_heatmap] Error: single_column_heatmap.data must be a pandas DataFrame "
+                         "or a CorrelationMatrix.")
     validate_dataframe_column(data, column, "single_column_heatmap")
     validate_color_cmap(cell_color, "single_column_heatmap")
     validate_color_normal(background_color, "background_color", "single_column_heatmap")
 
     # Keep it in 2D
-    corr_column = data.corr().abs()[[column]].sort_values(by=column, ascending=False)
+    corr = data.matrix() if isinstance(data, CorrelationMatrix) else data.corr()
+    corr_column = corr.abs()[[column]].sort_values(by=column, ascending=False)
 
     # Create the single column heatmap
-    fig, ax = plt.subplots(figsize=(2.5, 2.5), facecolor=background_color)
+    fig = Figure(figsize=(2.5, 2.5), facecolor=background_color)
+    ax = fig.subplots()
     sns.heatmap(corr_column, vmin=0, vmax=1, annot=True,
                 cmap=cell_color, ax=ax, fmt=".2f")
 
@@ -260,5 +399,5 @@ def single_column_heatmap(data, column, background_color, cell_color):
     ax.set_title(f'Correlation with {column}', fontdict={'fontsize': 10}, pad=10)
 
     # Adjust heatmap
-    plt.tight_layout()
+    fig.tight_layout()
     return fig
@@ -0,0 +1,175 @@
+"""
+Strong/Sizhi Chen
+CS 5001, Fall 2024
+Final Project -- plot_worker.py
+
+Background Plotting for the GUI
+
+This script defines the `PlotWorker` class, which draws the figures of the GUI in a worker thread, so the Tk
+window stays responsive while Matplotlib and Seaborn build a plot.
+
+Key Features:
+1. **Off-Screen Rendering**:
+   - The worker builds the figure with the plot functions of `plot.py` and rasterizes it with an off-screen
+     Agg canvas. The Tk thread only copies the finished pixels to the canvas of the frame (see `CanvasManager`),
+     instead of rendering the figure itself.
+
+2. **Debounce and Coalescing**:
+   - Requests for the same slot (e.g. the business plot) wait `debounce_ms` before they start, and every new
+     request replaces the waiting one, so spinning a spinbox only draws the final value.
+   - A request which is already queued is cancelled, and the result of an outdated request is cached but not shown.
+
+3. **Tk-Safe Hand-Off**:
+   - Results are passed through a queue which the Tk thread empties with `master.after`,
+     so no Tk call is made from the worker thread.
+"""
+
+
+# Import modules
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue, Empty
+
+
+# Set constants
+DEBOUNCE_MS = 150
+POLL_MS = 30
+
+
+def render_figure(function, args):
+    """
+    Builds the figure of `function(*args)` and renders it with an off-screen Agg canvas.
+
+    Parameters:
+        function (callable): A plot function of `plot.py`.
+        args (tuple): The arguments of the plot function.
+    Returns:
+        Figure: The figure, whose `canvas.renderer` holds its pixels.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    fig = function(*args)
+    FigureCanvasAgg(fig).draw()
+    return fig
+
+
+class PlotWorker:
+    """
+    Draws figures in a worker thread, keeping only the latest request per slot.
+
+    Attributes:
+        master (Tk): The root window, used to schedule work on the Tk thread.
+        figure_cache (FigureCache): The cache of drawn figures, only used from the Tk thread.
+        version (int): The version of the data, see `figure_cache.data_version`.
+        debounce_ms (int): The milliseconds a request waits for a newer request of the same slot.
+    Methods:
+        submit(slot, function, args, callback): Requests a figure and calls `callback(fig)` on the Tk thread.
+        cancel(slot): Drops the waiting request of a slot and ignores the one being drawn.
+        shutdown(): Stops the worker thread.
+    """
+    def __init__(self, master, figure_cache, version=None, debounce_ms=DEBOUNCE_MS, poll_ms=POLL_MS):
+        """
+        Starts the worker thread and the polling of its results.
+
+        Parameters:
+            master (Tk): The root window.
+            figure_cache (FigureCache): The cache of drawn figures.
+            version (int): The version of the data.
+            debounce_ms (int): The milliseconds a request waits for a newer request of the same slot.
+            poll_ms (int): The milliseconds between two checks for finished figures.
+        """
+        if not isinstance(debounce_ms, int) or debounce_ms < 0:
+            raise ValueError("[PlotWorker] Error: debounce_ms must be a non-negative integer.")
+        if not isinstance(poll_ms, int) or poll_ms <= 0:
+            raise ValueError("[PlotWorker] Error: poll_ms must be a positive integer.")
+        self.master = master
+        self.figure_cache = figure_cache
+        self.version = version
+        self.debounce_ms = debounce_ms
+        self.poll_ms = poll_ms
+        # One thread, so at most one figure is built at a time
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._results = Queue()
+        self._generation = {}
+        self._waiting = {}
+        self._running = {}
+        self._closed = False
+        self._poll_id = self.master.after(self.poll_ms, self._poll)
+
+    def submit(self, slot, function, args, callback):
+        """
+        Requests the figure of `function(*args)` for a slot.
+
+        A cached figure is handed over at once. Otherwise the request is debounced, drawn in the worker thread
+        and handed over by `callback(fig)` on the Tk thread, unless a newer request for the slot was made.
+
+        Parameters:
+            slot (str): The name of the place the figure is shown, e.g. the frame.
+            function (callable): A plot function of `plot.py`.
+            args (tuple): The arguments of the plot function.
+            callback (callable): Takes the figure and shows it.
+        """
+        if self._closed:
+            return
+        self._generation[slot] = self._generation.get(slot, 0) + 1
+        generation = self._generation[slot]
+        if slot in self._waiting:
+            self.master.after_cancel(self._waiting.pop(slot))
+
+        fig = self.figure_cache.get(function, *args, version=self.version)
+        if fig is not None:
+            callback(fig)
+            return
+        self._waiting[slot] = self.master.after(self.debounce_ms, self._start, slot, generation,
+                                                function, args, callback)
+
+    def cancel(self, slot):
+        """
+        Drops the waiting request of a slot, and ignores the result of the one being drawn.
+
+        Parameters:
+            slot (str): The name of the place the figure is shown.
+        """
+        self._generation[slot] = self._generation.get(slot, 0) + 1
+        if slot in self._waiting:
+            self.master.after_cancel(self._waiting.pop(slot))
+
+    def _start(self, slot, generation, function, args, callback):
+        """Hands a debounced request to the worker thread, cancelling the queued one of the same slot."""
+        self._waiting.pop(slot, None)
+        if self._closed:
+            return
+        if slot in self._running:
+            self._running.pop(slot).cancel()
+        future = self._executor.submit(render_figure, function, args)
+        self._running[slot] = future
+        future.add_done_callback(
+            lambda done: self._results.put((slot, generation, function, args, callback, done)))
+
+    def _poll(self):
+        """Hands the finished figures to their callbacks on the Tk thread."""
+        self._poll_id = self.master.after(self.poll_ms, self._poll)
+        while True:
+            try:
+                slot, generation, function, args, callback, future = self._results.get_nowait()
+            except Empty:
+                return
+            if future.cancelled():
+                continue
+            if self._running.get(slot) is future:
+                del self._running[slot]
+            if future.exception() is not None:
+                raise future.exception()
+            fig = future.result()
+            self.figure_cache.add(fig, function, *args, version=self.version)
+            if generation == self._generation.get(slot):
+                callback(fig)
+
+    def shutdown(self):
+        """Cancels the queued requests and the polling, and stops the worker thread. Later requests are ignored."""
+        self._closed = True
+        if self._poll_id is not None:
+            self.master.after_cancel(self._poll_id)
+            self._poll_id = None
+        for after_id in self._waiting.values():
+            self.master.after_cancel(after_id)
+        self._waiting.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
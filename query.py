@@ -0,0 +1,274 @@
+"""
+Strong/Sizhi Chen
+CS 5001, Fall 2024
+Final Project -- query.py
+
+Indexed Queries over the Business Summary
+
+This script defines the `BusinessQuery` class, which indexes the per-business summary of `data_dashboard` by
+category, city and local area, so filtered questions such as "top 20 businesses by employees among the
+restaurants of Kitsilano" are answered from the matching businesses only, instead of masking the whole frame.
+
+Key Features:
+1. **Index per Dimension**:
+   - Every indexed column is factorized into sorted categorical codes once.
+   - The positions of the businesses are sorted by code with the offsets of every code, so the businesses of
+     one value are a slice `positions[offsets[code]:offsets[code + 1]]`.
+
+2. **Index Intersection**:
+   - A query starts from the shortest matching slice and only compares the codes of the other filters at
+     those positions, so its cost depends on the number of matching businesses, not on the size of the summary.
+   - A filter can hold one value or a list of values.
+
+3. **Filtered Aggregations**:
+   - The top N businesses by a measure with `ranking.top_positions`, or the top N sums of a measure per
+     category, city or local area, the business count and the total of a measure.
+
+Usage:
+- `BusinessQuery(business_df).top('Number of Employees', 20, {'Business Category': 'Restaurant',
+  'Local Area': 'Kitsilano'})`
+- `python query.py --filter "Business Category=Restaurant" --filter "Local Area=Kitsilano" --top 20`
+"""
+
+
+# Import modules
+import argparse
+import numpy as np
+import pandas as pd
+from ranking import top_positions
+from store import offsets_from_ids
+
+
+# Set constants
+QUERY_KEY = 'Business Name'
+QUERY_DIMENSIONS = ['Business Category', 'City', 'Local Area']
+QUERY_MEASURE = 'Number of Employees'
+QUERY_TOP_N = 20
+
+
+class BusinessQuery:
+    """
+    Answers filtered top N questions over the per-business summary with an index per dimension.
+
+    Attributes:
+        key (str): The column which names every business.
+        dimensions (list): The indexed columns.
+        measures (list): The numeric columns which can be ranked and summed.
+    Methods:
+        values(dimension): Returns the distinct values of an indexed column.
+        select(filters): Returns the positions of the businesses matching every filter.
+        count(filters): Returns the number of businesses matching every filter.
+        total(measure, filters): Returns the sum of a measure over the matching businesses.
+        top(measure, top_n, filters, by): Returns the largest values or sums of a measure among the matches.
+    """
+    def __init__(self, data, dimensions=None, measures=None, key=QUERY_KEY):
+        """
+        Builds the index of every dimension.
+
+        Parameters:
+            data (DataFrame): The per-business summary, e.g. `business_df` of `data_dashboard`.
+            dimensions (list): The columns to index (default is the `QUERY_DIMENSIONS` found in the data).
+            measures (list): The numeric columns to rank (default is every numeric column).
+            key (str): The column which names every business (default is `QUERY_KEY`).
+        Raises:
+            ValueError: If data is not a DataFrame or a column is not one of its columns.
+        """
+        if not isinstance(data, pd.DataFrame):
+            raise ValueError("[BusinessQuery] Error: data must be a pandas DataFrame.")
+        if dimensions is None:
+            dimensions = [column for column in QUERY_DIMENSIONS if column in data.columns]
+        if measures is None:
+            measures = [column for column in data.select_dtypes('number').columns if column not in dimensions]
+        for column in [key] + list(dimensions) + list(measures):
+            if column not in data.columns:
+                raise ValueError(f"[BusinessQuery] Error: Column '{column}' not found in the dataset.")
+        self.key = key
+        self.dimensions = list(dimensions)
+        self.measures = list(measures)
+        self._size = len(data)
+        self._names = data[key].astype(str).to_numpy(dtype=object)
+        self._measures = {measure: data[measure].to_numpy() for measure in self.measures}
+
+        self._codes = {}
+        self._lookup = {}
+        self._categories = {}
+        self._positions = {}
+        self._offsets = {}
+        for dimension in self.dimensions:
+            codes, categories = pd.factorize(data[dimension].fillna('').astype(str), sort=True)
+            order = np.argsort(codes, kind='stable')
+            self._codes[dimension] = codes
+            self._categories[dimension] = categories.to_numpy(dtype=object)
+            self._lookup[dimension] = {value: code for code, value in enumerate(self._categories[dimension])}
+            self._positions[dimension] = order
+            self._offsets[dimension] = offsets_from_ids(codes[order], len(categories))
+
+    def __len__(self):
+        """Returns the number of businesses."""
+        return self._size
+
+    def values(self, dimension):
+        """
+        Returns the distinct values of an indexed column.
+
+        Parameters:
+            dimension (str): An indexed column, e.g. 'Local Area'.
+        Returns:
+            list: The values in sorted order, '' for a missing value.
+        Raises:
+            ValueError: If the column is not indexed.
+        """
+        self._check_dimension(dimension)
+        return self._categories[dimension].tolist()
+
+    def select(self, filters=None):
+        """
+        Finds the businesses matching every filter.
+
+        Parameters:
+            filters (dict or tuple): Maps an indexed column to a value or a list of values, e.g.
+                {'Business Category': 'Restaurant', 'Local Area': ['Kitsilano', 'Fairview']}.
+                (column, value) pairs are read the same way. None or empty matches every business.
+        Returns:
+            ndarray: The positions of the matching businesses in the summary, ascending.
+        Raises:
+            ValueError: If a filter column is not indexed.
+        """
+        wanted = []
+        for dimension, values in dict(filters or {}).items():
+            self._check_dimension(dimension)
+            if isinstance(values, str) or not hasattr(values, '__iter__'):
+                values = [values]
+            lookup = self._lookup[dimension]
+            codes = np.array(sorted({lookup[value] for value in values if value in lookup}), dtype=np.int64)
+            offsets = self._offsets[dimension]
+            wanted.append((int((offsets[codes + 1] - offsets[codes]).sum()), dimension, codes))
+        if not wanted:
+            return np.arange(self._size)
+
+        # Start from the shortest slice and check the codes of the other filters at its positions
+        wanted.sort(key=lambda item: item[0])
+        _, dimension, codes = wanted[0]
+        order, offsets = self._positions[dimension], self._offsets[dimension]
+        positions = np.concatenate([order[offsets[code]:offsets[code + 1]] for code in codes] or
+                                   [np.array([], dtype=np.intp)])
+        if len(codes) > 1:
+            positions.sort()
+        for _, dimension, codes in wanted[1:]:
+            if len(positions) == 0:
+                break
+            found = self._codes[dimension][positions]
+            positions = positions[found == codes[0] if len(codes) == 1 else np.isin(found, codes)]
+        return positions
+
+    def count(self, filters=None):
+        """Returns the number of businesses matching every filter, see `select`."""
+        return len(self.select(filters))
+
+    def total(self, measure, filters=None):
+        """
+        Returns the sum of a measure over the businesses matching every filter.
+
+        Parameters:
+            measure (str): A numeric column, e.g. 'Number of Employees'.
+            filters (dict or tuple): The filters of `select`.
+        Returns:
+            float: The sum, missing values counted as 0.
+        Raises:
+            ValueError: If the measure is not one of the measures.
+        """
+        self._check_measure(measure)
+        return float(np.nansum(self._measures[measure][self.select(filters)]))
+
+    def top(self, measure, top_n, filters=None, by=None):
+        """
+        Returns the largest values of a measure among the businesses matching every filter.
+
+        Parameters:
+            measure (str): A numeric column, e.g. 'Number of Employees'.
+            top_n (int): The number of values to return.
+            filters (dict or tuple): The filters of `select`.
+            by (str): None or the key column for the top businesses, or an indexed column to rank the sums
+                of the measure per value of that column, e.g. 'Business Category'.
+        Returns:
+            Series: At most `top_n` values in descending order, indexed by business name or column value,
+                like `AggregateCube.top`. Ties keep the order of the summary or of the sorted values.
+        Raises:
+            ValueError: If the measure or `by` is unknown or top_n is not a positive integer.
+        """
+        self._check_measure(measure)
+        if not isinstance(top_n, int) or top_n <= 0:
+            raise ValueError("[BusinessQuery] Error: top_n must be a positive integer.")
+        positions = self.select(filters)
+        values = self._measures[measure]
+        if by is None or by == self.key:
+            picked = positions[top_positions(values[positions], top_n)]
+            return pd.Series(values[picked], index=pd.Index(self._names[picked], name=self.key), name=measure)
+
+        self._check_dimension(by)
+        codes = self._codes[by][positions]
+        number = len(self._categories[by])
+        weights = values[positions].astype(np.float64)
+        sums = np.bincount(codes, weights=np.where(np.isnan(weights), 0, weights), minlength=number)
+        present = np.flatnonzero(np.bincount(codes, minlength=number))
+        picked = present[top_positions(sums[present], top_n)] if len(present) else present
+        sums = sums[picked]
+        if np.issubdtype(values.dtype, np.integer):
+            sums = sums.astype(values.dtype)
+        return pd.Series(sums, index=pd.Index(self._categories[by][picked], name=by), name=measure)
+
+    def _check_dimension(self, dimension):
+        """Raises a ValueError if the column is not indexed."""
+        if dimension not in self._codes:
+            raise ValueError(f"[BusinessQuery] Error: Column '{dimension}' is not indexed, "
+                             f"choose from {self.dimensions}.")
+
+    def _check_measure(self, measure):
+        """Raises a ValueError if the column is not a measure."""
+        if measure not in self._measures:
+            raise ValueError(f"[BusinessQuery] Error: Column '{measure}' is not a measure, "
+                             f"choose from {self.measures}.")
+
+
+def parse_filters(items):
+    """
+    Reads 'column=value' command line filters. Repeating a column keeps every value.
+
+    Parameters:
+        items (list): The filters, e.g. ['Business Category=Restaurant', 'Local Area=Kitsilano'].
+    Returns:
+        dict: Maps every column to its list of values.
+    Raises:
+        ValueError: If a filter has no '='.
+    """
+    filters = {}
+    for item in items:
+        if '=' not in item:
+            raise ValueError(f"Error: Filter '{item}' must look like 'column=value'.")
+        column, value = item.split('=', 1)
+        filters.setdefault(column.strip(), []).append(value.strip())
+    return filters
+
+
+def main():
+    """
+    Prints the answer of one filtered top N query over the summary of the cleaned files.
+    """
+    parser = argparse.ArgumentParser(description='Filtered top N queries over the business summary.')
+    parser.add_argument('--filter', action='append', default=[], metavar='COLUMN=VALUE',
+                        help="e.g. 'Local Area=Kitsilano', repeat for more filters or values")
+    parser.add_argument('--measure', default=QUERY_MEASURE, help='the numeric column to rank')
+    parser.add_argument('--top', type=int, default=QUERY_TOP_N, help='the number of results')
+    parser.add_argument('--by', default=None, help='an indexed column to rank the sums per value of')
+    args = parser.parse_args()
+
+    from data_dashboard import load_dashboard_data
+    business_df, _ = load_dashboard_data()
+    query = BusinessQuery(business_df)
+    filters = parse_filters(args.filter)
+    print(f"{query.count(filters):,} businesses match.")
+    print(query.top(args.measure, args.top, filters, args.by).to_string())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Strong/Sizhi Chen
+CS 5001, Fall 2024
+Final Project -- ranking.py
+
+Ranking Queries with Partial Selection
+
+This script answers the "top N" and "highest X" questions of the dashboard without sorting whole columns.
+
+Key Features:
+1. **Top N by Partial Selection**:
+   - `top_n` finds the N largest values with `np.argpartition` in linear time and only sorts those N values.
+   - Ties are broken by position, so the first of two equal values is ranked higher and the result is stable.
+
+2. **All Maximums in One Pass**:
+   - `highest_rows` finds the row with the highest value of several columns with one `argmax` over a 2D array,
+     instead of one `idxmax` scan per column.
+"""
+
+
+# Import modules
+import numpy as np
+import pandas as pd
+
+
+def top_positions(values, n):
+    """
+    Returns the positions of the `n` largest values, largest first.
+
+    Parameters:
+        values (ndarray): A 1D numeric array. NaN values are ranked last.
+        n (int): The number of positions to return.
+    Returns:
+        ndarray: The positions, ordered by descending value and then by position.
+    """
+    if not isinstance(n, int) or n <= 0:
+        raise ValueError("[top_positions] Error: n must be a positive integer.")
+    values = np.asarray(values, dtype=np.float64)
+    values = np.where(np.isnan(values), -np.inf, values)
+    n = min(n, len(values))
+    if n == 0:
+        return np.array([], dtype=np.intp)
+    if n < len(values):
+        # The n-th largest value is the cut, and the first of the values equal to it fill the remaining places
+        cut = values[np.argpartition(values, len(values) - n)[len(values) - n]]
+        above = np.flatnonzero(values > cut)
+        equal = np.flatnonzero(values == cut)[:n - len(above)]
+        candidates = np.concatenate([above, equal])
+    else:
+        candidates = np.arange(len(values))
+    return candidates[np.lexsort((candidates, -values[candidates]))]
+
+
+def top_n(series, n):
+    """
+    Returns the `n` largest values of a Series, largest first.
+
+    Parameters:
+        series (Series): The numeric values to rank, e.g. the sums of a measure per business.
+        n (int): The number of values to return.
+    Returns:
+        Series: The `n` largest values with their index, ties in their original order.
+    Raises:
+        ValueError: If series is not a pandas Series or n is not a positive integer.
+    """
+    if not isinstance(series, pd.Series):
+        raise ValueError("[top_n] Error: series must be a pandas Series.")
+    return series.iloc[top_positions(series.to_numpy(), n)]
+
+
+def highest_rows(data, columns):
+    """
+    Returns the row with the highest value of every column, like `data.loc[data[column].idxmax()]`.
+
+    Parameters:
+        data (DataFrame): The dataset to search.
+        columns (list): The numeric columns to find the maximum of.
+    Returns:
+        dict: Maps every column to the row (Series) with its highest value. The first row wins ties.
+    Raises:
+        ValueError: If data is not a DataFrame, a column is missing or the data is empty.
+    """
+    if not isinstance(data, pd.DataFrame):
+        raise ValueError("[highest_rows] Error: data must be a pandas DataFrame.")
+    for column in columns:
+        if column not in data.columns:
+            raise ValueError(f"[highest_rows] Error: Column '{column}' not found in the dataset.")
+    if data.empty:
+        raise ValueError("[highest_rows] Error: data must not be empty.")
+    values = data[columns].to_numpy(dtype=np.float64)
+    positions = np.where(np.isnan(values), -np.inf, values).argmax(axis=0)
+    return {column: data.iloc[position] for column, position in zip(columns, positions)}
@@ -0,0 +1,258 @@
+"""
+Strong/Sizhi Chen
+CS 5001, Fall 2024
+Final Project -- report.py
+
+Headless Report Renderer
+
+This script renders the charts of the dashboard to image files without opening the GUI, so a full report pack
+can be produced after every data refresh.
+
+Key Features:
+1. **Plot Matrix**:
+   - Every bar plot dimension and measure of the business and inventory summaries, every scatter pair,
+     the correlation heatmap and every single-column heatmap, in every theme.
+
+2. **Report Packs**:
+   - One pack for the whole city and, optionally, one pack per local area.
+   - The inventory is linked to the businesses once for the whole city, and every local area pack shows the
+     businesses and inventory of that area, matched across both datasets by a normalized area name.
+
+3. **Parallel Rendering**:
+   - The plots are drawn by a process pool with the Agg backend, using the same `plot.py` functions as the GUI.
+
+Usage:
+- `python report.py --formats png pdf --themes Blue Grey --local-areas --output-dir reports`
+"""
+
+
+# Import modules
+import argparse
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')
+from data_cache import load_table, BUSINESS_SCHEMA, INVENTORY_SCHEMA
+from summary import build_business_summary, build_inventory_summary, INVENTORY_THRESHOLD
+from aggregate_cube import AggregateCube
+from correlation import CorrelationMatrix
+from plot import bar_plot, scatter_plot, heatmap, single_column_heatmap
+
+
+# Set constants
+THEME_COLORS = {'Blue': ('#F4FAFD', '#0279B1'), 'Green': ('#E5F5E4', '#2F9F23'),
+                'Orange': ('#FAECE0', '#D85109'), 'Grey': ('#dee2e6', '#131316')}
+FORMATS = ['png', 'svg', 'pdf']
+MEASURES = ['Number of Store', 'Number of Employees', 'Number of Inventory', 'Total Register Fee']
+HEATMAP_NAMES = {'Number of Store': 'Store', 'Number of Employees': 'Employees',
+                 'Number of Inventory': 'Inventory', 'Total Register Fee': 'Register Fee'}
+TOP_N = 10
+ALL_AREAS = 'All'
+
+# Report packs of the current worker process, set by `init_worker`
+_packs = {}
+
+
+def slug(text):
+    """Returns a file name friendly version of a text, e.g. 'Number of Store' -> 'number-of-store'."""
+    return re.sub(r'[^a-z0-9]+', '-', str(text).lower()).strip('-') or 'blank'
+
+
+def area_keys(areas):
+    """Returns the normalized name of every local area, so 'Arbutus-Ridge' and 'Arbutus Ridge' are the same key."""
+    areas = pd.Series(areas).fillna('').astype(str)
+    return areas.map({area: slug(area) for area in areas.unique()}).to_numpy()
+
+
+def pack_data(business_df, inventory_df):
+    """Returns the summaries of one report pack with their cubes and the correlation of the business measures."""
+    return {'business': business_df, 'inventory': inventory_df,
+            'business_cube': AggregateCube(business_df), 'inventory_cube': AggregateCube(inventory_df),
+            'correlation': CorrelationMatrix(business_df[MEASURES].rename(columns=HEATMAP_NAMES))}
+
+
+def build_packs(business_frame, inventory_frame, local_areas=False):
+    """
+    Builds the summaries of every report pack.
+
+    The summaries and the inventory links are built once for the whole city, so `INVENTORY_THRESHOLD` applies
+    to the city-wide inventory counts. A local area pack keeps the rows of the businesses and inventory
+    businesses with at least one address in that area, and a warning is printed for a pack with no rows.
+
+    Parameters:
+        business_frame (DataFrame): The cleaned business licence rows.
+        inventory_frame (DataFrame): The cleaned storefront inventory rows.
+        local_areas (bool): If True, one pack per local area is added to the pack of the whole city.
+    Returns:
+        dict: Maps every pack name to a dict with the 'business' and 'inventory' summaries, their cubes and
+            the 'correlation' of the business measures.
+    """
+    inventory_df = build_inventory_summary(inventory_frame)
+    business_df = build_business_summary(business_frame, inventory_df, INVENTORY_THRESHOLD)
+    packs = {ALL_AREAS: pack_data(business_df, inventory_df)}
+    if local_areas:
+        business_areas = area_keys(business_frame['LocalArea'])
+        inventory_areas = area_keys(inventory_frame['Geo Local Area'])
+        # Name every area as the business licences spell it, and add the areas found in the inventory only
+        areas = {}
+        for area in list(business_frame['LocalArea'].dropna().unique()) + list(
+                inventory_frame['Geo Local Area'].dropna().unique()):
+            if area != '':
+                areas.setdefault(slug(area), area)
+        for key, area in sorted(areas.items(), key=lambda item: item[1]):
+            names = business_frame.loc[business_areas == key, 'BusinessName'].unique()
+            inventory_names = inventory_frame.loc[inventory_areas == key, 'Business name'].unique()
+            packs[area] = pack_data(business_df[business_df['Business Name'].isin(names)].reset_index(drop=True),
+                                    inventory_df[inventory_df['Business Name'].isin(inventory_names)].reset_index(
+                                        drop=True))
+
+    for area, data in packs.items():
+        if data['business'].empty or data['inventory'].empty:
+            print(f"Warning: The report pack of {area} has {len(data['business'])} businesses and "
+                  f"{len(data['inventory'])} inventory businesses, its plots will be empty.")
+    return packs
+
+
+def plot_matrix(packs, themes, top_n=TOP_N):
+    """
+    Lists every plot of every pack and theme.
+
+    Parameters:
+        packs (dict): The output of `build_packs`.
+        themes (list): The theme names, keys of `THEME_COLORS`.
+        top_n (int): The number of bars of the bar plots.
+    Returns:
+        list: (pack, theme, kind, parameters) tuples, where parameters are the plot arguments after the data.
+    """
+    jobs = []
+    for pack, data in packs.items():
+        for theme in themes:
+            for name in ('business_cube', 'inventory_cube'):
+                cube = data[name]
+                for dimension in cube.dimensions:
+                    for measure in cube.measures:
+                        jobs.append((pack, theme, 'bar', (name, dimension, measure, top_n)))
+            for x_axis, y_axis in combinations(MEASURES, 2):
+                jobs.append((pack, theme, 'scatter', (x_axis, y_axis)))
+            jobs.append((pack, theme, 'heatmap', ()))
+            for column in MEASURES:
+                jobs.append((pack, theme, 'single_heatmap', (HEATMAP_NAMES[column],)))
+    return jobs
+
+
+def init_worker(packs):
+    """Keeps the report packs in a worker process, so every job only sends its parameters."""
+    global _packs
+    _packs = packs
+
+
+def render_job(job, output_dir, formats):
+    """
+    Renders one plot of the matrix and saves it in every format.
+
+    Parameters:
+        job (tuple): A (pack, theme, kind, parameters) tuple of `plot_matrix`.
+        output_dir (str): The folder of the report packs.
+        formats (list): The file formats, e.g. ['png', 'pdf'].
+    Returns:
+        tuple: (list of written files, error message or None).
+    """
+    pack, theme, kind, parameters = job
+    data = _packs[pack]
+    background, header = THEME_COLORS[theme]
+    colormap = theme + 's'
+    try:
+        if kind == 'bar':
+            cube_name, dimension, measure, top_n = parameters
+            fig = bar_plot(dimension, measure, top_n, data[cube_name], background, colormap)
+            name = f"bar-{cube_name.split('_')[0]}-{slug(dimension)}-{slug(measure)}"
+        elif kind == 'scatter':
+            x_axis, y_axis = parameters
+            fig = scatter_plot(x_axis, y_axis, data['business'], background, header)
+            name = f'scatter-{slug(x_axis)}-{slug(y_axis)}'
+        elif kind == 'heatmap':
+            fig = heatmap(data['correlation'], background, colormap)
+            name = 'heatmap'
+        else:
+            column, = parameters
+            fig = single_column_heatmap(data['correlation'], column, background, colormap)
+            name = f'heatmap-{slug(column)}'
+    except (ValueError, TypeError, KeyError, IndexError, np.linalg.LinAlgError) as e:
+        return [], f'{pack}/{theme}/{kind} {parameters}: {e}'
+
+    folder = os.path.join(output_dir, slug(pack), slug(theme))
+    os.makedirs(folder, exist_ok=True)
+    written = []
+    for file_format in formats:
+        path = os.path.join(folder, f'{name}.{file_format}')
+        fig.savefig(path, facecolor=fig.get_facecolor())
+        written.append(path)
+    fig.clear()
+    return written, None
+
+
+def render_report(packs, output_dir='reports', formats=None, themes=None, top_n=TOP_N, workers=None):
+    """
+    Renders the whole plot matrix of every pack with a process pool.
+
+    Parameters:
+        packs (dict): The output of `build_packs`.
+        output_dir (str): The folder of the report packs.
+        formats (list): The file formats (default is every one of `FORMATS`).
+        themes (list): The theme names (default is every one of `THEME_COLORS`).
+        top_n (int): The number of bars of the bar plots.
+        workers (int): The number of worker processes (default is the number of CPUs).
+    Returns:
+        tuple: (list of written files, list of error messages of the plots which could not be drawn).
+    Raises:
+        ValueError: If a format or theme is unknown.
+    """
+    formats = formats or FORMATS
+    themes = themes or list(THEME_COLORS)
+    for file_format in formats:
+        if file_format not in FORMATS:
+            raise ValueError(f"Error: Unknown format '{file_format}', choose from {FORMATS}.")
+    for theme in themes:
+        if theme not in THEME_COLORS:
+            raise ValueError(f"Error: Unknown theme '{theme}', choose from {list(THEME_COLORS)}.")
+    jobs = plot_matrix(packs, themes, top_n)
+    written, errors = [], []
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(packs,)) as executor:
+        chunksize = max(1, len(jobs) // (4 * (workers or os.cpu_count() or 1)))
+        for files, error in executor.map(render_job, jobs, [output_dir] * len(jobs), [formats] * len(jobs),
+                                         chunksize=chunksize):
+            written += files
+            if error:
+                errors.append(error)
+    return written, errors
+
+
+def main():
+    """
+    Loads the cleaned data and renders the report packs given on the command line.
+    """
+    parser = argparse.ArgumentParser(description='Render the dashboard charts to image files.')
+    parser.add_argument('--output-dir', default='reports', help='folder of the report packs')
+    parser.add_argument('--formats', nargs='+', default=FORMATS, choices=FORMATS, help='file formats')
+    parser.add_argument('--themes', nargs='+', default=list(THEME_COLORS), choices=list(THEME_COLORS),
+                        help='themes to render')
+    parser.add_argument('--top-n', type=int, default=TOP_N, help='number of bars of the bar plots')
+    parser.add_argument('--local-areas', action='store_true', help='add one pack per local area')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes')
+    args = parser.parse_args()
+
+    business_frame = load_table('business_cleaned.csv', BUSINESS_SCHEMA)
+    inventory_frame = load_table('inventory_cleaned.csv', INVENTORY_SCHEMA)
+    packs = build_packs(business_frame, inventory_frame, args.local_areas)
+    written, errors = render_report(packs, args.output_dir, args.formats, args.themes, args.top_n, args.workers)
+    print(f'Wrote {len(written)} files for {len(packs)} packs to {args.output_dir}.')
+    for error in errors:
+        print(f'Skipped {error}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""
+Strong/Sizhi Chen
+CS 5001, Fall 2024
+Final Project -- soak.py
+
+Memory Soak Run for the Dashboard
+
+This script repeats thousands of random dashboard interactions (axes, top N, theme, heatmap column and tab
+changes) and prints the resident memory of the process, to check that it stays flat over a long session.
+
+Key Features:
+1. **GUI Mode**:
+   - Drives the event handlers of a real `BusinessApp` when a display is available.
+
+2. **Headless Mode**:
+   - Without a display, runs the same plot calls through the `FigureCache` and `CanvasManager` of the GUI
+     on Agg canvases.
+
+Usage:
+- `python soak.py [iterations]` from the folder with `business_cleaned.csv` and `inventory_cleaned.csv`.
+"""
+
+
+# Import modules
+import gc
+import os
+import random
+import resource
+import sys
+from tkinter import Tk, TclError
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from data_dashboard import (read_dataframe_from_csv, build_inventory_summary, build_business_summary,
+                            BUSINESS_TEXT_COLUMNS, INVENTORY_TEXT_COLUMNS, INVENTORY_THRESHOLD)
+from data_cache import BUSINESS_SCHEMA, INVENTORY_SCHEMA
+from aggregate_cube import AggregateCube
+from correlation import CorrelationMatrix
+from figure_cache import FigureCache, data_version
+from canvas_manager import CanvasManager
+from plot import bar_plot, scatter_plot, heatmap, single_column_heatmap
+
+
+# Set constants
+ITERATIONS = 5000
+REPORT_EVERY = 500
+THEMES = ['Blue', 'Green', 'Orange', 'Grey']
+BACKGROUNDS = {'Blue': '#F4FAFD', 'Green': '#E5F5E4', 'Orange': '#FAECE0', 'Grey': '#dee2e6'}
+BUSINESS_X_AXES = ['Business Name', 'Business Category']
+BUSINESS_Y_AXES = ['Number of Store', 'Number of Employees', 'Total Register Fee']
+MEASURES = ['Number of Store', 'Number of Employees', 'Number of Inventory', 'Total Register Fee']
+
+
+def resident_memory_mb():
+    """Returns the resident memory of the process in MB, or the peak resident memory where /proc is missing."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except (IOError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def gui_step(app, rng):
+    """Performs one random interaction on a `BusinessApp`."""
+    action = rng.randrange(6)
+    if action == 0:
+        app.business_x_axis_combobox.set(rng.choice(BUSINESS_X_AXES))
+        app.business_x_axis_change(None)
+    elif action == 1:
+        app.business_y_axis_combobox.set(rng.choice(BUSINESS_Y_AXES))
+        app.business_y_axis_change(None)
+    elif action == 2:
+        app.business_n_companies_spinbox.set(str(rng.randint(5, 15)))
+        app.business_n_companies_spinbox_change(None)
+    elif action == 3:
+        app.inventory_x_axis_combobox.set(rng.choice(BUSINESS_X_AXES))
+        app.inventory_x_axis_change(None)
+    elif action == 4:
+        app.color.set(rng.choice(THEMES))
+        app.change_theme(None)
+    else:
+        app.single_column_combobox.current(rng.randrange(4))
+        app.single_column_heatmap_change(None)
+    app.master.update()
+
+
+def headless_step(business_df, cube, corr_matrix, cache, canvases, version, rng):
+    """Performs one random interaction with the plot calls of the GUI on Agg canvases."""
+    theme = rng.choice(THEMES)
+    background = BACKGROUNDS[theme]
+    views = [('business', bar_plot, rng.choice(BUSINESS_X_AXES), rng.choice(BUSINESS_Y_AXES),
+              rng.randint(5, 15), cube, background, theme + 's'),
+             ('relationship', scatter_plot, *rng.sample(MEASURES, 2), business_df, background, 'skyblue'),
+             ('heatmap', heatmap, corr_matrix, background, theme + 's'),
+             ('single', single_column_heatmap, corr_matrix, rng.choice(MEASURES), background, theme + 's')]
+    frame, function, *args = rng.choice(views)
+    canvases.show(frame, cache.plot(function, *args, version=version))
+
+
+def main():
+    """
+    Runs the soak and prints the resident memory every `REPORT_EVERY` interactions.
+    """
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else ITERATIONS
+    business_frame = read_dataframe_from_csv('business_cleaned.csv', BUSINESS_TEXT_COLUMNS, BUSINESS_SCHEMA)
+    inventory_frame = read_dataframe_from_csv('inventory_cleaned.csv', INVENTORY_TEXT_COLUMNS, INVENTORY_SCHEMA)
+    inventory_df = build_inventory_summary(inventory_frame)
+    business_df = build_business_summary(business_frame, inventory_df, INVENTORY_THRESHOLD)
+    rng = random.Random(0)
+
+    try:
+        root = Tk()
+        from app import BusinessApp
+        app = BusinessApp(root, business_df, inventory_df, fast_start=False)
+        step = lambda: gui_step(app, rng)
+        print('Soaking the GUI.')
+    except TclError:
+        cache = FigureCache()
+        canvases = CanvasManager(FigureCanvasAgg, keep=cache.holds)
+        cube = AggregateCube(business_df)
+        corr_matrix = CorrelationMatrix(business_df[MEASURES])
+        version = data_version(business_df)
+        step = lambda: headless_step(business_df, cube, corr_matrix, cache, canvases, version, rng)
+        print('No display, soaking the plot calls on Agg canvases.')
+
+    readings = []
+    for iteration in range(1, iterations + 1):
+        step()
+        if iteration % REPORT_EVERY == 0:
+            gc.collect()
+            readings.append(resident_memory_mb())
+            print(f'{iteration:>7} interactions: {readings[-1]:8.1f} MB')
+    if len(readings) >= 2:
+        half = len(readings) // 2
+        print(f'Growth over the second half: {readings[-1] - readings[half - 1]:+.1f} MB')
+
+
+if __name__ == '__main__':
+    main()
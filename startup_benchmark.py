@@ -0,0 +1,111 @@
+"""
+Strong/Sizhi Chen
+CS 5001, Fall 2024
+Final Project -- startup_benchmark.py
+
+Startup Benchmark for the Dashboard
+
+This script measures how long the dashboard takes to start, each time in a fresh Python process, so no module
+or file is already loaded by an earlier run.
+
+Key Features:
+1. **Import Time**:
+   - The time to import each module of the GUI, and which heavy libraries (Matplotlib, Seaborn, ...) it loads.
+
+2. **Time to First Window**:
+   - The time from the start of the script until the window is shown, and until the heatmaps of the Information
+     screen are drawn, with and without the fast start mode of `BusinessApp`. Skipped when there is no display.
+
+Usage:
+- `python startup_benchmark.py [repeats]` from the folder with `business_cleaned.csv` and `inventory_cleaned.csv`.
+"""
+
+
+# Import modules
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+
+# Set constants
+START = time.perf_counter()  # The start of the script, the origin of the time to first window
+REPEATS = 5
+IMPORT_MODULES = ['plot', 'app', 'data_dashboard']
+HEAVY_MODULES = ['pandas', 'matplotlib', 'seaborn', 'requests']
+WINDOW_TIMEOUT = 60
+
+
+def child_import(module):
+    """Imports a module and prints the import time and the heavy modules it loaded, as JSON."""
+    start = time.perf_counter()
+    __import__(module)
+    seconds = time.perf_counter() - start
+    print(json.dumps({'seconds': seconds, 'loaded': [name for name in HEAVY_MODULES if name in sys.modules]}))
+
+
+def child_window(fast_start):
+    """Starts the dashboard and prints the seconds until the window and the heatmaps are shown, as JSON."""
+    from tkinter import Tk, TclError
+    from data_dashboard import load_dashboard_data, BusinessApp
+    try:
+        root = Tk()
+    except TclError:
+        print(json.dumps({'error': 'no display'}))
+        return
+    business_df, inventory_df = load_dashboard_data()
+    app = BusinessApp(root, business_df, inventory_df, fast_start=fast_start)
+    deadline = time.perf_counter() + WINDOW_TIMEOUT
+    window = None
+    while time.perf_counter() < deadline:
+        root.update()
+        if window is None and root.winfo_viewable():
+            window = time.perf_counter() - START
+        if window is not None and hasattr(app, 'heatmap') and hasattr(app, 'single_heatmap'):
+            break
+        time.sleep(0.005)
+    heatmaps = time.perf_counter() - START
+    app.plot_worker.shutdown()
+    root.destroy()
+    print(json.dumps({'window': window, 'heatmaps': heatmaps}))
+
+
+def run_child(*args):
+    """Runs this script in a fresh process and returns the JSON it printed."""
+    output = subprocess.run([sys.executable, __file__, '--child', *args], capture_output=True, text=True,
+                            check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    """
+    Prints the median import times and times to the first window over `repeats` fresh processes.
+    """
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        if sys.argv[2] == 'import':
+            child_import(sys.argv[3])
+        else:
+            child_window(sys.argv[3] == 'fast')
+        return
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else REPEATS
+
+    print('Import time (median of fresh processes)')
+    for module in IMPORT_MODULES:
+        runs = [run_child('import', module) for _ in range(repeats)]
+        seconds = statistics.median(run['seconds'] for run in runs)
+        print(f'  {module:<16} {seconds:7.3f} s   loads: {", ".join(runs[-1]["loaded"]) or "-"}')
+
+    print('Time to first window (median of fresh processes)')
+    for mode in ('fast', 'eager'):
+        runs = [run_child('window', mode) for _ in range(repeats)]
+        if 'error' in runs[0]:
+            print(f'  skipped: {runs[0]["error"]}')
+            break
+        window = statistics.median(run['window'] for run in runs)
+        heatmaps = statistics.median(run['heatmaps'] for run in runs)
+        print(f'  {mode:<6} window {window:7.3f} s   heatmaps {heatmaps:7.3f} s')
+
+
+if __name__ == '__main__':
+    main()
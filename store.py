@@ -0,0 +1,495 @@
+"""
+Strong/Sizhi Chen
+CS 5001, Fall 2024
+Final Project -- store.py
+
+Columnar Business and Inventory Collections
+
+This script defines `BusinessStore` and `InventoryStore`, which keep the same information as a dictionary of
+`Business` or `Inventory` objects in a few NumPy arrays instead of one Python object and several lists per entity.
+
+Key Features:
+1. **Columnar Storage**:
+   - Names, cities, local areas and types are interned once and stored as integer category codes.
+   - Employee counts live in one NumPy array, and addresses are offsets into one shared address pool.
+
+2. **Lightweight Views**:
+   - `BusinessView` and `InventoryView` use `__slots__` and only hold the store and a position.
+   - Views keep the method API of `Business` and `Inventory` (`get_number_employees`, `__str__`, `__eq__`, etc.).
+
+3. **Address Index**:
+   - `AddressIndex` maps every canonical address of both datasets to the businesses and inventories at it,
+     so "who operates at this storefront" is one dictionary lookup.
+
+4. **Memory Use**:
+   Measured with `tracemalloc` on `business_cleaned.csv` (33,064 rows, 29,914 businesses) and
+   `inventory_cleaned.csv` (7,721 rows, 6,465 inventories):
+   - Dictionary of `Business` objects: about 1,230 bytes per business; `BusinessStore`: about 250 bytes.
+   - Dictionary of `Inventory` objects: about 960 bytes per inventory; `InventoryStore`: about 250 bytes.
+   The object figures do not count the name strings, which they share with the rows read from the CSV,
+   while the store figures include its own copy of every interned string and the name lookup dictionary.
+"""
+
+
+# Import modules
+import numpy as np
+import pandas as pd
+from business import Business
+from inventory import Inventory
+from linkage import link_groups
+from address import canonical_address, canonical_addresses
+
+
+def offsets_from_ids(ids, number_of_groups):
+    """
+    Converts sorted group ids into an offset array, so group `i` is `values[offsets[i]:offsets[i + 1]]`.
+
+    Args: ids (ndarray): The group id of every value, sorted ascending.
+          number_of_groups (int): The total number of groups.
+    Returns: ndarray: An int64 array with `number_of_groups + 1` offsets.
+    """
+    offsets = np.zeros(number_of_groups + 1, dtype=np.int64)
+    np.cumsum(np.bincount(ids, minlength=number_of_groups), out=offsets[1:])
+    return offsets
+
+
+def unique_codes_by_group(ids, codes, number_of_groups):
+    """
+    Keeps the first appearance of every (group, code) pair and sorts the result by group.
+
+    Args: ids (ndarray): The group id of every row.
+          codes (ndarray): The category code of every row.
+          number_of_groups (int): The total number of groups.
+    Returns: tuple: The unique codes sorted by group (keeping row order inside a group) and their offsets.
+    """
+    pairs = pd.DataFrame({'id': ids, 'code': codes}).drop_duplicates()
+    pairs = pairs.sort_values('id', kind='stable')
+    return (pairs['code'].to_numpy(dtype=np.int32),
+            offsets_from_ids(pairs['id'].to_numpy(), number_of_groups))
+
+
+def main_code(codes):
+    """
+    Finds the most common code, ties going to the code which appears first.
+
+    Args: codes (ndarray): The category codes of one entity.
+    Returns: int: The main code, or -1 if there are no codes.
+    """
+    if len(codes) == 0:
+        return -1
+    unique, first, counts = np.unique(codes, return_index=True, return_counts=True)
+    best = np.flatnonzero(counts == counts.max())
+    return unique[best[np.argmin(first[best])]]
+
+
+class InventoryStore:
+    """
+    Stores every inventory of the cleaned storefront data in arrays.
+
+    Attributes:
+        names (ndarray): The business name of every inventory, in order of first appearance.
+        type_categories (ndarray): The interned retail categories.
+        address_pool (ndarray): The interned canonical inventory addresses.
+    Methods:
+        __getitem__(name): Returns an `InventoryView` for a business name.
+        __iter__(): Iterates over the business names.
+        __len__(): Returns the number of inventories.
+        values(): Iterates over an `InventoryView` for every inventory.
+        get_number_of_inventory(): Returns the number of unique addresses of every inventory as an array.
+    """
+    def __init__(self, inventory_frame):
+        """
+        Initializes a new InventoryStore from the cleaned inventory rows.
+
+        Args: inventory_frame (DataFrame): The rows of `inventory_cleaned.csv`.
+        """
+        if not isinstance(inventory_frame, pd.DataFrame):
+            raise ValueError("inventory_frame must be a pandas DataFrame.")
+        frame = inventory_frame[['Business name', 'Retail category', 'Address']].fillna('')
+        ids, names = pd.factorize(frame['Business name'])
+        self.names = np.asarray(names, dtype=object)
+        self._position = {name: index for index, name in enumerate(self.names)}
+        order = np.argsort(ids, kind='stable')
+
+        type_codes, type_categories = pd.factorize(frame['Retail category'])
+        self.type_categories = np.asarray(type_categories, dtype=object)
+        self._type_codes = type_codes[order].astype(np.int32)
+        self._type_offsets = offsets_from_ids(ids[order], len(self.names))
+
+        address_codes, address_pool = pd.factorize(canonical_addresses(frame['Address']))
+        self.address_pool = np.asarray(address_pool, dtype=object)
+        self._address_codes, self._address_offsets = unique_codes_by_group(ids, address_codes, len(self.names))
+
+    def __getitem__(self, name):
+        return InventoryView(self, self._position[name])
+
+    def __contains__(self, name):
+        return name in self._position
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def values(self):
+        """Iterates over an `InventoryView` for every inventory."""
+        return (InventoryView(self, index) for index in range(len(self.names)))
+
+    def position(self, name):
+        """Returns the position of a business name in the store, or -1 if it is missing."""
+        return self._position.get(name, -1)
+
+    def get_number_of_inventory(self):
+        """Returns the number of unique addresses of every inventory as an array."""
+        return np.diff(self._address_offsets)
+
+
+class BusinessStore:
+    """
+    Stores every business of the cleaned business licence data in arrays.
+
+    Attributes:
+        names (ndarray): The name of every business, in order of first appearance.
+        city_categories (ndarray): The interned cities.
+        local_area_categories (ndarray): The interned local areas.
+        type_categories (ndarray): The interned business types.
+        address_pool (ndarray): The interned canonical addresses.
+        register_fee (ndarray): The total registration fee of every business.
+        inventory_store (InventoryStore): The linked inventories, or None.
+        link_report (dict): The matched and unmatched counts of the last `add_inventory_store`, or None.
+    Methods:
+        __getitem__(name): Returns a `BusinessView` for a business name.
+        __iter__(): Iterates over the business names.
+        __len__(): Returns the number of businesses.
+        values(): Iterates over a `BusinessView` for every business.
+        add_inventory_store(inventory_store, inventory_threshold): Links inventories to businesses by normalized name.
+        get_number_store(): Returns the number of unique stores of every business as an array.
+        get_number_employees(): Returns the total employees of every business as an array.
+    """
+    def __init__(self, business_frame):
+        """
+        Initializes a new BusinessStore from the cleaned business rows.
+
+        Args: business_frame (DataFrame): The rows of `business_cleaned.csv`.
+        """
+        if not isinstance(business_frame, pd.DataFrame):
+            raise ValueError("business_frame must be a pandas DataFrame.")
+        text_columns = ['BusinessName', 'BusinessType', 'Address', 'City', 'LocalArea']
+        frame = business_frame[text_columns].fillna('')
+        ids, names = pd.factorize(frame['BusinessName'])
+        self.names = np.asarray(names, dtype=object)
+        self._position = {name: index for index, name in enumerate(self.names)}
+        number = len(self.names)
+        order = np.argsort(ids, kind='stable')
+        first_rows = order[offsets_from_ids(ids[order], number)[:-1]]
+
+        # City and local area come from the first row of a business
+        city_codes, city_categories = pd.factorize(frame['City'])
+        self.city_categories = np.asarray(city_categories, dtype=object)
+        self._city_codes = city_codes[first_rows].astype(np.int32)
+        area_codes, area_categories = pd.factorize(frame['LocalArea'])
+        self.local_area_categories = np.asarray(area_categories, dtype=object)
+        self._local_area_codes = area_codes[first_rows].astype(np.int32)
+
+        # Types and employees are kept per row, grouped by business
+        type_codes, type_categories = pd.factorize(frame['BusinessType'])
+        self.type_categories = np.asarray(type_categories, dtype=object)
+        self._type_codes = type_codes[order].astype(np.int32)
+        self._row_offsets = offsets_from_ids(ids[order], number)
+        employees = business_frame['NumberofEmployees'].to_numpy()
+        self._employees = employees[order].astype(np.int32)
+        self._employee_total = np.bincount(ids, weights=employees.astype(np.int64), minlength=number).astype(np.int64)
+
+        # Unique canonical addresses are offsets into one shared pool
+        address_codes, address_pool = pd.factorize(canonical_addresses(frame['Address']))
+        self.address_pool = np.asarray(address_pool, dtype=object)
+        self._address_codes, self._address_offsets = unique_codes_by_group(ids, address_codes, number)
+
+        # Businesses without any paid fee keep the integer 0 of `Business.register_fee`
+        fee = pd.to_numeric(business_frame['FeePaid'], errors='coerce')
+        self.register_fee = np.bincount(ids, weights=fee.fillna(0).to_numpy(), minlength=number)
+        self._has_fee = np.bincount(ids, weights=fee.notna().to_numpy(), minlength=number) > 0
+
+        self.inventory_store = None
+        self.link_report = None
+        # The linked inventories of business `i` are `_inventory_ids[_inventory_offsets[i]:_inventory_offsets[i + 1]]`
+        self._inventory_ids = np.zeros(0, dtype=np.int32)
+        self._inventory_offsets = np.zeros(number + 1, dtype=np.int64)
+
+    def __getitem__(self, name):
+        return BusinessView(self, self._position[name])
+
+    def __contains__(self, name):
+        return name in self._position
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def values(self):
+        """Iterates over a `BusinessView` for every business."""
+        return (BusinessView(self, index) for index in range(len(self.names)))
+
+    def add_inventory_store(self, inventory_store, inventory_threshold):
+        """
+        Links the inventories with at least `inventory_threshold` addresses to the businesses with the same
+        normalized name (see `linkage.py`).
+
+        Args: inventory_store (InventoryStore): The inventories to link.
+              inventory_threshold (int): The minimum number of inventory addresses.
+        """
+        if not isinstance(inventory_store, InventoryStore):
+            raise ValueError("inventory_store must be an InventoryStore.")
+        if not isinstance(inventory_threshold, int):
+            raise ValueError("inventory_threshold must be an integer.")
+        enough = np.flatnonzero(inventory_store.get_number_of_inventory() >= inventory_threshold)
+        members, self._inventory_offsets, self.link_report = link_groups(self.names, inventory_store.names[enough])
+        self._inventory_ids = enough[members].astype(np.int32)
+        self.inventory_store = inventory_store
+
+    def get_number_store(self):
+        """Returns the number of unique stores of every business as an array."""
+        return np.diff(self._address_offsets)
+
+    def get_number_employees(self):
+        """Returns the total employees of every business as an array."""
+        return self._employee_total
+
+
+class InventoryView:
+    """
+    A lightweight view of one inventory inside an `InventoryStore`, with the method API of `Inventory`.
+
+    Attributes:
+        name (str): The name of the business associated with this inventory.
+        type (list): The retail categories of every row of this inventory.
+        address (list): The unique inventory addresses.
+    """
+    __slots__ = ('_store', '_index')
+
+    def __init__(self, store, index):
+        self._store = store
+        self._index = index
+
+    @property
+    def name(self):
+        return self._store.names[self._index]
+
+    @property
+    def type(self):
+        store = self._store
+        codes = store._type_codes[store._type_offsets[self._index]:store._type_offsets[self._index + 1]]
+        return store.type_categories[codes].tolist()
+
+    @property
+    def address(self):
+        store = self._store
+        codes = store._address_codes[store._address_offsets[self._index]:store._address_offsets[self._index + 1]]
+        return store.address_pool[codes].tolist()
+
+    def get_number_of_inventory(self):
+        """Returns: int: The total number of inventory locations."""
+        return int(self._store._address_offsets[self._index + 1] - self._store._address_offsets[self._index])
+
+    def get_main_business(self):
+        """Returns: str: The most common business type/category."""
+        store = self._store
+        code = main_code(store._type_codes[store._type_offsets[self._index]:store._type_offsets[self._index + 1]])
+        return "Unknown" if code < 0 else store.type_categories[code]
+
+    __str__ = Inventory.__str__
+
+    def __eq__(self, other):
+        """Compares with another `InventoryView` or `Inventory` on name and primary business type."""
+        if not isinstance(other, (Inventory, InventoryView)):
+            return False
+        return (self.name == other.name and
+                self.get_main_business() == other.get_main_business())
+
+
+class BusinessView:
+    """
+    A lightweight view of one business inside a `BusinessStore`, with the method API of `Business`.
+
+    Attributes:
+        name (str): The name of the business.
+        city (str): The city where the business is located.
+        local_area (str): The local area within the city.
+        type (list): The business types of every row of this business.
+        address (list): The unique canonical store addresses.
+        employees (list): The employee count of every row of this business.
+        inventory_list (list): The addresses of the linked inventory.
+        register_fee (float): The total registration fee paid by the business.
+    """
+    __slots__ = ('_store', '_index')
+
+    def __init__(self, store, index):
+        self._store = store
+        self._index = index
+
+    def _inventory_ids(self):
+        """Returns the positions of the linked inventories in the inventory store."""
+        store = self._store
+        return store._inventory_ids[store._inventory_offsets[self._index]:store._inventory_offsets[self._index + 1]]
+
+    @property
+    def name(self):
+        return self._store.names[self._index]
+
+    @property
+    def city(self):
+        return self._store.city_categories[self._store._city_codes[self._index]]
+
+    @property
+    def local_area(self):
+        return self._store.local_area_categories[self._store._local_area_codes[self._index]]
+
+    @property
+    def type(self):
+        store = self._store
+        codes = store._type_codes[store._row_offsets[self._index]:store._row_offsets[self._index + 1]]
+        return store.type_categories[codes].tolist()
+
+    @property
+    def address(self):
+        store = self._store
+        codes = store._address_codes[store._address_offsets[self._index]:store._address_offsets[self._index + 1]]
+        return store.address_pool[codes].tolist()
+
+    @property
+    def employees(self):
+        store = self._store
+        return store._employees[store._row_offsets[self._index]:store._row_offsets[self._index + 1]].tolist()
+
+    @property
+    def inventory_list(self):
+        addresses = []
+        for inventory_id in self._inventory_ids():
+            addresses += InventoryView(self._store.inventory_store, inventory_id).address
+        return addresses
+
+    @property
+    def register_fee(self):
+        if not self._store._has_fee[self._index]:
+            return 0
+        return float(self._store.register_fee[self._index])
+
+    def get_main_business(self):
+        """Returns: str: The most common type/category of the business."""
+        store = self._store
+        code = main_code(store._type_codes[store._row_offsets[self._index]:store._row_offsets[self._index + 1]])
+        return "Unknown" if code < 0 else store.type_categories[code]
+
+    def get_number_store(self):
+        """Returns: int: The number of stores."""
+        return int(self._store._address_offsets[self._index + 1] - self._store._address_offsets[self._index])
+
+    def get_number_employees(self):
+        """Returns: int: The total number of employees."""
+        return int(self._store._employee_total[self._index])
+
+    def get_number_of_inventory(self):
+        """Returns: int: The total number of inventories."""
+        return sum(InventoryView(self._store.inventory_store, inventory_id).get_number_of_inventory()
+                   for inventory_id in self._inventory_ids())
+
+    __str__ = Business.__str__
+
+    def __eq__(self, other):
+        """Compares with another `BusinessView` or `Business` on name, city, local area and main type."""
+        if not isinstance(other, (Business, BusinessView)):
+            return False
+        return (self.name == other.name and
+                self.city == other.city and
+                self.local_area == other.local_area and
+                self.get_main_business() == other.get_main_business())
+
+
+class AddressIndex:
+    """
+    Maps every canonical address of both datasets to the businesses and inventories at that address.
+
+    The canonical addresses are interned once, and the businesses and inventories of every address are
+    offsets into two position arrays, in the order of `BusinessStore.names` and `InventoryStore.names`.
+
+    Attributes:
+        addresses (ndarray): The interned canonical addresses of both datasets.
+        business_names (ndarray): The business names, in order of first appearance.
+        inventory_names (ndarray): The inventory business names, in order of first appearance.
+    Methods:
+        lookup(address): Returns the business and inventory positions at an address.
+        businesses_at(address): Returns the names of the businesses at an address.
+        inventories_at(address): Returns the names of the inventories at an address.
+        shared_addresses(): Returns the addresses found in both datasets.
+        get_number_store(): Returns the number of unique addresses of every business as an array.
+        get_number_of_inventory(): Returns the number of unique addresses of every inventory as an array.
+    """
+    def __init__(self, business_frame, inventory_frame):
+        """
+        Builds the index from the cleaned business and inventory rows.
+
+        Args: business_frame (DataFrame): The rows of `business_cleaned.csv`.
+              inventory_frame (DataFrame): The rows of `inventory_cleaned.csv`.
+        """
+        if not isinstance(business_frame, pd.DataFrame):
+            raise ValueError("business_frame must be a pandas DataFrame.")
+        if not isinstance(inventory_frame, pd.DataFrame):
+            raise ValueError("inventory_frame must be a pandas DataFrame.")
+        business_ids, business_names = pd.factorize(business_frame['BusinessName'].fillna(''))
+        inventory_ids, inventory_names = pd.factorize(inventory_frame['Business name'].fillna(''))
+        self.business_names = np.asarray(business_names, dtype=object)
+        self.inventory_names = np.asarray(inventory_names, dtype=object)
+
+        # One address pool for both datasets
+        codes, addresses = pd.factorize(pd.concat([canonical_addresses(business_frame['Address'].fillna('')),
+                                                   canonical_addresses(inventory_frame['Address'].fillna(''))],
+                                                  ignore_index=True))
+        self.addresses = np.asarray(addresses, dtype=object)
+        self._position = {address: code for code, address in enumerate(self.addresses) if address}
+        number = len(self.addresses)
+        business_codes, inventory_codes = codes[:len(business_frame)], codes[len(business_frame):]
+        self._business_ids, self._business_offsets = unique_codes_by_group(business_codes, business_ids, number)
+        self._inventory_ids, self._inventory_offsets = unique_codes_by_group(inventory_codes, inventory_ids, number)
+
+    def __contains__(self, address):
+        return canonical_address(address) in self._position
+
+    def __len__(self):
+        return len(self._position)
+
+    def lookup(self, address):
+        """
+        Returns the businesses and inventories at an address.
+
+        Args: address (str): An address in any format of either dataset.
+        Returns: tuple: (business positions, inventory positions) as arrays, empty if the address is unknown.
+        """
+        code = self._position.get(canonical_address(address))
+        if code is None:
+            return np.zeros(0, dtype=self._business_ids.dtype), np.zeros(0, dtype=self._inventory_ids.dtype)
+        return (self._business_ids[self._business_offsets[code]:self._business_offsets[code + 1]],
+                self._inventory_ids[self._inventory_offsets[code]:self._inventory_offsets[code + 1]])
+
+    def businesses_at(self, address):
+        """Returns the names of the businesses at an address, see `lookup`."""
+        return self.business_names[self.lookup(address)[0]].tolist()
+
+    def inventories_at(self, address):
+        """Returns the names of the inventories at an address, see `lookup`."""
+        return self.inventory_names[self.lookup(address)[1]].tolist()
+
+    def shared_addresses(self):
+        """Returns the non-empty addresses with at least one business and one inventory, as an array."""
+        shared = (np.diff(self._business_offsets) > 0) & (np.diff(self._inventory_offsets) > 0)
+        return self.addresses[shared & (self.addresses != '')]
+
+    def get_number_store(self):
+        """Returns the number of unique addresses of every business as an array, like `BusinessStore`."""
+        return np.bincount(self._business_ids, minlength=len(self.business_names))
+
+    def get_number_of_inventory(self):
+        """Returns the number of unique addresses of every inventory as an array, like `InventoryStore`."""
+        return np.bincount(self._inventory_ids, minlength=len(self.inventory_names))
@@ -0,0 +1,166 @@
+"""
+Strong/Sizhi Chen
+CS 5001, Fall 2024
+Final Project -- summary.py
+
+Per-Business Summary
+
+This script aggregates the cleaned business and inventory rows into the per-business DataFrames which
+`BusinessApp` consumes. It does not import the GUI, so the cleaning and ingestion scripts can build the
+summary without Tkinter or Matplotlib.
+
+Key Features:
+1. **Single Aggregation**:
+   - `build_business_summary` and `build_inventory_summary` use one `groupby` on the business name each.
+
+2. **Same Results as the Objects**:
+   - The values are identical to the ones computed by the `Business` and `Inventory` classes,
+     including the tie break of `get_main_business`.
+
+3. **Canonical Addresses**:
+   - Stores and inventory locations are counted by their canonical address from `address.py`.
+
+4. **Normalized Linkage**:
+   - Inventory counts are linked to the businesses by normalized name with `linkage.link_counts`.
+"""
+
+
+# Import modules
+import numpy as np
+import pandas as pd
+from linkage import link_counts
+from address import canonical_addresses
+
+
+# Set constants
+INVENTORY_THRESHOLD = 3
+BUSINESS_NAME_INDEX = 1
+BUSINESS_TYPE_INDEX = 3
+BUSINESS_ADDRESS_INDEX = 5
+BUSINESS_CITY_INDEX = 6
+BUSINESS_LOCAL_AREA_INDEX = 7
+BUSINESS_EMPLOYEES = 8
+BUSINESS_REGISTER_FEE = 9
+INVENTORY_NAME_INDEX = 1
+INVENTORY_CATEGORY_INDEX = 2
+INVENTORY_ADDRESS = 4
+
+
+def main_category(dataframe, key_column, category_column):
+    """
+    Finds the most common category of every key in one aggregation.
+
+    Ties are broken by the category which appears first for that key, which is
+    the same result as `max(type_list, key=type_list.count)` in `get_main_business`.
+
+    Args: dataframe (DataFrame): The rows to aggregate.
+          key_column (str): The column holding the business name.
+          category_column (str): The column holding the category.
+    Returns: Series:
+        The main category indexed by key, in order of first appearance.
+    """
+    counts = (dataframe.groupby([key_column, category_column], sort=False)
+              .size().reset_index(name='count'))
+    counts = counts.sort_values('count', ascending=False, kind='stable')
+    counts = counts.drop_duplicates(key_column)
+    return counts.set_index(key_column)[category_column]
+
+
+def build_inventory_summary(inventory_frame):
+    """
+    Builds the per-business inventory summary with a single groupby.
+
+    Args: inventory_frame (DataFrame):
+        The cleaned inventory rows, as returned by `read_dataframe_from_csv`.
+    Returns: DataFrame:
+        One row per business name with the columns 'Business Name',
+        'Business Category' and 'Number of inventory', identical to the
+        frame built from `Inventory` objects.
+    """
+    if not isinstance(inventory_frame, pd.DataFrame):
+        raise ValueError("inventory_frame must be a pandas DataFrame.")
+
+    name = inventory_frame.columns[INVENTORY_NAME_INDEX]
+    category = inventory_frame.columns[INVENTORY_CATEGORY_INDEX]
+    address = inventory_frame.columns[INVENTORY_ADDRESS]
+    frame = inventory_frame.assign(_address=canonical_addresses(inventory_frame[address]))
+    grouped = frame.groupby(name, sort=False)
+    summary = pd.DataFrame({
+        'Business Name': grouped.size().index.astype(str),
+        'Business Category': main_category(inventory_frame, name, category).reindex(
+            grouped.size().index).astype(str).values,
+        'Number of inventory': grouped['_address'].nunique().values})
+    return summary
+
+
+def link_inventory_counts(business_names, inventory_summary, inventory_threshold=INVENTORY_THRESHOLD):
+    """
+    Finds the inventory count of every business whose inventory reaches the threshold.
+
+    Names are linked by their normalized key (see `linkage.py`), and the counts of several inventory names
+    with the same key are added up.
+
+    Args: business_names (Index or Series): The business names to look up.
+    inventory_summary (DataFrame):
+        The output of `build_inventory_summary`, or None.
+    inventory_threshold (int):
+        The minimum number of inventory needed to be linked to a business.
+    Returns: ndarray:
+        The linked inventory count of every name, 0 when there is no linked inventory.
+    """
+    if inventory_summary is None:
+        return np.zeros(len(business_names), dtype='int64')
+    linked = inventory_summary[inventory_summary['Number of inventory'] >= inventory_threshold]
+    counts, _ = link_counts(business_names, linked['Business Name'], linked['Number of inventory'])
+    return counts
+
+
+def build_business_summary(business_frame, inventory_summary=None,
+                           inventory_threshold=INVENTORY_THRESHOLD):
+    """
+    Builds the per-business summary consumed by `BusinessApp` with a single groupby.
+
+    Args: business_frame (DataFrame):
+        The cleaned business rows, as returned by `read_dataframe_from_csv`.
+    inventory_summary (DataFrame):
+        The output of `build_inventory_summary`. Businesses whose inventory
+        count reaches `inventory_threshold` get it as 'Number of Inventory'.
+    inventory_threshold (int):
+        The minimum number of inventory needed to be linked to a business.
+    Returns: DataFrame:
+        One row per business name with the same columns and values as the
+        frame built from `Business` objects in the original five passes,
+        plus the most common 'Local Area' of the business.
+    """
+    if not isinstance(business_frame, pd.DataFrame):
+        raise ValueError("business_frame must be a pandas DataFrame.")
+    if not isinstance(inventory_threshold, int):
+        raise ValueError("inventory_threshold must be an integer.")
+
+    columns = business_frame.columns
+    name = columns[BUSINESS_NAME_INDEX]
+    frame = business_frame.assign(
+        _address=canonical_addresses(business_frame[columns[BUSINESS_ADDRESS_INDEX]]),
+        _employees=business_frame[columns[BUSINESS_EMPLOYEES]].astype(int),
+        _fee=pd.to_numeric(business_frame[columns[BUSINESS_REGISTER_FEE]], errors='coerce'))
+    grouped = frame.groupby(name, sort=False)
+    aggregated = grouped.agg(stores=('_address', 'nunique'),
+                             employees=('_employees', 'sum'),
+                             fee=('_fee', 'sum'),
+                             city=(columns[BUSINESS_CITY_INDEX], 'first'))
+
+    # Link the inventory count for businesses above the threshold
+    inventory = link_inventory_counts(aggregated.index, inventory_summary, inventory_threshold)
+
+    summary = pd.DataFrame({
+        'Business Name': aggregated.index.astype(str),
+        'Business Category': main_category(frame, name, columns[BUSINESS_TYPE_INDEX]).reindex(
+            aggregated.index).astype(str).values,
+        'Number of Store': aggregated['stores'].values,
+        'Number of Employees': aggregated['employees'].values,
+        'Number of Inventory': inventory,
+        'Total Register Fee': aggregated['fee'].values,
+        'City': aggregated['city'].astype(str).values,
+        'Local Area': main_category(frame, name, columns[BUSINESS_LOCAL_AREA_INDEX]).reindex(
+            aggregated.index).astype(str).values})
+    return summary